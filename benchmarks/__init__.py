@@ -0,0 +1,11 @@
+from .runner import Scenario, ScenarioResult, StageResult, run_scenario
+from .synthetic import create_animation, create_geometry
+
+__all__ = [
+    "Scenario",
+    "ScenarioResult",
+    "StageResult",
+    "run_scenario",
+    "create_animation",
+    "create_geometry",
+]
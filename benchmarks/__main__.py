@@ -0,0 +1,114 @@
+import argparse
+import itertools
+import sys
+
+from .results import compare_results, load_results, save_results
+from .runner import MEGABYTE, Scenario, ScenarioResult, run_scenario
+from .synthetic import ANIMATION_ENCODINGS, ATTRIBUTE_LAYOUTS, INFO_FORMATS
+
+
+def _parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="benchmarks",
+        description="Measures conversion stages on synthetic Odin files.",
+    )
+    parser.add_argument("--vertices", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--meshes", type=int, default=1)
+    parser.add_argument("--bones", type=int, nargs="+", default=[64])
+    parser.add_argument("--frames", type=int, nargs="+", default=[120])
+    parser.add_argument("--images", type=int, default=0, help="embedded 1 MB images")
+    parser.add_argument(
+        "--layout", choices=ATTRIBUTE_LAYOUTS, nargs="+", default=["skinned"]
+    )
+    parser.add_argument(
+        "--encoding",
+        choices=ANIMATION_ENCODINGS,
+        nargs="+",
+        default=list(ANIMATION_ENCODINGS),
+    )
+    parser.add_argument(
+        "--info", choices=INFO_FORMATS, nargs="+", default=list(INFO_FORMATS)
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip peak memory measurement"
+    )
+    parser.add_argument("--output", help="file to save results to as JSON")
+    parser.add_argument("--compare", help="results file to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="slowdown ratio reported as a regression (default: %(default)s)",
+    )
+
+    return parser.parse_args()
+
+
+def _print_result(result: ScenarioResult) -> None:
+    print(f"  {'stage':<14}{'min ms':>10}{'median ms':>12}{'MB/s':>10}{'peak MB':>10}")
+    for stage in result.stages:
+        peak_memory = (
+            f"{stage.peak_memory / MEGABYTE:>10.1f}"
+            if stage.peak_memory is not None
+            else f"{'-':>10}"
+        )
+        print(
+            f"  {stage.name:<14}"
+            f"{stage.min_seconds * 1000:>10.2f}"
+            f"{stage.median_seconds * 1000:>12.2f}"
+            f"{stage.throughput:>10.1f}"
+            f"{peak_memory}"
+        )
+
+
+def main() -> None:
+    arguments = _parse_arguments()
+
+    scenarios = [
+        Scenario(
+            vertex_count=vertex_count,
+            bone_count=bone_count,
+            frame_count=frame_count,
+            mesh_count=arguments.meshes,
+            layout=layout,
+            encoding=encoding,
+            info=info,
+            image_count=arguments.images,
+        )
+        for info, encoding, layout, vertex_count, bone_count, frame_count in (
+            itertools.product(
+                arguments.info,
+                arguments.encoding,
+                arguments.layout,
+                arguments.vertices,
+                arguments.bones,
+                arguments.frames,
+            )
+        )
+    ]
+
+    results: list[ScenarioResult] = []
+    for scenario in scenarios:
+        print(f"Running {scenario.name}...")
+        result = run_scenario(
+            scenario, repeat=arguments.repeat, trace_memory=not arguments.no_memory
+        )
+        _print_result(result)
+        results.append(result)
+
+    if arguments.output is not None:
+        save_results(arguments.output, results)
+        print(f"Results are saved to {arguments.output!r}.")
+
+    if arguments.compare is not None:
+        regressions = compare_results(
+            load_results(arguments.compare), results, arguments.threshold
+        )
+        if regressions:
+            print(f"Regressions found: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import os
+import platform
+import time
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any
+
+import numpy as np
+import orjson
+
+from .runner import ScenarioResult
+
+RESULTS_FORMAT_VERSION = 1
+
+
+def _get_package_version(name: str) -> str | None:
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+
+def save_results(
+    filepath: os.PathLike[str] | str, results: list[ScenarioResult]
+) -> None:
+    data = {
+        "format": RESULTS_FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "gltf-combiner": _get_package_version("gltf-combiner"),
+        },
+        "scenarios": [result.to_dict() for result in results],
+    }
+
+    with open(filepath, "wb") as file:
+        file.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+
+def load_results(filepath: os.PathLike[str] | str) -> dict[str, Any]:
+    with open(filepath, "rb") as file:
+        data = orjson.loads(file.read())
+
+    if data.get("format") != RESULTS_FORMAT_VERSION:
+        raise ValueError(f"Unsupported benchmark results format: {data.get('format')}")
+
+    return data
+
+
+def compare_results(
+    baseline: dict[str, Any], results: list[ScenarioResult], threshold: float
+) -> list[str]:
+    """
+    Prints time ratios of stages to the baseline and returns names of stages
+    which became slower by more than `threshold` (0.1 is 10%).
+    """
+
+    baseline_stages: dict[tuple[str, str], float] = {
+        (scenario["name"], stage["name"]): stage["min_seconds"]
+        for scenario in baseline["scenarios"]
+        for stage in scenario["stages"]
+    }
+
+    regressions: list[str] = []
+    for result in results:
+        print(f"{result.scenario.name} compared to baseline:")
+
+        for stage in result.stages:
+            baseline_seconds = baseline_stages.get((result.scenario.name, stage.name))
+            if baseline_seconds is None:
+                print(f"  {stage.name:<14} no baseline")
+                continue
+
+            ratio = stage.min_seconds / max(baseline_seconds, 1e-9)
+            is_regression = ratio > 1 + threshold
+            print(
+                f"  {stage.name:<14} {ratio:>6.2f}x"
+                f"{'  REGRESSION' if is_regression else ''}"
+            )
+
+            if is_regression:
+                regressions.append(f"{result.scenario.name}: {stage.name}")
+
+    return regressions
@@ -0,0 +1,231 @@
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from gltf import FLATBUFFER_CHUNK_TYPE, JSON_CHUNK_TYPE, Chunk, GlTF
+from gltf_combiner import build_combined_gltf, prepare_geometry, rebuild_gltf
+from gltf_combiner.extensions import SupercellOdinGLTF, deserialize_glb_json
+
+from .synthetic import AnimationEncoding, InfoFormat, create_animation, create_geometry
+
+MEGABYTE = 1024 * 1024
+
+
+@dataclass
+class Scenario:
+    vertex_count: int = 10_000
+    bone_count: int = 64
+    frame_count: int = 120
+    mesh_count: int = 1
+    layout: str = "skinned"
+    encoding: AnimationEncoding = "packed"
+    info: InfoFormat = "json"
+    image_count: int = 0
+
+    @property
+    def name(self) -> str:
+        return (
+            f"{self.info}-{self.encoding}-{self.layout}-{self.mesh_count}x"
+            f"{self.vertex_count}v-{self.bone_count}b-{self.frame_count}f"
+            f"-{self.image_count}i"
+        )
+
+
+@dataclass
+class StageResult:
+    name: str
+    seconds: list[float]
+    processed_bytes: int
+    peak_memory: int | None = None
+
+    @property
+    def min_seconds(self) -> float:
+        return min(self.seconds)
+
+    @property
+    def median_seconds(self) -> float:
+        return statistics.median(self.seconds)
+
+    @property
+    def throughput(self) -> float:
+        """Processed megabytes per second of the fastest run."""
+
+        return self.processed_bytes / MEGABYTE / max(self.min_seconds, 1e-9)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "min_seconds": self.min_seconds,
+            "median_seconds": self.median_seconds,
+            "throughput": self.throughput,
+        }
+
+
+@dataclass
+class ScenarioResult:
+    scenario: Scenario
+    stages: list[StageResult] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.scenario.name,
+            "scenario": asdict(self.scenario),
+            "stages": [stage.to_dict() for stage in self.stages],
+        }
+
+
+def _measure(
+    name: str,
+    setup: Callable[[], Any],
+    function: Callable[[Any], Any],
+    processed_bytes: int,
+    repeat: int,
+    trace_memory: bool,
+) -> StageResult:
+    """
+    Times `function` on fresh `setup` output `repeat` times. Peak memory is
+    measured in a separate run, as tracing slows allocations down.
+    """
+
+    seconds: list[float] = []
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        function(argument)
+        seconds.append(time.perf_counter() - start)
+
+    peak_memory = None
+    if trace_memory:
+        argument = setup()
+        tracemalloc.start()
+        function(argument)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return StageResult(name, seconds, processed_bytes, peak_memory)
+
+
+def _get_info_chunk(gltf: GlTF) -> Chunk:
+    chunk = gltf.get_chunk_by_type(JSON_CHUNK_TYPE) or gltf.get_chunk_by_type(
+        FLATBUFFER_CHUNK_TYPE
+    )
+    assert chunk is not None
+    return chunk
+
+
+def _deserialize(chunk: Chunk) -> dict:
+    if chunk.type == JSON_CHUNK_TYPE:
+        return chunk.json()
+
+    return deserialize_glb_json(chunk.data)
+
+
+def run_scenario(
+    scenario: Scenario,
+    *,
+    repeat: int = 5,
+    trace_memory: bool = True,
+    directory: os.PathLike[str] | str | None = None,
+) -> ScenarioResult:
+    """
+    Generates synthetic files for the scenario and measures every conversion
+    stage on them.
+    """
+
+    result = ScenarioResult(scenario)
+
+    with tempfile.TemporaryDirectory(dir=directory) as temp_directory:
+        geometry_path = Path(temp_directory) / "benchmark_geo.glb"
+        animation_path = Path(temp_directory) / "benchmark_anim.glb"
+        output_path = Path(temp_directory) / "benchmark_output.glb"
+
+        create_geometry(
+            scenario.vertex_count,
+            scenario.bone_count,
+            mesh_count=scenario.mesh_count,
+            layout=scenario.layout,
+            image_count=scenario.image_count,
+            info=scenario.info,
+        ).write(geometry_path)
+        create_animation(
+            scenario.bone_count,
+            scenario.frame_count,
+            encoding=scenario.encoding,
+            info=scenario.info,
+        ).write(animation_path)
+
+        input_size = os.path.getsize(geometry_path) + os.path.getsize(animation_path)
+
+        def measure(
+            name: str,
+            setup: Callable[[], Any],
+            function: Callable[[Any], Any],
+            processed_bytes: int,
+        ) -> None:
+            stage = _measure(
+                name, setup, function, processed_bytes, repeat, trace_memory
+            )
+            result.stages.append(stage)
+            print(f"  {name}: {stage.min_seconds * 1000:.2f} ms")
+
+        measure(
+            "parse",
+            lambda: None,
+            lambda _: (GlTF.parse(geometry_path), GlTF.parse(animation_path)),
+            input_size,
+        )
+
+        geometry_data = geometry_path.read_bytes()
+        animation_data = animation_path.read_bytes()
+        info_chunks = (
+            _get_info_chunk(GlTF.from_bytes(geometry_data)),
+            _get_info_chunk(GlTF.from_bytes(animation_data)),
+        )
+        measure(
+            "deserialize",
+            lambda: None,
+            lambda _: [_deserialize(chunk) for chunk in info_chunks],
+            sum(len(chunk) for chunk in info_chunks),
+        )
+
+        measure(
+            "remove_odin",
+            lambda: (GlTF.from_bytes(geometry_data), GlTF.from_bytes(animation_data)),
+            lambda gltfs: [SupercellOdinGLTF(gltf).remove_odin() for gltf in gltfs],
+            input_size,
+        )
+
+        measure(
+            "rebuild",
+            lambda: None,
+            lambda _: rebuild_gltf(geometry_data, fix_texcoords=True),
+            len(geometry_data),
+        )
+
+        # Combining doesn't change the prepared geometry, so runs share it.
+        # Odin format is removed from the animation in every run
+        geometry = prepare_geometry(geometry_data, fix_texcoords=True)
+        combined_gltf = build_combined_gltf(geometry, animation_data)
+        output_size = len(combined_gltf.to_bytes())
+
+        measure(
+            "combine",
+            lambda: None,
+            lambda _: build_combined_gltf(geometry, animation_data),
+            output_size,
+        )
+
+        measure(
+            "write",
+            lambda: None,
+            lambda _: combined_gltf.write(output_path),
+            output_size,
+        )
+
+    return result
@@ -0,0 +1,532 @@
+import math
+from collections.abc import Callable, Sequence
+from typing import Any, Literal
+
+import numpy as np
+import orjson
+
+from gltf import BIN_CHUNK_TYPE, FLATBUFFER_CHUNK_TYPE, JSON_CHUNK_TYPE, Chunk, GlTF
+from gltf_combiner.extensions import serialize_glb_json
+from gltf_combiner.extensions.odin.animation._flags import OdinAnimationFlags
+from gltf_combiner.extensions.odin.attribute_format import OdinAttributeFormat
+from gltf_combiner.extensions.odin.attribute_type import OdinAttributeType
+
+type InfoFormat = Literal["json", "fla2"]
+type AnimationEncoding = Literal["packed", "continuous", "raw"]
+type AttributeGenerator = Callable[[_Grid, int, np.random.Generator], np.ndarray]
+
+INFO_FORMATS: tuple[InfoFormat, ...] = ("json", "fla2")
+ANIMATION_ENCODINGS: tuple[AnimationEncoding, ...] = ("packed", "continuous", "raw")
+
+BUFFER_VIEW_ALIGNMENT = 16
+FRAME_RATE = 30
+
+# Flags of animated nodes: rotation, translation and separate scale
+ANIMATED_NODE_FLAGS = 2 | 4 | 8 | 16
+# Packed translation and scale are stored as int16 multiplied by these values
+TRANSLATION_MULTIPLIER = 1 / 4096
+SCALE_MULTIPLIER = 1 / 32767
+
+
+class _Grid:
+    """Regular grid of vertices the synthetic meshes are made of."""
+
+    def __init__(self, vertex_count: int) -> None:
+        self.width: int = max(2, math.isqrt(vertex_count))
+        self.height: int = max(2, vertex_count // self.width)
+        self.vertex_count: int = self.width * self.height
+
+        x, y = np.meshgrid(np.arange(self.width), np.arange(self.height))
+        self.u: np.ndarray = x.reshape(-1) / (self.width - 1)
+        self.v: np.ndarray = y.reshape(-1) / (self.height - 1)
+
+    def triangles(self, rng: np.random.Generator) -> np.ndarray:
+        """Returns grid triangles in shuffled order, like exported by a packer."""
+
+        x, y = np.meshgrid(np.arange(self.width - 1), np.arange(self.height - 1))
+        corner = (y * self.width + x).reshape(-1)
+
+        triangles = np.concatenate(
+            (
+                np.stack((corner, corner + 1, corner + self.width), axis=1),
+                np.stack(
+                    (corner + 1, corner + self.width + 1, corner + self.width), axis=1
+                ),
+            )
+        )
+        rng.shuffle(triangles)
+        return triangles.reshape(-1)
+
+
+def _positions(grid: _Grid, bone_count: int, rng: np.random.Generator) -> np.ndarray:
+    height = rng.random(grid.vertex_count) * 0.1
+    return np.stack((grid.u, grid.v, height), axis=1).astype(np.float32)
+
+
+def _normals(grid: _Grid, bone_count: int, rng: np.random.Generator) -> np.ndarray:
+    normals = np.zeros((grid.vertex_count, 3), dtype=np.int8)
+    normals[:, 2] = 127
+    return normals
+
+
+def _texcoords(grid: _Grid, bone_count: int, rng: np.random.Generator) -> np.ndarray:
+    # Odin texcoords are fixed point values where 4096 is 1.0
+    return (np.stack((grid.u, grid.v), axis=1) * 4095).astype(np.int16)
+
+
+def _colors(grid: _Grid, bone_count: int, rng: np.random.Generator) -> np.ndarray:
+    return rng.integers(0, 256, (grid.vertex_count, 4), dtype=np.uint8)
+
+
+def _joints(grid: _Grid, bone_count: int, rng: np.random.Generator) -> np.ndarray:
+    return rng.integers(0, min(bone_count, 256), (grid.vertex_count, 4), dtype=np.uint8)
+
+
+def _weights(grid: _Grid, bone_count: int, rng: np.random.Generator) -> np.ndarray:
+    # Three weights packed into 11, 11 and 10 bits, the fourth one is implied
+    x = rng.integers(0, 1024, grid.vertex_count, dtype=np.uint32)
+    y = rng.integers(0, 1024, grid.vertex_count, dtype=np.uint32)
+    z = rng.integers(0, 512, grid.vertex_count, dtype=np.uint32)
+    return ((x << 21) | (y << 10) | z).reshape(-1, 1)
+
+
+ATTRIBUTES: dict[
+    str, tuple[OdinAttributeType, OdinAttributeFormat, AttributeGenerator]
+] = {
+    "position": (
+        OdinAttributeType.a_pos,
+        OdinAttributeFormat.FloatVector3,
+        _positions,
+    ),
+    "normal": (OdinAttributeType.a_normal, OdinAttributeFormat.UByteVector3, _normals),
+    "texcoord": (OdinAttributeType.a_uv0, OdinAttributeFormat.ShortVector2, _texcoords),
+    "color": (OdinAttributeType.a_color, OdinAttributeFormat.ColorRGBA, _colors),
+    "joints": (
+        OdinAttributeType.a_boneindex,
+        OdinAttributeFormat.UByteVector4,
+        _joints,
+    ),
+    "weights": (
+        OdinAttributeType.a_boneweights,
+        OdinAttributeFormat.NormalizedWeightVector,
+        _weights,
+    ),
+}
+
+ATTRIBUTE_LAYOUTS: dict[str, tuple[str, ...]] = {
+    "static": ("position", "normal", "texcoord"),
+    "colored": ("position", "normal", "texcoord", "color"),
+    "skinned": ("position", "normal", "texcoord", "joints", "weights"),
+}
+
+
+class _BinaryBuilder:
+    def __init__(self) -> None:
+        self.data: bytearray = bytearray()
+        self.buffer_views: list[dict] = []
+        self.accessors: list[dict] = []
+
+    def add_buffer_view(self, data: bytes) -> int:
+        self.data += bytes(-len(self.data) % BUFFER_VIEW_ALIGNMENT)
+        self.buffer_views.append(
+            {"buffer": 0, "byteOffset": len(self.data), "byteLength": len(data)}
+        )
+        self.data += data
+
+        return len(self.buffer_views) - 1
+
+    def add_accessor(self, array: np.ndarray, component_type: int, type: str) -> int:
+        self.accessors.append(
+            {
+                "bufferView": self.add_buffer_view(array.tobytes()),
+                "componentType": component_type,
+                "count": len(array),
+                "type": type,
+            }
+        )
+
+        return len(self.accessors) - 1
+
+    def build(self, data: dict[str, Any], info: InfoFormat) -> GlTF:
+        data["buffers"] = [{"byteLength": len(self.data)}]
+        data["bufferViews"] = self.buffer_views
+        data["accessors"] = self.accessors
+
+        if info == "json":
+            info_chunk = Chunk(JSON_CHUNK_TYPE, orjson.dumps(data))
+        else:
+            info_chunk = Chunk(FLATBUFFER_CHUNK_TYPE, serialize_glb_json(data))
+
+        return GlTF(info_chunk, Chunk(BIN_CHUNK_TYPE, bytes(self.data)))
+
+
+def _create_bone_nodes(bone_count: int) -> list[dict]:
+    nodes: list[dict] = [{"name": "bone_0"}]
+
+    # Bones are a balanced binary tree to get some hierarchy depth
+    for i in range(1, bone_count):
+        nodes.append(
+            {
+                "name": f"bone_{i}",
+                "extensions": {"SC_odin_format": {"parent": (i - 1) // 2}},
+            }
+        )
+
+    return nodes
+
+
+def _create_vertex_data(
+    grid: _Grid,
+    attribute_names: Sequence[str],
+    bone_count: int,
+    rng: np.random.Generator,
+) -> tuple[bytes, int, list[dict]]:
+    """Returns interleaved vertex data, its stride and Odin attribute descriptors."""
+
+    columns: list[np.ndarray] = []
+    attributes: list[dict] = []
+    stride = 0
+
+    for name in attribute_names:
+        attribute_type, attribute_format, generate = ATTRIBUTES[name]
+
+        column = generate(grid, bone_count, rng)
+
+        attribute = {
+            "index": attribute_type.value,
+            "format": attribute_format.value,
+            "offset": stride,
+            "name": attribute_type.name,
+        }
+        if attribute_type == OdinAttributeType.a_boneindex:
+            attribute["interpretAsInteger"] = True
+
+        # Attributes are aligned to 4 bytes
+        column_bytes = column.view(np.uint8).reshape(grid.vertex_count, -1)
+        padding = -column_bytes.shape[1] % 4
+        if padding:
+            column_bytes = np.pad(column_bytes, ((0, 0), (0, padding)))
+
+        columns.append(column_bytes)
+        attributes.append(attribute)
+        stride += column_bytes.shape[1]
+
+    return np.concatenate(columns, axis=1).tobytes(), stride, attributes
+
+
+def create_geometry(
+    vertex_count: int = 10_000,
+    bone_count: int = 64,
+    *,
+    mesh_count: int = 1,
+    layout: Sequence[str] | str = "skinned",
+    image_count: int = 0,
+    image_size: int = 1024 * 1024,
+    info: InfoFormat = "json",
+    seed: int = 0,
+) -> GlTF:
+    """
+    Creates an Odin geometry file with `mesh_count` skinned grid meshes of about
+    `vertex_count` vertices each, and `bone_count` bones named `bone_{index}`.
+    `layout` is either a name from `ATTRIBUTE_LAYOUTS` or attribute names from
+    `ATTRIBUTES`. Embedded images are filled with random bytes.
+    """
+
+    rng = np.random.default_rng(seed)
+    attribute_names = ATTRIBUTE_LAYOUTS[layout] if isinstance(layout, str) else layout
+
+    binary = _BinaryBuilder()
+    grid = _Grid(vertex_count)
+
+    vertex_data: list[bytes] = []
+    mesh_data_infos: list[dict] = []
+    vertex_data_offset = 0
+    for _ in range(mesh_count):
+        data, stride, attributes = _create_vertex_data(
+            grid, attribute_names, bone_count, rng
+        )
+        mesh_data_infos.append(
+            {
+                "vertexDescriptors": [
+                    {
+                        "offset": vertex_data_offset,
+                        "stride": stride,
+                        "attributes": attributes,
+                    }
+                ]
+            }
+        )
+        vertex_data.append(data)
+        vertex_data_offset += len(data)
+
+    odin_buffer_view = binary.add_buffer_view(b"".join(vertex_data))
+
+    nodes = _create_bone_nodes(bone_count)
+    meshes: list[dict] = []
+    for mesh_index in range(mesh_count):
+        indices = grid.triangles(rng)
+        if grid.vertex_count <= np.iinfo(np.uint16).max:
+            indices_accessor = binary.add_accessor(
+                indices.astype(np.uint16), 5123, "SCALAR"
+            )
+        else:
+            indices_accessor = binary.add_accessor(
+                indices.astype(np.uint32), 5125, "SCALAR"
+            )
+
+        meshes.append(
+            {
+                "name": f"mesh_{mesh_index}",
+                "primitives": [
+                    {
+                        "indices": indices_accessor,
+                        "material": 0,
+                        "extensions": {
+                            "SC_odin_format": {"meshDataInfoIndex": mesh_index}
+                        },
+                    }
+                ],
+            }
+        )
+        nodes.append({"name": f"mesh_{mesh_index}", "mesh": mesh_index, "skin": 0})
+
+    data: dict[str, Any] = {
+        "asset": {"version": "2.0", "generator": "gltf-combiner benchmarks"},
+        "scene": 0,
+        "scenes": [{"nodes": [0, *range(bone_count, bone_count + mesh_count)]}],
+        "nodes": nodes,
+        "meshes": meshes,
+        "skins": [
+            {
+                "joints": list(range(bone_count)),
+                "extensions": {"SC_odin_format": {}},
+            }
+        ],
+        "extensionsUsed": ["SC_odin_format"],
+        "extensionsRequired": ["SC_odin_format"],
+        "extensions": {
+            "SC_odin_format": {
+                "bufferView": odin_buffer_view,
+                "meshDataInfos": mesh_data_infos,
+                "materials": [{"name": "material"}],
+            }
+        },
+    }
+
+    if image_count > 0:
+        data["images"] = [
+            {
+                "bufferView": binary.add_buffer_view(rng.bytes(image_size)),
+                "mimeType": "image/png",
+            }
+            for _ in range(image_count)
+        ]
+        data["samplers"] = [{"magFilter": 9729, "minFilter": 9987}]
+        data["textures"] = [
+            {"sampler": 0, "source": index} for index in range(image_count)
+        ]
+
+    return binary.build(data, info)
+
+
+def _create_node_transforms(
+    bone_count: int, frame_count: int, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns smooth translation, rotation and scale curves of shape
+    (bones, frames, channels).
+    """
+
+    time = np.linspace(0, 2 * np.pi, frame_count, dtype=np.float64)
+    phase = rng.random((bone_count, 1)) * 2 * np.pi
+
+    translation = np.zeros((bone_count, frame_count, 3))
+    translation[:, :, 0] = 0.5 * np.sin(time + phase)
+    translation[:, :, 1] = rng.random((bone_count, 1))
+
+    angle = 0.5 * np.sin(time + phase)
+    rotation = np.zeros((bone_count, frame_count, 4))
+    rotation[:, :, 2] = np.sin(angle / 2)
+    rotation[:, :, 3] = np.cos(angle / 2)
+
+    scale = np.ones((bone_count, frame_count, 3))
+    scale += 0.1 * np.sin(time + phase)[:, :, np.newaxis]
+
+    return translation, rotation, scale
+
+
+def _normalize_transforms(
+    translation: np.ndarray, rotation: np.ndarray, scale: np.ndarray
+) -> np.ndarray:
+    """Returns int16 packed keyframes of shape (frames, rotation + translation + scale)."""
+
+    return np.concatenate(
+        (
+            np.round(rotation * 32767),
+            np.round(translation / TRANSLATION_MULTIPLIER),
+            np.round((scale - 1) / SCALE_MULTIPLIER),
+        ),
+        axis=-1,
+    ).astype(np.int16)
+
+
+def _create_continuous_stream(keyframes: np.ndarray, hold_length: int) -> list[int]:
+    """
+    Encodes keyframes of one node as continuous packed stream: a keyframe count
+    followed by keyframes, then a repeat count of the latest keyframe, then
+    the next keyframe count and so on.
+    """
+
+    frame_count = len(keyframes)
+    stream: list[int] = []
+    frame_index = 0
+    segment_length = max(1, hold_length)
+
+    while frame_index < frame_count:
+        if frame_index != 0:
+            repeat_count = min(hold_length, frame_count - frame_index)
+            stream.append(repeat_count)
+            frame_index += repeat_count
+
+            if frame_index >= frame_count:
+                break
+
+        count = min(segment_length, frame_count - frame_index)
+        stream.append(count)
+        for keyframe in keyframes[frame_index : frame_index + count]:
+            stream.extend(keyframe.tolist())
+        frame_index += count
+
+    return stream
+
+
+def create_animation(
+    bone_count: int = 64,
+    frame_count: int = 120,
+    *,
+    encoding: AnimationEncoding = "packed",
+    static_bone_ratio: float = 0.0,
+    hold_length: int = 4,
+    info: InfoFormat = "json",
+    seed: int = 0,
+) -> GlTF:
+    """
+    Creates an Odin animation file for bones of a `create_geometry` file.
+    A `static_bone_ratio` part of bones isn't animated in packed encodings.
+    Continuous packed animations hold each `hold_length` keyframes for
+    `hold_length` frames.
+    """
+
+    rng = np.random.default_rng(seed)
+    binary = _BinaryBuilder()
+    translation, rotation, scale = _create_node_transforms(bone_count, frame_count, rng)
+
+    animation: dict[str, Any] = {
+        "frameRate": FRAME_RATE,
+        "keyframesCount": frame_count,
+    }
+
+    if encoding == "raw":
+        transforms = np.concatenate((translation, rotation, scale), axis=-1)
+        animation["nodes"] = list(range(bone_count))
+        animation["accessor"] = binary.add_accessor(
+            transforms.astype(np.float32).reshape(-1), 5126, "SCALAR"
+        )
+    else:
+        static_bones = set(
+            rng.choice(
+                bone_count, int(bone_count * static_bone_ratio), replace=False
+            ).tolist()
+        )
+        flags = [
+            0 if bone in static_bones else ANIMATED_NODE_FLAGS
+            for bone in range(bone_count)
+        ]
+        element_count = OdinAnimationFlags(ANIMATED_NODE_FLAGS).element_count
+
+        base_translation = translation[:, 0]
+        base_rotation = np.round(rotation[:, 0] * 32767)
+        base_scale = np.ones((bone_count, 3))
+        multipliers = np.full((bone_count, 2), TRANSLATION_MULTIPLIER)
+        multipliers[:, 1] = SCALE_MULTIPLIER
+
+        packed_nodes: list[dict] = []
+        packed: dict[str, Any] = {"nodes": packed_nodes}
+
+        if encoding == "continuous":
+            stream: list[int] = []
+            for bone in range(bone_count):
+                node_stream = (
+                    _create_continuous_stream(
+                        _normalize_transforms(
+                            translation[bone] - base_translation[bone],
+                            rotation[bone],
+                            scale[bone],
+                        ),
+                        hold_length,
+                    )
+                    if flags[bone]
+                    else []
+                )
+                stream.extend(node_stream)
+                packed_nodes.append(
+                    {
+                        "nodeIndex": bone,
+                        "flags": flags[bone],
+                        "frameCount": frame_count,
+                        "dataSize": len(node_stream),
+                    }
+                )
+
+            # Continuous nodes keep rotation separately from other base values
+            base = np.concatenate((base_translation, base_scale, multipliers), axis=1)
+            packed["uintAccessor"] = binary.add_accessor(
+                base_rotation.astype(np.int16).reshape(-1), 5122, "SCALAR"
+            )
+            data = np.array(stream, dtype=np.int16)
+        else:
+            animated_bones = [bone for bone in range(bone_count) if flags[bone]]
+            keyframes = _normalize_transforms(
+                translation[animated_bones] - base_translation[animated_bones, None],
+                rotation[animated_bones],
+                scale[animated_bones],
+            )
+            for bone in range(bone_count):
+                packed_nodes.append(
+                    {
+                        "nodeIndex": bone,
+                        "flags": flags[bone],
+                        "frameCount": frame_count,
+                        "dataSize": frame_count * element_count if flags[bone] else 0,
+                    }
+                )
+
+            base = np.concatenate(
+                (base_translation, rotation[:, 0], base_scale, multipliers), axis=1
+            )
+            # Keyframes of all animated nodes are interleaved frame by frame
+            data = keyframes.transpose(1, 0, 2).reshape(-1)
+
+        packed["dataAccessor"] = binary.add_accessor(data, 5122, "SCALAR")
+        packed["nodeAccessor"] = binary.add_accessor(
+            base.astype(np.float32).reshape(-1), 5126, "SCALAR"
+        )
+        animation["packed"] = packed
+
+    data: dict[str, Any] = {
+        "asset": {"version": "2.0", "generator": "gltf-combiner benchmarks"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": _create_bone_nodes(bone_count),
+        "extensionsUsed": ["SC_odin_format"],
+        "extensionsRequired": ["SC_odin_format"],
+        "extensions": {
+            "SC_odin_format": {
+                # Animations have no vertex data, but the extension requires it
+                "bufferView": binary.add_buffer_view(bytes(BUFFER_VIEW_ALIGNMENT)),
+                "animation": animation,
+            }
+        },
+    }
+
+    return binary.build(data, info)
@@ -0,0 +1,91 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from gltf import BIN_CHUNK_TYPE, JSON_CHUNK_TYPE, GlTF
+from gltf_combiner import ConversionOptions, rebuild_gltf
+from gltf_combiner.extensions.odin.gltf_component_type import ComponentType
+from gltf_combiner.extensions.odin.vertex_cache import (
+    VERTEX_CACHE_SIZE,
+    calculate_acmr,
+)
+
+from .synthetic import ATTRIBUTE_LAYOUTS, create_geometry
+
+
+def _read_primitive_indices(gltf: GlTF) -> list[np.ndarray]:
+    json_chunk = gltf.get_chunk_by_type(JSON_CHUNK_TYPE)
+    bin_chunk = gltf.get_chunk_by_type(BIN_CHUNK_TYPE)
+    assert json_chunk is not None and bin_chunk is not None
+
+    data = json_chunk.json()
+    result: list[np.ndarray] = []
+    for mesh in data.get("meshes", []):
+        for primitive in mesh.get("primitives", []):
+            accessor = data["accessors"][primitive["indices"]]
+            buffer_view = data["bufferViews"][accessor["bufferView"]]
+            result.append(
+                np.frombuffer(
+                    bin_chunk.data,
+                    dtype=ComponentType(accessor["componentType"]).to_numpy_dtype(),
+                    count=accessor["count"],
+                    offset=buffer_view.get("byteOffset", 0)
+                    + accessor.get("byteOffset", 0),
+                )
+            )
+
+    return result
+
+
+def _measure(filepath: Path, options: ConversionOptions) -> tuple[float, list[float]]:
+    start = time.perf_counter()
+    gltf = rebuild_gltf(filepath, fix_texcoords=False, options=options)
+    seconds = time.perf_counter() - start
+
+    return seconds, [
+        calculate_acmr(indices) for indices in _read_primitive_indices(gltf)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="benchmarks.vertex_cache",
+        description="Reports average cache miss ratio of synthetic meshes "
+        f"for a {VERTEX_CACHE_SIZE} entry FIFO cache "
+        "before and after vertex cache optimization.",
+    )
+    parser.add_argument("--vertices", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--meshes", type=int, default=1)
+    parser.add_argument("--layout", choices=ATTRIBUTE_LAYOUTS, default="static")
+    arguments = parser.parse_args()
+
+    print(
+        f"{'vertices':>10}{'ACMR before':>14}{'ACMR after':>12}"
+        f"{'ms before':>12}{'ms after':>12}"
+    )
+    for vertex_count in arguments.vertices:
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = Path(directory) / "benchmark_geo.glb"
+            create_geometry(
+                vertex_count, 1, mesh_count=arguments.meshes, layout=arguments.layout
+            ).write(filepath)
+
+            seconds_before, acmr_before = _measure(filepath, ConversionOptions())
+            seconds_after, acmr_after = _measure(
+                filepath, ConversionOptions(optimize_vertex_cache=True)
+            )
+
+        print(
+            f"{vertex_count:>10}"
+            f"{np.mean(acmr_before):>14.3f}"
+            f"{np.mean(acmr_after):>12.3f}"
+            f"{seconds_before * 1000:>12.1f}"
+            f"{seconds_after * 1000:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
 from .chunk import Chunk
 from .gltf import GlTF
+from .json_writer import JsonWriter
+from .segmented_buffer import SegmentedBuffer
+from .spill_file import SpillFile
 
 __all__ = [
     "GlTF",
     "Chunk",
+    "JsonWriter",
+    "SegmentedBuffer",
+    "SpillFile",
     "JSON_CHUNK_TYPE",
     "FLATBUFFER_CHUNK_TYPE",
     "BIN_CHUNK_TYPE",
@@ -3,11 +3,13 @@ from typing import Any
 
 import orjson
 
+from .segmented_buffer import SegmentedBuffer
+
 
 @dataclass
 class Chunk:
     type: bytes
-    data: bytes
+    data: bytes | bytearray | memoryview | SegmentedBuffer
 
     def json(self) -> dict[str, Any]:
         return orjson.loads(self.data)
@@ -1,11 +1,16 @@
+import mmap
 import os
 from io import BytesIO
-from typing import Self
+from typing import Any, BinaryIO, Self
 
 from .chunk import Chunk
 from .exceptions import WrongFileException
+from .profiling import get_current_span, traced
+from .segmented_buffer import Segment, SegmentedBuffer, write_segments
+from .spill_file import SpillFile
 
 GLTF_HEADER_SIZE = 12
+CHUNK_HEADER_SIZE = 8
 
 GLTF_MAGIC = b"glTF"
 GLTF_VERSION = 2
@@ -22,6 +27,34 @@ def write_file_data(filepath: os.PathLike[str] | str, data: bytes):
         file.write(data)
 
 
+@traced("gltf.write")
+def write_streamed_file(
+    filepath: os.PathLike[str] | str, json_chunk: Chunk, bin_file: SpillFile
+) -> None:
+    """
+    Writes a file with the binary chunk copied from `bin_file` block by block
+    instead of being joined in memory.
+    """
+
+    chunks_length = 2 * CHUNK_HEADER_SIZE + len(json_chunk) + bin_file.size
+
+    with open(filepath, "wb") as file:
+        file.write(GLTF_MAGIC)
+        file.write(int.to_bytes(GLTF_VERSION, 4, "little"))
+        file.write(int.to_bytes(chunks_length + GLTF_HEADER_SIZE, 4, "little"))
+
+        file.write(int.to_bytes(len(json_chunk), 4, "little"))
+        file.write(json_chunk.type)
+        file.write(json_chunk.data)
+
+        file.write(int.to_bytes(bin_file.size, 4, "little"))
+        file.write(b"BIN\0")
+        bin_file.copy_to(file)
+
+    if current_span := get_current_span():
+        current_span.add(byte_count=chunks_length + GLTF_HEADER_SIZE)
+
+
 def is_at_end(buffer: BytesIO) -> bool:
     return buffer.tell() >= len(buffer.getvalue())
 
@@ -29,15 +62,76 @@ def is_at_end(buffer: BytesIO) -> bool:
 class GlTF:
     def __init__(self, *chunks: Chunk):
         self._file_read_buffer = BytesIO()
-        self._file_write_buffer = BytesIO()
 
         self._chunks: list[Chunk] = list(chunks)
+        # Mapping and its views of a file opened by `map`
+        self._mapping: mmap.mmap | None = None
+        self._mapped_views: list[memoryview] = []
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
 
     @staticmethod
     def parse(filepath: os.PathLike[str] | str) -> "GlTF":
+        return GlTF.from_bytes(get_file_data(filepath))
+
+    @staticmethod
+    @traced("gltf.parse")
+    def map(filepath: os.PathLike[str] | str) -> "GlTF":
+        """
+        Parses a memory mapped file. Chunk data are read-only views of the
+        mapping, so the file is paged in only when its data are accessed.
+        The file stays mapped until `close` is called or the GlTF is used
+        as a context manager.
+        """
+
+        with open(filepath, "rb") as file:
+            # Empty files can't be mapped
+            if os.fstat(file.fileno()).st_size == 0:
+                raise WrongFileException("File is not validated!")
+
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        gltf = GlTF()
+        gltf._mapping = mapping
+        file_data = memoryview(mapping)
+        gltf._mapped_views.append(file_data)
+
+        file_length = len(file_data)
+        if (
+            file_data[:4] != GLTF_MAGIC
+            or int.from_bytes(file_data[4:8], "little") != GLTF_VERSION
+            or int.from_bytes(file_data[8:12], "little") != file_length
+        ):
+            gltf.close()
+            raise WrongFileException("File is not validated!")
+
+        position = GLTF_HEADER_SIZE
+        while position < file_length:
+            chunk_length = int.from_bytes(file_data[position : position + 4], "little")
+            chunk_type = bytes(file_data[position + 4 : position + 8])
+            position += CHUNK_HEADER_SIZE
+
+            chunk_data = file_data[position : position + chunk_length]
+            gltf._mapped_views.append(chunk_data)
+            gltf._chunks.append(Chunk(chunk_type, chunk_data))
+            position += chunk_length
+
+        assert position == file_length, "Cannot parse whole file."
+
+        if current_span := get_current_span():
+            current_span.add(byte_count=file_length, element_count=len(gltf._chunks))
+
+        return gltf
+
+    @staticmethod
+    @traced("gltf.parse")
+    def from_bytes(file_data: bytes) -> "GlTF":
         gltf = GlTF()
 
-        file_data = get_file_data(filepath)
         file_length = len(file_data)
         gltf._file_read_buffer = BytesIO(file_data)
 
@@ -47,24 +141,52 @@ class GlTF:
         gltf._chunks = gltf._parse_chunks()
         assert is_at_end(gltf._file_read_buffer), "Cannot parse whole file."
 
+        if current_span := get_current_span():
+            current_span.add(byte_count=file_length, element_count=len(gltf._chunks))
+
         return gltf
 
+    @traced("gltf.write")
     def write(self, filepath: os.PathLike[str] | str) -> Self:
-        self._file_write_buffer = BytesIO()
+        with open(filepath, "wb") as file:
+            length = self.write_to(file)
+
+        if current_span := get_current_span():
+            current_span.add(byte_count=length)
 
-        chunks_buffer = self._write_chunks()
+        return self
 
-        self._file_write_buffer.write(GLTF_MAGIC)
-        self._file_write_buffer.write(int.to_bytes(GLTF_VERSION, 4, "little"))
-        self._file_write_buffer.write(
-            int.to_bytes(len(chunks_buffer.getvalue()) + GLTF_HEADER_SIZE, 4, "little")
-        )
+    def close(self) -> None:
+        """
+        Unmaps the file of a mapped GlTF, its chunk data can't be used after
+        that. Views of chunk data taken elsewhere must be released first.
+        Nothing is done for other GlTFs.
+        """
 
-        self._file_write_buffer.write(chunks_buffer.getvalue())
+        if self._mapping is None:
+            return
 
-        write_file_data(filepath, self._file_write_buffer.getvalue())
+        for view in self._mapped_views:
+            view.release()
+        self._mapped_views.clear()
+        self._chunks.clear()
 
-        return self
+        self._mapping.close()
+        self._mapping = None
+
+    def write_to(self, file: BinaryIO) -> int:
+        """
+        Writes the file data without joining them first, segmented chunk data
+        are written segment by segment. Returns the written length.
+        """
+
+        segments = self._get_segments()
+        write_segments(file, segments)
+
+        return sum(len(segment) for segment in segments)
+
+    def to_bytes(self) -> bytes:
+        return b"".join(self._get_segments())
 
     def get_chunk_by_type(self, chunk_type: bytes) -> Chunk | None:
         for chunk in self._chunks:
@@ -109,12 +231,21 @@ class GlTF:
 
         return chunks
 
-    def _write_chunks(self) -> BytesIO:
-        io = BytesIO()
-
+    def _get_segments(self) -> list[Segment]:
+        chunk_segments: list[Segment] = []
         for chunk in self._chunks:
-            io.write(int.to_bytes(len(chunk), 4, "little"))
-            io.write(chunk.type)
-            io.write(chunk.data)
+            chunk_segments.append(int.to_bytes(len(chunk), 4, "little") + chunk.type)
+
+            if isinstance(chunk.data, SegmentedBuffer):
+                chunk_segments.extend(chunk.data.segments)
+            else:
+                chunk_segments.append(chunk.data)
+
+        chunks_length = sum(len(segment) for segment in chunk_segments)
 
-        return io
+        return [
+            GLTF_MAGIC
+            + int.to_bytes(GLTF_VERSION, 4, "little")
+            + int.to_bytes(chunks_length + GLTF_HEADER_SIZE, 4, "little"),
+            *chunk_segments,
+        ]
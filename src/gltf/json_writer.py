@@ -0,0 +1,55 @@
+from collections.abc import Iterable
+from typing import Any
+
+import orjson
+
+EMPTY_ARRAY = b"[]"
+
+
+class JsonWriter:
+    """
+    Writes a JSON object member by member straight into a single buffer.
+    Members can be spliced in as already encoded fragments, so unchanged
+    sections don't have to be encoded again.
+    """
+
+    def __init__(self) -> None:
+        self._buffer: bytearray = bytearray(b"{")
+        self._member_count: int = 0
+
+    def write(self, key: str, value: Any) -> None:
+        self.write_fragment(key, orjson.dumps(value))
+
+    def write_fragment(self, key: str, fragment: bytes) -> None:
+        self._write_key(key)
+        self._buffer += fragment
+
+    def write_array_fragments(self, key: str, fragments: Iterable[bytes]) -> None:
+        """Writes one array member concatenated from already encoded arrays."""
+
+        self._write_key(key)
+        self._buffer += b"["
+
+        is_first = True
+        for fragment in fragments:
+            if fragment == EMPTY_ARRAY:
+                continue
+
+            if not is_first:
+                self._buffer += b","
+
+            self._buffer += memoryview(fragment)[1:-1]
+            is_first = False
+
+        self._buffer += b"]"
+
+    def getvalue(self) -> bytes:
+        return b"".join((self._buffer, b"}"))
+
+    def _write_key(self, key: str) -> None:
+        if self._member_count > 0:
+            self._buffer += b","
+
+        self._buffer += orjson.dumps(key)
+        self._buffer += b":"
+        self._member_count += 1
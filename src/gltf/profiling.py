@@ -0,0 +1,215 @@
+import csv
+import functools
+import os
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, ParamSpec, TypeVar
+
+import orjson
+
+type SpanCallback = Callable[[SpanRecord], None]
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+@dataclass
+class SpanRecord:
+    name: str
+    seconds: float
+    byte_count: int = 0
+    element_count: int = 0
+    peak_memory: int | None = None
+    parent: str | None = None
+    depth: int = 0
+
+
+class Span:
+    """
+    Open span of a running profiler. Functions can report amount of processed
+    data to the innermost span with `get_current_span`.
+    """
+
+    def __init__(self, name: str, parent: "Span | None") -> None:
+        self.name: str = name
+        self.parent: Span | None = parent
+        self.depth: int = parent.depth + 1 if parent is not None else 0
+        self.byte_count: int = 0
+        self.element_count: int = 0
+
+        self._start: float = 0.0
+        self._memory_start: int = 0
+        self._memory_peak: int = 0
+
+    def add(self, *, byte_count: int = 0, element_count: int = 0) -> None:
+        self.byte_count += byte_count
+        self.element_count += element_count
+
+
+class Profiler:
+    """
+    Collects spans while active. Every finished span is stored in `records` and
+    passed to `callback`. When `trace_memory` is set, peak memory allocated
+    inside of every span is measured with tracemalloc. Tracing is process wide
+    and slows down allocations considerably.
+
+    Only one profiler can be active at a time, spans from all threads are
+    collected by it.
+    """
+
+    def __init__(
+        self, callback: SpanCallback | None = None, *, trace_memory: bool = False
+    ) -> None:
+        self.callback: SpanCallback | None = callback
+        self.trace_memory: bool = trace_memory
+        self.records: list[SpanRecord] = []
+
+        self._started_tracemalloc: bool = False
+
+    def __enter__(self) -> "Profiler":
+        global _profiler
+
+        if _profiler is not None:
+            raise RuntimeError("Another profiler is already active.")
+
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+        _profiler = self
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        global _profiler
+
+        _profiler = None
+
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _open(self, name: str) -> Span:
+        parent = get_current_span()
+        span = Span(name, parent)
+
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent._memory_peak = max(parent._memory_peak, peak)
+
+            tracemalloc.reset_peak()
+            span._memory_start = span._memory_peak = current
+
+        _local.span = span
+        span._start = time.perf_counter()
+        return span
+
+    def _close(self, span: Span) -> None:
+        seconds = time.perf_counter() - span._start
+        _local.span = span.parent
+
+        peak_memory = None
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            span._memory_peak = max(span._memory_peak, peak)
+            peak_memory = span._memory_peak - span._memory_start
+
+            if span.parent is not None:
+                span.parent._memory_peak = max(
+                    span.parent._memory_peak, span._memory_peak
+                )
+
+            # Parent spans already account for the peak of this one
+            tracemalloc.reset_peak()
+
+        record = SpanRecord(
+            span.name,
+            seconds,
+            span.byte_count,
+            span.element_count,
+            peak_memory,
+            span.parent.name if span.parent is not None else None,
+            span.depth,
+        )
+        self.records.append(record)
+
+        if self.callback is not None:
+            self.callback(record)
+
+
+_profiler: Profiler | None = None
+_local = threading.local()
+
+
+def get_current_span() -> Span | None:
+    """Returns the innermost open span of this thread, if profiling is active."""
+
+    if _profiler is None:
+        return None
+
+    return getattr(_local, "span", None)
+
+
+@contextmanager
+def span(name: str) -> Iterator[Span | None]:
+    profiler = _profiler
+    if profiler is None:
+        yield None
+        return
+
+    current = profiler._open(name)
+    try:
+        yield current
+    finally:
+        profiler._close(current)
+
+
+def traced(name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """
+    Decorates a function to run inside of a span. When profiling is disabled,
+    the function is called directly.
+    """
+
+    def decorator(function: Callable[P, R]) -> Callable[P, R]:
+        @functools.wraps(function)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            profiler = _profiler
+            if profiler is None:
+                return function(*args, **kwargs)
+
+            current = profiler._open(name)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler._close(current)
+
+        return wrapper
+
+    return decorator
+
+
+def save_report(records: list[SpanRecord], filepath: os.PathLike[str] | str) -> None:
+    """Saves span records as CSV if the file has `.csv` extension or as JSON."""
+
+    filepath = Path(filepath)
+
+    if filepath.suffix.lower() == ".csv":
+        with open(filepath, "w", newline="") as file:
+            writer = csv.DictWriter(
+                file, fieldnames=[field.name for field in fields(SpanRecord)]
+            )
+            writer.writeheader()
+            writer.writerows(asdict(record) for record in records)
+        return
+
+    with open(filepath, "wb") as file:
+        file.write(
+            orjson.dumps(
+                [asdict(record) for record in records], option=orjson.OPT_INDENT_2
+            )
+        )
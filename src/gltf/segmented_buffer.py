@@ -0,0 +1,168 @@
+import io
+import os
+from bisect import bisect_right
+from collections.abc import Sequence
+from typing import BinaryIO
+
+type Segment = bytes | bytearray | memoryview
+
+
+def _get_iov_max() -> int:
+    try:
+        return os.sysconf("SC_IOV_MAX")
+    except (AttributeError, ValueError, OSError):
+        return 1024
+
+
+# Maximum number of segments written by one system call
+IOV_MAX = _get_iov_max()
+
+
+class SegmentedBuffer:
+    """
+    Binary data kept as a list of segments, which are joined only when
+    written. Appending and overwriting ranges change the list of segments
+    without copying data of other segments.
+
+    Segments are referenced, not copied, so they must not be changed while
+    the buffer is in use.
+    """
+
+    def __init__(self, *segments: "Segment | SegmentedBuffer") -> None:
+        self._segments: list[Segment] = []
+        # Start offsets of segments
+        self._offsets: list[int] = []
+        self._length: int = 0
+
+        for segment in segments:
+            self.append(segment)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __add__(self, other: "Segment | SegmentedBuffer") -> "SegmentedBuffer":
+        return SegmentedBuffer(self, other)
+
+    def __bytes__(self) -> bytes:
+        return b"".join(self._segments)
+
+    @property
+    def segments(self) -> Sequence[Segment]:
+        return tuple(self._segments)
+
+    def append(self, data: "Segment | SegmentedBuffer") -> int:
+        """Appends data and returns their offset."""
+
+        offset = self._length
+        segments = data._segments if isinstance(data, SegmentedBuffer) else (data,)
+        for segment in segments:
+            if len(segment) == 0:
+                continue
+
+            if isinstance(segment, memoryview):
+                segment = segment.cast("B")
+
+            self._offsets.append(self._length)
+            self._segments.append(segment)
+            self._length += len(segment)
+
+        return offset
+
+    def read(self, offset: int, length: int) -> Segment:
+        """
+        Returns data of the range, as a view if the range lies in a single
+        segment and as a joined copy otherwise.
+        """
+
+        assert 0 <= offset and offset + length <= self._length
+
+        end = offset + length
+        index = bisect_right(self._offsets, offset) - 1
+        pieces: list[Segment] = []
+        while offset < end:
+            segment_offset = self._offsets[index]
+            segment = memoryview(self._segments[index])
+            piece_end = min(end, segment_offset + len(segment))
+
+            pieces.append(segment[offset - segment_offset : piece_end - segment_offset])
+            offset = piece_end
+            index += 1
+
+        if len(pieces) == 1:
+            return pieces[0]
+
+        return b"".join(pieces)
+
+    def write(self, offset: int, data: Segment) -> None:
+        """Overwrites the range at `offset` with data of the same length."""
+
+        if isinstance(data, memoryview):
+            data = data.cast("B")
+
+        assert 0 <= offset and offset + len(data) <= self._length
+        if len(data) == 0:
+            return
+
+        first = self._split(offset)
+        last = self._split(offset + len(data))
+
+        self._segments[first:last] = [data]
+        self._offsets[first:last] = [offset]
+
+    def write_to(self, file: BinaryIO) -> None:
+        write_segments(file, self._segments)
+
+    def _split(self, offset: int) -> int:
+        """
+        Splits the segment containing `offset` in two and returns index of
+        the segment starting at `offset`.
+        """
+
+        if offset == self._length:
+            return len(self._segments)
+
+        index = bisect_right(self._offsets, offset) - 1
+        segment_offset = self._offsets[index]
+        if segment_offset == offset:
+            return index
+
+        segment = memoryview(self._segments[index])
+        split = offset - segment_offset
+        self._segments[index : index + 1] = [segment[:split], segment[split:]]
+        self._offsets.insert(index + 1, offset)
+
+        return index + 1
+
+
+def write_segments(file: BinaryIO, segments: Sequence[Segment]) -> None:
+    """
+    Writes segments one after another. Files with a descriptor are written
+    with vectored I/O where the platform has it, so segments aren't joined.
+    """
+
+    try:
+        file_descriptor = file.fileno() if hasattr(os, "writev") else None
+    except io.UnsupportedOperation:
+        file_descriptor = None
+
+    if file_descriptor is None:
+        for segment in segments:
+            file.write(segment)
+        return
+
+    file.flush()
+
+    views = [memoryview(segment).cast("B") for segment in segments]
+    views = [view for view in views if len(view) > 0]
+    index = 0
+    while index < len(views):
+        written = os.writev(file_descriptor, views[index : index + IOV_MAX])
+
+        # Writes can be partial, the rest of the last touched view is written
+        # by the next call
+        while index < len(views) and written >= len(views[index]):
+            written -= len(views[index])
+            index += 1
+
+        if written > 0:
+            views[index] = views[index][written:]
@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import threading
+from typing import Any, BinaryIO
+
+BUFFER_VIEW_ALIGNMENT = 16
+COPY_BLOCK_SIZE = 1024 * 1024
+
+
+class SpillFile:
+    """
+    Temporary file holding binary chunk data. Buffer views are appended to it
+    as soon as they are produced, aligned the same way as in memory, so the
+    whole chunk never has to be held in memory at once.
+
+    Reads and writes are serialized by a lock, so data can be read by
+    decoding threads while buffer views are appended.
+    """
+
+    def __init__(self, directory: os.PathLike[str] | str | None = None) -> None:
+        self._file: BinaryIO = tempfile.TemporaryFile(dir=directory)
+        self._size: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def __enter__(self) -> "SpillFile":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def append(self, data: bytes | bytearray | memoryview) -> int:
+        """Appends aligned buffer view data and returns its offset."""
+
+        padding = -len(data) % BUFFER_VIEW_ALIGNMENT
+
+        with self._lock:
+            offset = self._size
+            self._file.seek(offset)
+            self._file.write(data)
+            self._file.write(b"\0" * padding)
+            self._size += len(data) + padding
+
+        return offset
+
+    def read(self, offset: int, length: int) -> bytes:
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(length)
+
+    def write(self, offset: int, data: bytes | bytearray | memoryview) -> None:
+        """Overwrites already appended data."""
+
+        assert offset + len(data) <= self._size
+        with self._lock:
+            self._file.seek(offset)
+            self._file.write(data)
+
+    def compact(self, ranges: list[tuple[int, int]]) -> list[int]:
+        """
+        Moves appended data at the given offsets and lengths, in order of
+        their offsets, next to each other at the start of the file and drops
+        the rest. Returns new offsets of the data. Data are moved block by
+        block, so the file is never read into memory at once.
+        """
+
+        new_offsets: list[int] = []
+        size = 0
+
+        with self._lock:
+            for offset, length in ranges:
+                assert offset >= size
+                new_offsets.append(size)
+
+                padding = -length % BUFFER_VIEW_ALIGNMENT
+                if offset != size:
+                    # Data only move towards the start, so blocks are read
+                    # before they are overwritten
+                    for start in range(0, length, COPY_BLOCK_SIZE):
+                        self._file.seek(offset + start)
+                        block = self._file.read(min(COPY_BLOCK_SIZE, length - start))
+                        self._file.seek(size + start)
+                        self._file.write(block)
+                    self._file.write(b"\0" * padding)
+
+                size += length + padding
+
+            self._file.truncate(size)
+            self._size = size
+
+        return new_offsets
+
+    def copy_to(self, file: BinaryIO) -> None:
+        with self._lock:
+            self._file.seek(0)
+            shutil.copyfileobj(self._file, file, COPY_BLOCK_SIZE)
+
+    def close(self) -> None:
+        self._file.close()
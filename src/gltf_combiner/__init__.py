@@ -1,3 +1,30 @@
-from gltf_combiner.combiner import build_combined_gltf, rebuild_gltf
+from gltf_combiner.cache import OdinCache
+from gltf_combiner.combiner import (
+    PreparedGeometry,
+    SplitGlTF,
+    build_combined_gltf,
+    build_multi_clip_gltf,
+    build_split_gltf,
+    prepare_geometry,
+    rebuild_gltf,
+    rebuild_gltf_streamed,
+)
+from gltf_combiner.extensions import ConversionOptions, KeyframeTolerances
+from gltf_combiner.pipeline import ConversionJob, ConversionPipeline, ConversionResult
 
-__all__ = ["build_combined_gltf", "rebuild_gltf"]
+__all__ = [
+    "build_combined_gltf",
+    "build_multi_clip_gltf",
+    "build_split_gltf",
+    "SplitGlTF",
+    "prepare_geometry",
+    "PreparedGeometry",
+    "rebuild_gltf",
+    "rebuild_gltf_streamed",
+    "OdinCache",
+    "ConversionOptions",
+    "KeyframeTolerances",
+    "ConversionJob",
+    "ConversionPipeline",
+    "ConversionResult",
+]
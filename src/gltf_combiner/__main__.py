@@ -1,17 +1,26 @@
+import argparse
 import os
 import re
-from dataclasses import dataclass, field
+from collections.abc import Iterator
+from contextlib import nullcontext
+from dataclasses import astuple, dataclass, field
 from pathlib import Path
 
-from gltf.exceptions import (
-    AllAnimationChannelsDeletedException,
-    AnimationNotFoundException,
+from gltf.profiling import Profiler, save_report
+from gltf_combiner import ConversionOptions, KeyframeTolerances, OdinCache
+from gltf_combiner.cache import DEFAULT_CACHE_SIZE
+from gltf_combiner.pipeline import (
+    DEFAULT_PREFETCH_COUNT,
+    DEFAULT_WORKER_COUNT,
+    ConversionJob,
+    ConversionPipeline,
 )
-from gltf_combiner import build_combined_gltf, rebuild_gltf
 
 RESOURCES_PATH = Path("resources")
 COMBINED_PATH = Path("combined")
 
+MEGABYTE = 1024 * 1024
+
 
 @dataclass
 class AnimatedFile:
@@ -74,43 +83,274 @@ def _collect_files_info(input_directory: Path, extension="glb") -> list[Animated
     return animated_files
 
 
+def _parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="gltf_combiner",
+        description=f"Combines models from {RESOURCES_PATH!s} "
+        f"with their animations and saves them to {COMBINED_PATH!s}.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="directory to cache files with Odin format removed in, "
+        "caching is disabled if not set",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE // MEGABYTE,
+        help="maximum cache size in megabytes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKER_COUNT,
+        help="number of threads decoding files (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--decoding-threads",
+        type=int,
+        default=1,
+        help="number of threads decoding meshes and animation nodes of every "
+        "file, multiplied by the number of --workers (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=DEFAULT_PREFETCH_COUNT,
+        help="number of files read ahead of decoding (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="convert geometry files without animations in bounded memory "
+        "using temporary files, for very large files",
+    )
+    parser.add_argument(
+        "--optimize-vertices",
+        action="store_true",
+        help="merge duplicate vertices, drop unreferenced ones "
+        "and store indices with the narrowest type",
+    )
+    parser.add_argument(
+        "--optimize-vertex-cache",
+        action="store_true",
+        help="reorder triangles and vertices for GPU vertex cache locality",
+    )
+    parser.add_argument(
+        "--quantize-attributes",
+        action="store_true",
+        help="store positions, normals and skin weights as normalized integers "
+        "using KHR_mesh_quantization",
+    )
+    parser.add_argument(
+        "--reduce-keyframes",
+        action="store_true",
+        help="drop animation keyframes that interpolation of the kept ones "
+        "reproduces within tolerances",
+    )
+    parser.add_argument(
+        "--keyframe-tolerances",
+        type=float,
+        nargs=3,
+        default=None,
+        metavar=("TRANSLATION", "ROTATION", "SCALE"),
+        help="maximum errors of keyframe reduction, rotation in radians, "
+        "implies --reduce-keyframes (default: "
+        f"{' '.join(map(str, astuple(KeyframeTolerances())))})",
+    )
+    parser.add_argument(
+        "--quantize-rotations",
+        action="store_true",
+        help="store animation rotations as normalized int16 quaternions",
+    )
+    parser.add_argument(
+        "--pass-vertices-through",
+        action="store_true",
+        help="keep interleaved vertex data as is instead of decoding every "
+        "attribute, ignored with vertex optimizations and quantization",
+    )
+    parser.add_argument(
+        "--deduplicate-buffers",
+        action="store_true",
+        help="store identical buffer views and accessors once",
+    )
+    output_mode = parser.add_mutually_exclusive_group()
+    output_mode.add_argument(
+        "--multi-clip",
+        action="store_true",
+        help="combine every model with all its animations into one file "
+        "named after the model, with an animation clip per animation file",
+    )
+    output_mode.add_argument(
+        "--split-output",
+        action="store_true",
+        help="save buffer and images of every animated model once as separate "
+        "files named after the model, and its animations as .gltf files "
+        "referencing them",
+    )
+    parser.add_argument(
+        "--profile-report",
+        type=Path,
+        default=None,
+        help="file to save timings of conversion stages to, "
+        "saved as CSV if the file has .csv extension and as JSON otherwise",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="also measure peak memory of conversion stages, slows conversion down",
+    )
+
+    return parser.parse_args()
+
+
 def main() -> None:
+    arguments = _parse_arguments()
+
     input_directory = RESOURCES_PATH
     output_directory = COMBINED_PATH
     os.makedirs(input_directory, exist_ok=True)
     os.makedirs(output_directory, exist_ok=True)
 
-    collected_files = _collect_files_info(input_directory)
-    for file_info in collected_files:
-        print(f"Working with {file_info.filename}...")
+    cache = (
+        OdinCache(arguments.cache_dir, arguments.cache_size * MEGABYTE)
+        if arguments.cache_dir is not None
+        else None
+    )
+
+    pipeline = ConversionPipeline(
+        worker_count=arguments.workers,
+        prefetch_count=arguments.prefetch,
+        cache=cache,
+        streaming=arguments.streaming,
+        split_output=arguments.split_output,
+        options=ConversionOptions(
+            optimize_vertices=arguments.optimize_vertices,
+            optimize_vertex_cache=arguments.optimize_vertex_cache,
+            quantize_attributes=arguments.quantize_attributes,
+            keyframe_tolerances=_get_keyframe_tolerances(arguments),
+            quantize_rotations=arguments.quantize_rotations,
+            deduplicate_buffers=arguments.deduplicate_buffers,
+            pass_vertices_through=arguments.pass_vertices_through,
+            decoding_threads=arguments.decoding_threads,
+        ),
+    )
+
+    profiler = (
+        Profiler(trace_memory=arguments.profile_memory)
+        if arguments.profile_report is not None
+        else None
+    )
+
+    with profiler if profiler is not None else nullcontext():
+        _process_files(
+            input_directory,
+            output_directory,
+            pipeline,
+            multi_clip=arguments.multi_clip,
+            split_output=arguments.split_output,
+        )
+
+    if profiler is not None:
+        save_report(profiler.records, arguments.profile_report)
+        print(f"Profile report is saved to {str(arguments.profile_report)!r}.")
+
+    print("Done!")
+
+
+def _get_keyframe_tolerances(
+    arguments: argparse.Namespace,
+) -> KeyframeTolerances | None:
+    if arguments.keyframe_tolerances is not None:
+        return KeyframeTolerances(*arguments.keyframe_tolerances)
+
+    return KeyframeTolerances() if arguments.reduce_keyframes else None
+
+
+def _collect_jobs(
+    input_directory: Path,
+    output_directory: Path,
+    *,
+    multi_clip: bool,
+    split_output: bool,
+) -> Iterator[ConversionJob]:
+    """
+    Yields a job per animation file, or a job per model with all its
+    animation files for multi-clip and split outputs. Output of a split job
+    is the geometry buffer file.
+    """
+
+    for file_info in _collect_files_info(input_directory):
+        geometry_filepath = input_directory / file_info.filename
 
         if len(file_info.animation_files) == 0:
-            print("Rebuilding geometry file...")
-            gltf = rebuild_gltf(
-                input_directory / file_info.filename, fix_texcoords=True
+            yield ConversionJob(
+                geometry_filepath, None, output_directory / file_info.filename
             )
+            continue
 
-            output_filepath = output_directory / file_info.filename
-            gltf.write(output_filepath)
+        if multi_clip or split_output:
+            output_filename = (
+                f"{os.path.splitext(file_info.filename)[0]}.bin"
+                if split_output
+                else file_info.filename
+            )
+            yield ConversionJob(
+                geometry_filepath,
+                None,
+                output_directory / output_filename,
+                [input_directory / filename for filename in file_info.animation_files],
+            )
             continue
 
         for animation_filename in file_info.animation_files:
-            try:
-                gltf = build_combined_gltf(
-                    input_directory / file_info.filename,
-                    input_directory / animation_filename,
-                    fix_texcoords=True,
-                )
-            except AnimationNotFoundException | AllAnimationChannelsDeletedException:
-                print(f"No animation in the file {animation_filename!r}. File Skipped!")
-                continue
+            yield ConversionJob(
+                geometry_filepath,
+                input_directory / animation_filename,
+                output_directory / animation_filename,
+            )
 
-            output_filepath = output_directory / animation_filename
-            gltf.write(output_filepath)
 
-            print(f' - Combined! Saved to the "{output_filepath}".')
+def _process_files(
+    input_directory: Path,
+    output_directory: Path,
+    pipeline: ConversionPipeline,
+    *,
+    multi_clip: bool = False,
+    split_output: bool = False,
+) -> None:
+    geometry_filepath = None
+    jobs = _collect_jobs(
+        input_directory,
+        output_directory,
+        multi_clip=multi_clip,
+        split_output=split_output,
+    )
+    for result in pipeline.run(jobs):
+        job = result.job
+        if job.geometry_filepath != geometry_filepath:
+            geometry_filepath = job.geometry_filepath
+            print(f"Working with {geometry_filepath.name}...")
 
-    print("Done!")
+        if len(job.clip_filepaths) > 0:
+            if result.skipped:
+                print("No animation in the animation files. File Skipped!")
+            else:
+                print(
+                    f" - Combined with {len(job.clip_filepaths)} animation files! "
+                    f'Saved to the "{job.output_filepath}".'
+                )
+        elif job.animation_filepath is None:
+            print(f' - Rebuilt! Saved to the "{job.output_filepath}".')
+        elif result.skipped:
+            print(
+                f"No animation in the file {job.animation_filepath.name!r}. "
+                "File Skipped!"
+            )
+        else:
+            print(f' - Combined! Saved to the "{job.output_filepath}".')
 
 
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import tempfile
+import time
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+from gltf import GlTF
+from gltf.exceptions import WrongFileException
+
+CACHE_FILE_EXTENSION = ".glb"
+DEFAULT_CACHE_SIZE = 1024 * 1024 * 1024
+TEMP_FILE_EXTENSION = ".tmp"
+# Bumped whenever converter output changes, so entries written by other
+# builds with the same tool version aren't used
+CACHE_FORMAT_VERSION = 1
+# Temporary files of writes interrupted that long ago are removed on eviction
+STALE_TEMP_FILE_AGE = 60 * 60
+
+
+def _get_tool_version() -> str:
+    try:
+        return version("gltf-combiner")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class OdinCache:
+    """
+    On-disk cache of glTF files with Odin format removed, keyed by a hash of
+    the input file data, the tool version and the cache format version.
+
+    Entries are written atomically, so the cache directory can be shared by
+    several processes. When the total size of entries exceeds `max_size`,
+    least recently used ones are evicted.
+    """
+
+    def __init__(
+        self, directory: os.PathLike[str] | str, max_size: int = DEFAULT_CACHE_SIZE
+    ) -> None:
+        self.directory: Path = Path(directory)
+        self.max_size: int = max_size
+        self._version: bytes = f"{_get_tool_version()}/{CACHE_FORMAT_VERSION}".encode()
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def make_key(self, file_data: bytes, options: str = "") -> str:
+        """
+        Makes a key of file data. Conversion options that change the result
+        have to be passed as `options`, so results are cached separately.
+        """
+
+        hasher = hashlib.sha256(self._version)
+        hasher.update(b"\0")
+        hasher.update(options.encode())
+        hasher.update(b"\0")
+        hasher.update(file_data)
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> GlTF | None:
+        filepath = self._get_filepath(key)
+
+        try:
+            gltf = GlTF.parse(filepath)
+            # Modification time is used as the last access time for eviction
+            os.utime(filepath)
+        except FileNotFoundError:
+            return None
+        except WrongFileException:
+            print(f"Broken cache entry {filepath.name!r}. Removing...")
+            filepath.unlink(missing_ok=True)
+            return None
+
+        return gltf
+
+    def put(self, key: str, gltf: GlTF) -> None:
+        file_descriptor, temp_filepath = tempfile.mkstemp(
+            suffix=TEMP_FILE_EXTENSION, dir=self.directory
+        )
+
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                gltf.write_to(file)
+            os.replace(temp_filepath, self._get_filepath(key))
+        except BaseException:
+            os.unlink(temp_filepath)
+            raise
+
+        self.evict()
+
+    def evict(self) -> None:
+        entries: list[tuple[float, int, Path]] = []
+        for filepath in self.directory.glob(f"*{CACHE_FILE_EXTENSION}"):
+            try:
+                stat = filepath.stat()
+            except FileNotFoundError:
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, filepath))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, filepath in sorted(entries):
+            if total_size <= self.max_size:
+                break
+
+            filepath.unlink(missing_ok=True)
+            total_size -= size
+
+        # Fresh temporary files can be written by other processes right now
+        stale_time = time.time() - STALE_TEMP_FILE_AGE
+        for filepath in self.directory.glob(f"*{TEMP_FILE_EXTENSION}"):
+            try:
+                if filepath.stat().st_mtime < stale_time:
+                    filepath.unlink(missing_ok=True)
+            except FileNotFoundError:
+                continue
+
+    def _get_filepath(self, key: str) -> Path:
+        return self.directory / f"{key}{CACHE_FILE_EXTENSION}"
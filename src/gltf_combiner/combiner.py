@@ -1,185 +1,753 @@
+import mimetypes
 import os
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Any
+from urllib.parse import quote, unquote
 
+import numpy as np
+import numpy.typing as npt
 import orjson
 
-from gltf import BIN_CHUNK_TYPE, FLATBUFFER_CHUNK_TYPE, JSON_CHUNK_TYPE, Chunk, GlTF
+from gltf import (
+    BIN_CHUNK_TYPE,
+    FLATBUFFER_CHUNK_TYPE,
+    JSON_CHUNK_TYPE,
+    Chunk,
+    GlTF,
+    JsonWriter,
+    SegmentedBuffer,
+    SpillFile,
+)
 from gltf.exceptions import (
     AllAnimationChannelsDeletedException,
     AnimationNotFoundException,
 )
-from gltf_combiner.extensions import SupercellOdinGLTF
+from gltf.gltf import get_file_data, write_streamed_file
+from gltf.profiling import get_current_span, traced
+from gltf.segmented_buffer import Segment
+from gltf.spill_file import BUFFER_VIEW_ALIGNMENT
+from gltf_combiner.cache import OdinCache
+from gltf_combiner.extensions import ConversionOptions, SupercellOdinGLTF
 from gltf_combiner.extensions.flatbuffer.deserializer import deserialize_glb_json
-from streams import ByteReader, ByteWriter
+
+# Path to a glTF file or its already read data
+type FileSource = os.PathLike[str] | str | bytes
+# Decoded glTF JSON data and binary chunk data
+type Document = tuple[dict[str, Any], SegmentedBuffer]
 
 JSON_REPLACEMENT_LIST = ("textures", "images")
 JSON_SKIP_LIST = ("buffers", "skins", "nodes", "scenes", "meshes")
 
+# Node transform components and their values when a node doesn't set them
+DEFAULT_NODE_TRANSFORM = {
+    "translation": [0.0, 0.0, 0.0],
+    "rotation": [0.0, 0.0, 0.0, 1.0],
+    "scale": [1.0, 1.0, 1.0],
+}
+
+
+@dataclass(frozen=True)
+class _DataOffsets:
+    """Position in joined data which animation data follow."""
+
+    # Buffer of the animation data and their offset in it
+    buffer_index: int
+    byte_offset: int
+    buffer_view_count: int
+    accessor_count: int
+
+
+@dataclass
+class PreparedGeometry:
+    """
+    Geometry document prepared for combining with accessor component types
+    patched and texcoords fixed. Combining doesn't change it, so it can be
+    combined with any number of animations.
+    """
+
+    json: dict[str, Any]
+    data: SegmentedBuffer
+    # Geometry nodes by name, see `_build_node_name_index`
+    node_name_index: dict[str, int]
+    # Encoded geometry sections, filled by `_write_joined_json` when combining
+    fragments: dict[str, bytes] = field(default_factory=dict)
+
+
+@dataclass
+class SplitGlTF:
+    """
+    Geometry buffer, its images and glTF files of animations which
+    reference them, written as separate files.
+    """
+
+    geometry_data: SegmentedBuffer
+    # Image data by file name
+    images: dict[str, Segment]
+    # Encoded JSON and buffer data of animation files by animation name
+    animations: dict[str, tuple[bytes, SegmentedBuffer]]
+
+    @traced("gltf.write")
+    def write(self, geometry_filepath: os.PathLike[str] | str) -> None:
+        """
+        Writes the geometry buffer to `geometry_filepath`, and images and
+        animation files next to it.
+        """
+
+        directory = Path(geometry_filepath).parent
+        files: list[tuple[Path, SegmentedBuffer]] = [
+            (Path(geometry_filepath), self.geometry_data),
+            *(
+                (directory / name, SegmentedBuffer(data))
+                for name, data in self.images.items()
+            ),
+        ]
+        for name, (json_data, data) in self.animations.items():
+            files.append((directory / f"{name}.gltf", SegmentedBuffer(json_data)))
+            files.append((directory / f"{name}.bin", data))
+
+        for filepath, data in files:
+            with open(filepath, "wb") as file:
+                data.write_to(file)
+
+        if current_span := get_current_span():
+            current_span.add(
+                byte_count=sum(len(data) for _, data in files),
+                element_count=len(files),
+            )
+
+
+def prepare_geometry(
+    geometry_filepath: FileSource,
+    *,
+    fix_texcoords: bool = False,
+    cache: OdinCache | None = None,
+    options: ConversionOptions | None = None,
+) -> PreparedGeometry:
+    """
+    Prepares the geometry for combining. It can be passed to the build
+    functions instead of the geometry file to combine it with many animations
+    without decoding it again, `fix_texcoords` is ignored for it then.
+    """
+
+    return _prepare_geometry(
+        _remove_odin(geometry_filepath, cache, options), fix_texcoords=fix_texcoords
+    )
+
 
 def build_combined_gltf(
-    geometry_filepath: os.PathLike[str] | str,
-    animation_filepath: os.PathLike[str] | str,
+    geometry_filepath: FileSource | PreparedGeometry,
+    animation_filepath: FileSource,
     *,
     fix_texcoords: bool = False,
+    cache: OdinCache | None = None,
+    options: ConversionOptions | None = None,
 ) -> GlTF:
-    geometry_gltf = SupercellOdinGLTF(GlTF.parse(geometry_filepath)).remove_odin()
-    animation_gltf = SupercellOdinGLTF(GlTF.parse(animation_filepath)).remove_odin()
-
-    return _build_combined_gltf(
-        geometry_gltf, animation_gltf, fix_texcoords=fix_texcoords
-    )
+    geometry = _get_prepared_geometry(geometry_filepath, fix_texcoords, cache, options)
+    animation = _remove_odin(animation_filepath, cache, options)
 
+    return _build_combined_gltf(geometry, animation)
 
-def rebuild_gltf(filepath: os.PathLike[str] | str, *, fix_texcoords: bool) -> GlTF:
-    geometry_gltf = SupercellOdinGLTF(GlTF.parse(filepath)).remove_odin()
 
-    geometry_json_chunk = geometry_gltf.get_chunk_by_type(JSON_CHUNK_TYPE)
-    geometry_flatbuffer_chunk = geometry_gltf.get_chunk_by_type(FLATBUFFER_CHUNK_TYPE)
-    geometry_bin_chunk = geometry_gltf.get_chunk_by_type(BIN_CHUNK_TYPE)
+def build_multi_clip_gltf(
+    geometry_filepath: FileSource | PreparedGeometry,
+    animation_filepaths: Mapping[str, FileSource],
+    *,
+    fix_texcoords: bool = False,
+    cache: OdinCache | None = None,
+    options: ConversionOptions | None = None,
+) -> GlTF:
+    """
+    Combines the geometry with every animation as a clip named by its key.
+    All clips share one copy of the geometry data.
+    """
+
+    geometry = _get_prepared_geometry(geometry_filepath, fix_texcoords, cache, options)
+    animations = {
+        name: _remove_odin(filepath, cache, options)
+        for name, filepath in animation_filepaths.items()
+    }
 
-    # Checking info chunks
-    assert geometry_json_chunk is not None or geometry_flatbuffer_chunk is not None
+    return _build_multi_clip_gltf(geometry, animations)
 
-    # Checking data chunks
-    assert geometry_bin_chunk is not None
 
-    geometry_json = (
-        geometry_json_chunk.json()
-        if geometry_json_chunk is not None
-        else deserialize_glb_json(geometry_flatbuffer_chunk.data)
+def build_split_gltf(
+    geometry_filepath: FileSource | PreparedGeometry,
+    animation_filepaths: Mapping[str, FileSource],
+    geometry_uri: str,
+    *,
+    fix_texcoords: bool = False,
+    cache: OdinCache | None = None,
+    options: ConversionOptions | None = None,
+) -> SplitGlTF:
+    """
+    Combines the geometry with every animation into a glTF file named by its
+    key. The files reference the geometry buffer saved once at `geometry_uri`
+    and their own animation buffers. Embedded images of the geometry are
+    saved as files next to the geometry buffer.
+    """
+
+    geometry = _get_prepared_geometry(geometry_filepath, fix_texcoords, cache, options)
+
+    return _build_split_gltf(
+        geometry,
+        (
+            (name, _remove_odin(filepath, cache, options))
+            for name, filepath in animation_filepaths.items()
+        ),
+        geometry_uri,
     )
 
+
+def rebuild_gltf(
+    filepath: FileSource,
+    *,
+    fix_texcoords: bool,
+    cache: OdinCache | None = None,
+    options: ConversionOptions | None = None,
+) -> GlTF:
+    geometry_json, geometry_data = _remove_odin(filepath, cache, options)
+
     if fix_texcoords:
-        geometry_bin_chunk.data = _fix_texcoord(geometry_json, geometry_bin_chunk.data)
+        _fix_texcoord(geometry_json, geometry_data)
 
     new_json_chunk = Chunk(JSON_CHUNK_TYPE, orjson.dumps(geometry_json))
-    new_bin_chunk = Chunk(BIN_CHUNK_TYPE, geometry_bin_chunk.data)
+    new_bin_chunk = Chunk(BIN_CHUNK_TYPE, geometry_data)
 
     return GlTF(new_json_chunk, new_bin_chunk)
 
 
-def _build_combined_gltf(
-    geometry_gltf: GlTF, animation_gltf: GlTF, *, fix_texcoords: bool
-) -> GlTF:
-    geometry_json_chunk = geometry_gltf.get_chunk_by_type(JSON_CHUNK_TYPE)
-    geometry_flatbuffer_chunk = geometry_gltf.get_chunk_by_type(FLATBUFFER_CHUNK_TYPE)
-    geometry_bin_chunk = geometry_gltf.get_chunk_by_type(BIN_CHUNK_TYPE)
+def rebuild_gltf_streamed(
+    filepath: os.PathLike[str] | str,
+    output_filepath: os.PathLike[str] | str,
+    *,
+    fix_texcoords: bool,
+    spill_directory: os.PathLike[str] | str | None = None,
+    options: ConversionOptions | None = None,
+) -> None:
+    """
+    Rebuilds a file the same way as `rebuild_gltf`, but in bounded memory.
+    The input file is memory mapped and produced buffer views are written
+    to a temporary spill file in `spill_directory` one mesh or animation
+    at a time. The output is written once its layout is final, so peak
+    memory depends on the largest mesh instead of the file size. Data of
+    buffer views dropped by optimizations are removed from the spill file
+    before that.
+    """
+
+    with SpillFile(spill_directory) as spill_file, GlTF.map(filepath) as gltf:
+        geometry_json = SupercellOdinGLTF(
+            gltf, spill_file=spill_file, options=options
+        ).remove_odin_spilled()
+
+        if fix_texcoords:
+            _fix_spilled_texcoord(geometry_json, spill_file)
+
+        write_streamed_file(
+            output_filepath,
+            Chunk(JSON_CHUNK_TYPE, orjson.dumps(geometry_json)),
+            spill_file,
+        )
+
+
+def _remove_odin(
+    filepath: FileSource,
+    cache: OdinCache | None,
+    options: ConversionOptions | None = None,
+) -> Document:
+    """
+    Returns the document with Odin format removed. The JSON data are passed
+    on decoded, so they are encoded only once when the result is written,
+    or also for the cache entry if there is a cache.
+    """
+
+    file_data = filepath if isinstance(filepath, bytes) else get_file_data(filepath)
+    if cache is None:
+        return SupercellOdinGLTF(
+            GlTF.from_bytes(file_data), options=options
+        ).remove_odin_document()
+
+    key = cache.make_key(file_data, repr(options or ConversionOptions()))
+    gltf = cache.get(key)
+    if gltf is not None:
+        return _read_document(gltf)
+
+    json_data, data = SupercellOdinGLTF(
+        GlTF.from_bytes(file_data), options=options
+    ).remove_odin_document()
+    cache.put(
+        key,
+        GlTF(
+            Chunk(JSON_CHUNK_TYPE, orjson.dumps(json_data)),
+            Chunk(BIN_CHUNK_TYPE, data),
+        ),
+    )
+
+    return json_data, data
+
+
+def _get_prepared_geometry(
+    geometry: FileSource | PreparedGeometry,
+    fix_texcoords: bool,
+    cache: OdinCache | None,
+    options: ConversionOptions | None,
+) -> PreparedGeometry:
+    if isinstance(geometry, PreparedGeometry):
+        return geometry
 
-    animation_json_chunk = animation_gltf.get_chunk_by_type(JSON_CHUNK_TYPE)
-    animation_flatbuffer_chunk = animation_gltf.get_chunk_by_type(FLATBUFFER_CHUNK_TYPE)
-    animation_bin_chunk = animation_gltf.get_chunk_by_type(BIN_CHUNK_TYPE)
+    return prepare_geometry(
+        geometry, fix_texcoords=fix_texcoords, cache=cache, options=options
+    )
+
+
+def _read_document(gltf: GlTF) -> Document:
+    json_chunk = gltf.get_chunk_by_type(JSON_CHUNK_TYPE)
+    flatbuffer_chunk = gltf.get_chunk_by_type(FLATBUFFER_CHUNK_TYPE)
+    bin_chunk = gltf.get_chunk_by_type(BIN_CHUNK_TYPE)
 
     # Checking info chunks
-    assert geometry_json_chunk is not None or geometry_flatbuffer_chunk is not None
-    assert animation_json_chunk is not None or animation_flatbuffer_chunk is not None
+    assert json_chunk is not None or flatbuffer_chunk is not None
 
     # Checking data chunks
-    assert geometry_bin_chunk is not None
-    assert animation_bin_chunk is not None
+    assert bin_chunk is not None
 
-    geometry_json = (
-        geometry_json_chunk.json()
-        if geometry_json_chunk
-        else deserialize_glb_json(geometry_flatbuffer_chunk.data)
+    json_data = (
+        json_chunk.json()
+        if json_chunk is not None
+        else deserialize_glb_json(flatbuffer_chunk.data)
     )
-    animation_json = (
-        animation_json_chunk.json()
-        if animation_json_chunk
-        else deserialize_glb_json(animation_flatbuffer_chunk.data)
+
+    return json_data, SegmentedBuffer(bin_chunk.data)
+
+
+def _prepare_geometry(geometry: Document, *, fix_texcoords: bool) -> PreparedGeometry:
+    """
+    Prepares the geometry document for combining. The document is changed in
+    place, so it must be prepared only once.
+    """
+
+    geometry_json, geometry_data = geometry
+
+    _patch_accessor_component_types(geometry_json)
+    if fix_texcoords:
+        _fix_texcoord(geometry_json, geometry_data)
+
+    return PreparedGeometry(
+        geometry_json, geometry_data, _build_node_name_index(geometry_json)
     )
 
+
+@traced("combine")
+def _build_combined_gltf(geometry: PreparedGeometry, animation: Document) -> GlTF:
+    """
+    Combines the prepared geometry with the animation document. Neither of
+    them is changed, so the geometry can be combined with other animations.
+    """
+
+    geometry_json, geometry_data = geometry.json, geometry.data
+    animation_json, animation_data = animation
+
     if "animations" not in animation_json:
         raise AnimationNotFoundException("animations node wasn't found")
 
-    _update_json(geometry_json, animation_json)
-    if fix_texcoords:
-        geometry_bin_chunk.data = _fix_texcoord(geometry_json, geometry_bin_chunk.data)
+    animation_json, nodes_mapping = _remap_animation_json(geometry, animation_json)
+
+    overrides: dict[str, Any] = {
+        "buffers": _get_joined_buffers(
+            geometry_json, animation_json["buffers"][0]["byteLength"]
+        )
+    }
+    rest_nodes = _get_rest_nodes(
+        geometry_json,
+        _get_rest_components(geometry_json, animation_json, nodes_mapping),
+    )
+    if rest_nodes is not None:
+        overrides["nodes"] = rest_nodes
+
+    new_json_chunk = Chunk(
+        JSON_CHUNK_TYPE,
+        _write_joined_json(
+            geometry_json,
+            animation_json,
+            overrides,
+            geometry.fragments,
+        ),
+    )
+    new_bin_chunk = Chunk(BIN_CHUNK_TYPE, geometry_data + animation_data)
+
+    if current_span := get_current_span():
+        current_span.add(
+            byte_count=len(new_json_chunk) + len(new_bin_chunk),
+            element_count=len(animation_json["animations"]),
+        )
+
+    return GlTF(new_json_chunk, new_bin_chunk)
+
+
+@traced("combine")
+def _build_multi_clip_gltf(
+    geometry: PreparedGeometry, animations: Mapping[str, Document]
+) -> GlTF:
+    """
+    Combines the prepared geometry with animation documents, each of them
+    a clip named by its key. Clips with nothing to combine are skipped.
+    The documents aren't changed.
+
+    Components which Odin animations store as node rest values are added to
+    their clips as channels with a single keyframe, as the clips can't share
+    rest values of the geometry nodes.
+    """
+
+    geometry_json, geometry_data = geometry.json, geometry.data
+    geometry_buffer_length = geometry_json["buffers"][0]["byteLength"]
+
+    # Animation sections of all clips, following the geometry ones
+    clips_json: dict[str, list] = {"bufferViews": [], "accessors": [], "animations": []}
+    clips_data = SegmentedBuffer()
+
+    for name, (animation_json, animation_data) in animations.items():
+        offsets = _DataOffsets(
+            0,
+            geometry_buffer_length + len(clips_data),
+            len(geometry_json["bufferViews"]) + len(clips_json["bufferViews"]),
+            len(geometry_json["accessors"]) + len(clips_json["accessors"]),
+        )
 
-    joined_dictionary = _join_dictionaries(geometry_json, animation_json)
+        try:
+            if "animations" not in animation_json:
+                raise AnimationNotFoundException("animations node wasn't found")
 
-    new_json_chunk = Chunk(JSON_CHUNK_TYPE, orjson.dumps(joined_dictionary))
-    new_bin_chunk = Chunk(
-        BIN_CHUNK_TYPE, geometry_bin_chunk.data + animation_bin_chunk.data
+            animation_json, nodes_mapping = _remap_animation_json(
+                geometry, animation_json, offsets=offsets
+            )
+        except (AnimationNotFoundException, AllAnimationChannelsDeletedException):
+            print(f"No animation in the clip {name!r}. Clip Skipped!")
+            continue
+
+        clips_json["bufferViews"].extend(animation_json["bufferViews"])
+        clips_json["accessors"].extend(animation_json["accessors"])
+        clips_data.append(animation_data)
+
+        animations_list: list[dict] = animation_json["animations"]
+        for index, animation in enumerate(animations_list):
+            animation["name"] = name if len(animations_list) == 1 else f"{name}_{index}"
+
+        _add_rest_channels(
+            geometry_json,
+            (clips_json, clips_data),
+            animations_list,
+            _get_rest_components(geometry_json, animation_json, nodes_mapping),
+        )
+        clips_json["animations"].extend(animations_list)
+
+    if len(clips_json["animations"]) == 0:
+        raise AnimationNotFoundException("no clip has animations to combine")
+
+    new_json_chunk = Chunk(
+        JSON_CHUNK_TYPE,
+        _write_joined_json(
+            geometry_json,
+            clips_json,
+            {"buffers": _get_joined_buffers(geometry_json, len(clips_data))},
+            geometry.fragments,
+        ),
     )
+    new_bin_chunk = Chunk(BIN_CHUNK_TYPE, geometry_data + clips_data)
+
+    if current_span := get_current_span():
+        current_span.add(
+            byte_count=len(new_json_chunk) + len(new_bin_chunk),
+            element_count=len(clips_json["animations"]),
+        )
 
     return GlTF(new_json_chunk, new_bin_chunk)
 
 
-def _fix_texcoord(geometry_json: dict, data: bytes) -> bytes:
-    buffer_bytes: list[bytearray] = []
+@traced("combine")
+def _build_split_gltf(
+    geometry: PreparedGeometry,
+    animations: Iterable[tuple[str, Document]],
+    geometry_uri: str,
+) -> SplitGlTF:
+    """
+    Combines the prepared geometry with animation documents into separate
+    glTF files. Animations with nothing to combine are skipped. The documents
+    aren't changed.
+    """
+
+    image_name = Path(unquote(geometry_uri)).stem
+    geometry_json, geometry_data, images = _get_external_images(
+        geometry.json, geometry.data, image_name
+    )
+    geometry = PreparedGeometry(geometry_json, geometry_data, geometry.node_name_index)
+
+    # Geometry buffer goes first, animation data follow in buffers of their own
+    geometry_buffer = {"uri": geometry_uri, "byteLength": len(geometry_data)}
+
+    split_gltf = SplitGlTF(geometry_data, images, {})
+    for name, (animation_json, animation_data) in animations:
+        try:
+            if "animations" not in animation_json:
+                raise AnimationNotFoundException("animations node wasn't found")
+
+            animation_json, nodes_mapping = _remap_animation_json(
+                geometry,
+                animation_json,
+                offsets=_DataOffsets(
+                    len(geometry_json["buffers"]),
+                    0,
+                    len(geometry_json["bufferViews"]),
+                    len(geometry_json["accessors"]),
+                ),
+            )
+        except (AnimationNotFoundException, AllAnimationChannelsDeletedException):
+            print(f"No animation in the file {name!r}. File Skipped!")
+            continue
+
+        overrides: dict[str, Any] = {
+            "buffers": [
+                geometry_buffer,
+                {"uri": quote(f"{name}.bin"), "byteLength": len(animation_data)},
+            ]
+        }
+        rest_nodes = _get_rest_nodes(
+            geometry_json,
+            _get_rest_components(geometry_json, animation_json, nodes_mapping),
+        )
+        if rest_nodes is not None:
+            overrides["nodes"] = rest_nodes
+
+        split_gltf.animations[name] = (
+            _write_joined_json(
+                geometry_json, animation_json, overrides, geometry.fragments
+            ),
+            animation_data,
+        )
+
+    if len(split_gltf.animations) == 0:
+        raise AnimationNotFoundException("no file has animations to combine")
+
+    if current_span := get_current_span():
+        current_span.add(
+            byte_count=len(geometry_data)
+            + sum(
+                len(json_data) + len(data)
+                for json_data, data in split_gltf.animations.values()
+            ),
+            element_count=len(split_gltf.animations),
+        )
+
+    return split_gltf
+
+
+def _get_external_images(
+    geometry_json: dict, geometry_data: SegmentedBuffer, name: str
+) -> tuple[dict, SegmentedBuffer, dict[str, Segment]]:
+    """
+    Moves images embedded in buffer views to files named after `name` and
+    their indices. Returns the geometry JSON and data without the images and
+    image data by file name. The geometry JSON is copied if changed, and
+    other buffer views keep their data aligned.
+    """
+
+    images: list[dict] = geometry_json.get("images", [])
+    image_buffer_views = {
+        image["bufferView"] for image in images if "bufferView" in image
+    }
+    if len(image_buffer_views) == 0:
+        return geometry_json, geometry_data, {}
+
+    # Remaining buffer views are moved together, keeping them aligned
+    buffer_views: list[dict] = []
+    buffer_view_mapping: dict[int, int] = {}
+    data = SegmentedBuffer()
+    for index, buffer_view in enumerate(geometry_json["bufferViews"]):
+        if index in image_buffer_views:
+            continue
+
+        assert buffer_view["buffer"] == 0
+        data.append(bytes(-len(data) % BUFFER_VIEW_ALIGNMENT))
+
+        buffer_view_mapping[index] = len(buffer_views)
+        buffer_views.append({**buffer_view, "byteOffset": len(data)})
+        data.append(
+            geometry_data.read(
+                buffer_view.get("byteOffset", 0), buffer_view["byteLength"]
+            )
+        )
+
+    data.append(bytes(-len(data) % BUFFER_VIEW_ALIGNMENT))
+
+    accessors: list[dict] = []
+    for accessor in geometry_json["accessors"]:
+        accessor = dict(accessor)
+        if "bufferView" in accessor:
+            accessor["bufferView"] = buffer_view_mapping[accessor["bufferView"]]
+        accessors.append(accessor)
+
+    image_data: dict[str, Segment] = {}
+    external_images: list[dict] = []
+    for index, image in enumerate(images):
+        if "bufferView" not in image:
+            external_images.append(image)
+            continue
+
+        buffer_view = geometry_json["bufferViews"][image["bufferView"]]
+        extension = mimetypes.guess_extension(image.get("mimeType", "")) or ".bin"
+        filename = f"{name}_{index}{extension}"
+        image_data[filename] = geometry_data.read(
+            buffer_view.get("byteOffset", 0), buffer_view["byteLength"]
+        )
+
+        external_image = {
+            key: value for key, value in image.items() if key != "bufferView"
+        }
+        external_image["uri"] = quote(filename)
+        external_images.append(external_image)
+
+    external_json = dict(geometry_json)
+    external_json["bufferViews"] = buffer_views
+    external_json["accessors"] = accessors
+    external_json["images"] = external_images
+    external_json["buffers"] = [{"byteLength": len(data)}]
+
+    return external_json, data, image_data
+
+
+@traced("fix_texcoord")
+def _fix_texcoord(geometry_json: dict, data: SegmentedBuffer) -> None:
+    """Fixes texcoords replacing their segments of the data."""
+
     for buffer in geometry_json["buffers"]:
         if len(buffer) > 1:
             raise Exception("unsupported (not tested yet)")
 
-        buffer_offset = buffer.get("byteOffset", 0)
-        buffer_length = buffer["byteLength"]
+    for accessor_id, offset, length in _iter_texcoord_data(geometry_json):
+        fixed_data = _get_fixed_texcoord_data(
+            geometry_json, accessor_id, data.read(offset, length)
+        )
+        data.write(offset, fixed_data)
+
 
-        buffer_bytes.append(
-            bytearray(data[buffer_offset : buffer_offset + buffer_length])
+@traced("fix_texcoord")
+def _fix_spilled_texcoord(geometry_json: dict, spill_file: SpillFile) -> None:
+    for accessor_id, offset, length in _iter_texcoord_data(geometry_json):
+        fixed_data = _get_fixed_texcoord_data(
+            geometry_json, accessor_id, spill_file.read(offset, length)
         )
+        spill_file.write(offset, fixed_data)
 
-    for mesh in geometry_json["meshes"]:
-        primitive: dict[str, dict[str, int]]
-        for primitive in mesh["primitives"]:
-            for attribute_name, accessor_id in primitive["attributes"].items():
-                if attribute_name.startswith("TEXCOORD_"):
-                    _fix_texcoord_accessor(geometry_json, buffer_bytes, accessor_id)
 
-    updated_buffer = bytearray()
-    for i, buffer in enumerate(geometry_json["buffers"]):
-        buffer_offset = buffer.get("byteOffset", 0)
-        buffer_length = buffer["byteLength"]
+def _iter_texcoord_data(geometry_json: dict) -> Iterator[tuple[int, int, int]]:
+    """
+    Marks texcoord accessors normalized and yields accessor index, offset and
+    length of their buffer view data to fix. Accessors reading the same data
+    as an already yielded one are skipped, so the data are fixed only once.
+    """
 
-        updated_buffer[buffer_offset : buffer_offset + buffer_length] = buffer_bytes[i]
+    fixed_data: set[tuple[int, int]] = set()
+    for accessor_id in _iter_texcoord_accessors(geometry_json):
+        accessor: dict = geometry_json["accessors"][accessor_id]
+        accessor["normalized"] = True
 
-    return updated_buffer
+        data_key = (accessor["bufferView"], accessor.get("byteOffset", 0))
+        if data_key in fixed_data:
+            continue
+        fixed_data.add(data_key)
 
+        buffer_index, offset, length = _get_accessor_range(geometry_json, accessor_id)
+        assert buffer_index == 0
 
-def _fix_texcoord_accessor(
-    geometry_json: dict[str, dict], buffer_bytes: list[bytes], accessor_id: int
-) -> None:
-    def fix_value_u_int16(read_buffer: ByteReader, write_buffer: ByteWriter) -> None:
-        write_buffer.write_u_int16(round(read_buffer.read_u_int16() * 65535 / 4096))
+        yield accessor_id, offset, length
 
-    def fix_value_int16(read_buffer: ByteReader, write_buffer: ByteWriter) -> None:
-        write_buffer.write_int16(round(read_buffer.read_int16() * 32678 / 4096))
 
-    fix_functions = {
-        5122: fix_value_int16,
-        5123: fix_value_u_int16,
-    }
+def _iter_texcoord_accessors(geometry_json: dict) -> Iterator[int]:
+    """
+    Yields every texcoord accessor once, as primitives can share them, such
+    as after deduplication.
+    """
+
+    accessor_ids: set[int] = set()
+    for mesh in geometry_json["meshes"]:
+        primitive: dict[str, dict[str, int]]
+        for primitive in mesh.get("primitives", []):
+            for attribute_name, accessor_id in primitive["attributes"].items():
+                if (
+                    attribute_name.startswith("TEXCOORD_")
+                    and accessor_id not in accessor_ids
+                ):
+                    accessor_ids.add(accessor_id)
+                    yield accessor_id
+
+
+def _get_accessor_range(
+    geometry_json: dict[str, dict], accessor_id: int
+) -> tuple[int, int, int]:
+    """
+    Returns buffer index, offset and length of the buffer view of accessor
+    data. The view can hold data of other accessors interleaved with them.
+    """
 
     accessor: dict = geometry_json["accessors"][accessor_id]
-    accessor["normalized"] = True
 
     buffer_view_index = accessor["bufferView"]
     buffer_view = geometry_json["bufferViews"][buffer_view_index]
-    buffer_view_offset = buffer_view["byteOffset"]
-    buffer_view_length = buffer_view["byteLength"]
 
-    accessor_offset = accessor.get("byteOffset", 0)
+    return (
+        buffer_view["buffer"],
+        buffer_view["byteOffset"],
+        buffer_view["byteLength"],
+    )
 
-    buffer_index = buffer_view["buffer"]
-    offset = buffer_view_offset + accessor_offset
-    buffer_view_bytearray = buffer_bytes[buffer_index][
-        offset : offset + buffer_view_length
-    ]
 
-    buffer_reader = ByteReader(buffer_view_bytearray, "little")
+def _get_fixed_texcoord_data(
+    geometry_json: dict[str, dict], accessor_id: int, data: Segment
+) -> memoryview:
+    """
+    Returns buffer view data of the accessor with its texcoords fixed and
+    other data of the view kept.
+    """
+
+    # Component type: (value type, multiplier)
+    fix_parameters = {
+        5122: (np.int16, 32678),
+        5123: (np.uint16, 65535),
+    }
+
+    accessor: dict = geometry_json["accessors"][accessor_id]
 
     component_type = accessor["componentType"]
-    fix_value = fix_functions.get(component_type, None)
-    if fix_value is None:
+    fix_parameter = fix_parameters.get(component_type, None)
+    if fix_parameter is None:
         raise Exception(f"Accessor component type is not supported: {component_type}")
 
-    fixed_buffer = ByteWriter("little")
-    for i in range(accessor["count"]):
-        fix_value(buffer_reader, fixed_buffer)
-        fix_value(buffer_reader, fixed_buffer)
+    value_type, multiplier = fix_parameter
+    dtype = np.dtype(value_type).newbyteorder("<")
+    buffer_view = geometry_json["bufferViews"][accessor["bufferView"]]
+    stride = buffer_view.get("byteStride", dtype.itemsize * 2)
+
+    def get_values(buffer: Segment) -> npt.NDArray[np.integer]:
+        return np.ndarray(
+            (accessor["count"], 2),
+            dtype,
+            buffer,
+            offset=accessor.get("byteOffset", 0),
+            strides=(stride, dtype.itemsize),
+        )
 
-    buffer_bytes[buffer_index][offset : offset + len(fixed_buffer.buffer)] = (
-        fixed_buffer.buffer
-    )
+    fixed_values = np.round(get_values(data).astype(np.float64) * multiplier / 4096)
+
+    value_info = np.iinfo(value_type)
+    if fixed_values.size > 0 and (
+        fixed_values.min() < value_info.min or fixed_values.max() > value_info.max
+    ):
+        raise Exception(f"Texcoord values are out of range in accessor {accessor_id}")
+
+    fixed_data = bytearray(data)
+    get_values(fixed_data)[:] = fixed_values.astype(value_type)
+
+    return memoryview(fixed_data)
 
 
 def _patch_accessor_component_types(data: dict):
@@ -188,65 +756,148 @@ def _patch_accessor_component_types(data: dict):
         accessor["componentType"] &= 0x0000FFFF
 
 
-def _update_json(geometry_json: dict, animation_json: dict) -> None:
-    geometry_buffer_length = geometry_json["buffers"][0]["byteLength"]
-    geometry_buffer_view_count = len(geometry_json["bufferViews"])
-    geometry_buffer_accessor_count = len(geometry_json["accessors"])
-    nodes_mapping = _get_nodes_mapping(geometry_json, animation_json)
+def _remap_animation_json(
+    geometry: PreparedGeometry,
+    animation_json: dict,
+    *,
+    offsets: _DataOffsets | None = None,
+) -> tuple[dict, dict[int, int]]:
+    """
+    Returns the animation JSON with buffer views, accessors and animations
+    remapped onto the geometry, and mapping of animation node indices to
+    geometry ones. Animation data follow `offsets`, by default they follow
+    the geometry data in its buffer. Remapped sections are copies, so the
+    animation JSON isn't changed.
+    """
+
+    geometry_json = geometry.json
+    if offsets is None:
+        offsets = _DataOffsets(
+            0,
+            geometry_json["buffers"][0]["byteLength"],
+            len(geometry_json["bufferViews"]),
+            len(geometry_json["accessors"]),
+        )
+    nodes_mapping = _get_nodes_mapping(geometry.node_name_index, animation_json)
 
-    _patch_accessor_component_types(geometry_json)
-    _patch_accessor_component_types(animation_json)
-    _update_buffer(geometry_json, animation_json["buffers"][0]["byteLength"])
-    _update_buffer_views(animation_json, geometry_buffer_length)
-    _update_accessors(animation_json, geometry_buffer_view_count)
-    _update_animations(animation_json, geometry_buffer_accessor_count, nodes_mapping)
-
-
-def _update_buffer(geometry_json: dict, animation_buffer_length: int) -> None:
-    _add_to_dict_value(
-        geometry_json["buffers"][0],
-        "byteLength",
-        animation_buffer_length,
+    remapped_json = dict(animation_json)
+    remapped_json["bufferViews"] = _get_updated_buffer_views(
+        animation_json["bufferViews"], offsets.buffer_index, offsets.byte_offset
+    )
+    remapped_json["accessors"] = _get_updated_accessors(
+        animation_json["accessors"], offsets.buffer_view_count
     )
+    remapped_json["animations"] = _get_updated_animations(
+        animation_json["animations"], offsets.accessor_count, nodes_mapping
+    )
+
+    return remapped_json, nodes_mapping
 
 
-def _update_buffer_views(animation_json: dict, geometry_buffer_length: int) -> None:
-    for buffer_view in animation_json["bufferViews"]:
-        _add_to_dict_value(buffer_view, "byteOffset", geometry_buffer_length)
+def _get_joined_buffers(
+    geometry_json: dict, animation_buffer_length: int
+) -> list[dict]:
+    # Geometry buffer entry is copied, so the geometry JSON stays untouched
+    buffers: list[dict] = list(geometry_json["buffers"])
+    buffers[0] = dict(buffers[0])
+    _add_to_dict_value(buffers[0], "byteLength", animation_buffer_length)
 
+    return buffers
 
-def _update_accessors(animation_json: dict, geometry_buffer_view_count: int) -> None:
-    for accessor in animation_json["accessors"]:
+
+def _get_updated_buffer_views(
+    buffer_views: list[dict], buffer_index: int, byte_offset: int
+) -> list[dict]:
+    """
+    Returns copies of buffer views of every animation buffer moved to the
+    given buffer and offset.
+    """
+
+    updated_buffer_views: list[dict] = []
+    for buffer_view in buffer_views:
+        buffer_view = dict(buffer_view)
+        if buffer_index != 0:
+            _add_to_dict_value(buffer_view, "buffer", buffer_index)
+        _add_to_dict_value(buffer_view, "byteOffset", byte_offset)
+
+        updated_buffer_views.append(buffer_view)
+
+    return updated_buffer_views
+
+
+def _get_updated_accessors(
+    accessors: list[dict], geometry_buffer_view_count: int
+) -> list[dict]:
+    updated_accessors: list[dict] = []
+    for accessor in accessors:
+        accessor = dict(accessor)
+        # Remove Supercell's mark of accessor type
+        accessor["componentType"] &= 0x0000FFFF
         _add_to_dict_value(accessor, "bufferView", geometry_buffer_view_count)
 
+        updated_accessors.append(accessor)
+
+    return updated_accessors
+
+
+def _build_node_name_index(geometry_json: dict) -> dict[str, int]:
+    """
+    Maps every geometry node name to the first node with that name which
+    doesn't hold a mesh. Build it once per geometry and reuse it for every
+    animation combined with that geometry.
+    """
+
+    node_name_index: dict[str, int] = {}
+
+    geometry_nodes: list[dict[str, object]] = geometry_json["nodes"]
+    for node_index, node in enumerate(geometry_nodes):
+        if "mesh" in node:
+            continue
+
+        name = node.get("name")
+        if name is None:
+            continue
+
+        if name in node_name_index:
+            print(
+                f"Duplicate node name {name!r} in geometry (nodes "
+                f"{node_name_index[name]} and {node_index}), "
+                f"node {node_name_index[name]} will be used."
+            )
+            continue
+
+        node_name_index[name] = node_index
+
+    return node_name_index
+
 
 def _get_nodes_mapping(
-    geometry_json: dict,
+    node_name_index: dict[str, int],
     animation_json: dict,
 ) -> dict[int, int]:
     nodes_mapping: dict[int, int] = {}
 
-    geometry_nodes: list[dict[str, object]] = list(geometry_json["nodes"])
     animation_nodes: list[dict[str, object]] = animation_json["nodes"]
     for animation_node_index, animation_node in enumerate(animation_nodes):
-        for geometry_node_index, geometry_node in enumerate(geometry_nodes):
-            if (
-                geometry_node["name"] == animation_node["name"]
-                and "mesh" not in geometry_node
-            ):
-                nodes_mapping[animation_node_index] = geometry_node_index
-                break
+        geometry_node_index = node_name_index.get(animation_node.get("name"))
+        if geometry_node_index is not None:
+            nodes_mapping[animation_node_index] = geometry_node_index
 
     return nodes_mapping
 
 
-def _update_animations(
-    animation_json: dict,
+def _get_updated_animations(
+    animations: list[dict],
     geometry_buffer_accessor_count: int,
     nodes_mapping: dict[int, int],
-) -> None:
-    for animation in animation_json["animations"]:
-        for sampler in animation["samplers"]:
+) -> list[dict]:
+    updated_animations: list[dict] = []
+    for animation in animations:
+        animation = dict(animation)
+        animation["samplers"] = samplers = [
+            dict(sampler) for sampler in animation["samplers"]
+        ]
+        for sampler in samplers:
             _add_to_dict_value(sampler, "input", geometry_buffer_accessor_count)
             _add_to_dict_value(sampler, "output", geometry_buffer_accessor_count)
 
@@ -261,33 +912,230 @@ def _update_animations(
             if deleted_channel_count == len(channels):
                 raise AllAnimationChannelsDeletedException()
 
-            animation["channels"] = filtered_channels
-
             print(
                 f"Some animation channels ({deleted_channel_count}) are deleted... "
                 f"{len(filtered_channels)} out of {len(channels)} left."
             )
 
-        for channel in filtered_channels:
-            channel["target"]["node"] = nodes_mapping[channel["target"]["node"]]
+        animation["channels"] = [
+            {
+                **channel,
+                "target": {
+                    **channel["target"],
+                    "node": nodes_mapping[channel["target"]["node"]],
+                },
+            }
+            for channel in filtered_channels
+        ]
+
+        updated_animations.append(animation)
+
+    return updated_animations
+
+
+def _get_rest_components(
+    geometry_json: dict, animation_json: dict, nodes_mapping: dict[int, int]
+) -> dict[tuple[int, str], list[float]]:
+    """
+    Returns transform components of the animation nodes, by geometry node
+    index and path, which the animation doesn't animate and the geometry
+    nodes don't match. Odin animations store components that don't change
+    as node rest values.
+    """
+
+    animated_components = {
+        (channel["target"]["node"], channel["target"]["path"])
+        for animation in animation_json["animations"]
+        for channel in animation["channels"]
+    }
+
+    geometry_nodes: list[dict] = geometry_json["nodes"]
+    animation_nodes: list[dict] = animation_json["nodes"]
+    rest_components: dict[tuple[int, str], list[float]] = {}
+    for animation_node_index, geometry_node_index in nodes_mapping.items():
+        animation_node = animation_nodes[animation_node_index]
+        geometry_node = geometry_nodes[geometry_node_index]
+
+        for path, default_value in DEFAULT_NODE_TRANSFORM.items():
+            value = animation_node.get(path)
+            if (
+                value is not None
+                and (geometry_node_index, path) not in animated_components
+                and geometry_node.get(path, default_value) != value
+            ):
+                rest_components[geometry_node_index, path] = value
+
+    return rest_components
+
 
+def _get_rest_nodes(
+    geometry_json: dict, rest_components: dict[tuple[int, str], list[float]]
+) -> list[dict] | None:
+    """
+    Returns geometry nodes with the rest components set, or None if there
+    are no components. Geometry nodes are copied when changed, so the
+    geometry JSON stays untouched.
+    """
 
-def _join_dictionaries(
+    if len(rest_components) == 0:
+        return None
+
+    rest_nodes: list[dict] = list(geometry_json["nodes"])
+    for (node_index, path), value in rest_components.items():
+        if rest_nodes[node_index] is geometry_json["nodes"][node_index]:
+            rest_nodes[node_index] = dict(rest_nodes[node_index])
+
+        rest_nodes[node_index][path] = value
+
+    return rest_nodes
+
+
+def _add_rest_channels(
+    geometry_json: dict,
+    clips: Document,
+    animations: list[dict],
+    rest_components: dict[tuple[int, str], list[float]],
+) -> None:
+    """
+    Adds the rest components to the animations as channels with a single
+    keyframe. Their data are appended to the clips document, which follows
+    the geometry one.
+    """
+
+    if len(rest_components) == 0:
+        return
+
+    clips_json, clips_data = clips
+    buffer_view_index = len(geometry_json["bufferViews"]) + len(
+        clips_json["bufferViews"]
+    )
+    input_index = len(geometry_json["accessors"]) + len(clips_json["accessors"])
+
+    # Keyframe time goes first, component values follow it
+    values: list[float] = [0.0]
+    clips_json["accessors"].append(
+        {
+            "bufferView": buffer_view_index,
+            "componentType": 5126,
+            "count": 1,
+            "type": "SCALAR",
+            "min": [0.0],
+            "max": [0.0],
+        }
+    )
+
+    # Targets of the channels and their output accessors
+    outputs: list[tuple[dict, int]] = []
+    for (node_index, path), value in rest_components.items():
+        outputs.append(
+            (
+                {"node": node_index, "path": path},
+                len(geometry_json["accessors"]) + len(clips_json["accessors"]),
+            )
+        )
+        clips_json["accessors"].append(
+            {
+                "bufferView": buffer_view_index,
+                "byteOffset": len(values) * 4,
+                "componentType": 5126,
+                "count": 1,
+                "type": f"VEC{len(value)}",
+            }
+        )
+        values.extend(value)
+
+    for animation in animations:
+        for target, output_index in outputs:
+            animation["channels"].append(
+                {"sampler": len(animation["samplers"]), "target": dict(target)}
+            )
+            animation["samplers"].append({"input": input_index, "output": output_index})
+
+    data = np.array(values, dtype=np.float32).tobytes()
+    clips_json["bufferViews"].append(
+        {
+            "buffer": 0,
+            "byteOffset": geometry_json["buffers"][0]["byteLength"] + len(clips_data),
+            "byteLength": len(data),
+        }
+    )
+    clips_data.append(data)
+
+
+def _iter_joined_sections(
     geometry_json: dict[str, Any], animation_json: dict[str, Any]
-) -> dict:
-    # TODO: check if deepcopy needed
-    joined_dict: dict[str, Any] = dict(**geometry_json)
+) -> Iterator[tuple[str, Any, Any]]:
+    """
+    Yields top-level sections of the joined JSON in output order as
+    `(key, geometry value, animation value)`. Only lists are joined: a value is
+    None when the section is taken from the other input alone, lists from both
+    inputs are concatenated.
+    """
+
+    for key, geometry_value in geometry_json.items():
+        animation_value = animation_json.get(key)
+
+        if not isinstance(animation_value, list):
+            yield key, geometry_value, None
+        elif geometry_value is None or key in JSON_REPLACEMENT_LIST:
+            yield key, None, animation_value
+        elif geometry_value == animation_value or key in JSON_SKIP_LIST:
+            yield key, geometry_value, None
+        else:
+            yield key, geometry_value, animation_value
+
+    for key, animation_value in animation_json.items():
+        if key not in geometry_json and isinstance(animation_value, list):
+            yield key, None, animation_value
+
+
+def _write_joined_json(
+    geometry_json: dict[str, Any],
+    animation_json: dict[str, Any],
+    overrides: dict[str, Any],
+    geometry_fragments: dict[str, bytes],
+) -> bytes:
+    """
+    Encodes the joined JSON straight into the JSON chunk data without building
+    the joined dictionary. Sections from `overrides` replace joined ones.
+
+    Geometry sections are spliced from `geometry_fragments`, which is filled
+    with encoded sections on the way, so one geometry can be combined with
+    many animations while its sections are encoded only once. The fragments
+    must be dropped if the geometry JSON changes.
+    """
+
+    writer = JsonWriter()
+
+    for key, geometry_value, animation_value in _iter_joined_sections(
+        geometry_json, animation_json
+    ):
+        if key in overrides:
+            writer.write(key, overrides[key])
+        elif animation_value is None:
+            writer.write_fragment(
+                key, _get_fragment(geometry_fragments, key, geometry_value)
+            )
+        elif geometry_value is None:
+            writer.write(key, animation_value)
+        else:
+            writer.write_array_fragments(
+                key,
+                (
+                    _get_fragment(geometry_fragments, key, geometry_value),
+                    orjson.dumps(animation_value),
+                ),
+            )
+
+    return writer.getvalue()
 
-    for key, value in animation_json.items():
-        if isinstance(value, list):
-            if joined_dict.get(key) is None or key in JSON_REPLACEMENT_LIST:
-                joined_dict[key] = value
-            elif joined_dict[key] == value or key in JSON_SKIP_LIST:
-                continue
 
-            joined_dict[key].extend(value)
+def _get_fragment(fragments: dict[str, bytes], key: str, value: Any) -> bytes:
+    fragment = fragments.get(key)
+    if fragment is None:
+        fragment = fragments[key] = orjson.dumps(value)
 
-    return joined_dict
+    return fragment
 
 
 def _add_to_dict_value(dictionary: dict, key: str, value_to_add: int) -> None:
@@ -1,7 +1,15 @@
 # Got from here https://github.com/Daniil-SV/Supercell-Flat-Converter and refactored
 
-__all__ = ["SupercellOdinGLTF", "deserialize_glb_json", "serialize_glb_json"]
+__all__ = [
+    "SupercellOdinGLTF",
+    "ConversionOptions",
+    "KeyframeTolerances",
+    "deserialize_glb_json",
+    "serialize_glb_json",
+]
 
 from gltf_combiner.extensions.flatbuffer import deserialize_glb_json
 from gltf_combiner.extensions.flatbuffer import serialize_glb_json
 from gltf_combiner.extensions.odin.odin import SupercellOdinGLTF
+from gltf_combiner.extensions.odin.options import ConversionOptions
+from gltf_combiner.extensions.odin.options import KeyframeTolerances
@@ -5,6 +5,8 @@ from typing import Any
 from flatbuffers import flexbuffers
 from flatbuffers.compat import import_numpy
 
+from gltf.profiling import get_current_span, traced
+
 from .common import pascal_case
 from .generated.glTF_generated import Root
 from .preprocessor import Preprocessor
@@ -100,6 +102,7 @@ def deserialize_flatbuffer(buffer: any, schema: dict) -> dict:
     return result
 
 
+@traced("flatbuffer.deserialize")
 def deserialize_glb_json(data: bytes) -> dict[str, Any]:
     """
     The function takes bytes of glTF FLA2 chunk data and returns a dictionary
@@ -110,6 +113,9 @@ def deserialize_glb_json(data: bytes) -> dict[str, Any]:
     :return: JSON data in python dict that can be used for serialization to usual json or using in python
     """
 
+    if current_span := get_current_span():
+        current_span.add(byte_count=len(data))
+
     flatbuffer = Root.GetRootAs(bytearray(data))
 
     output = deserialize_flatbuffer(flatbuffer, gltf_schema)
@@ -43,6 +43,8 @@ class OdinPackedReader(OdinAnimationReader):
         self.data: list[
             tuple[list[np.ndarray], list[np.ndarray], list[np.ndarray]]
         ] = []
+        # Normalized int16 rotations of nodes with animated rotation
+        self.normalized_rotations: list[np.ndarray | None] = []
         self.transform_index = 0
 
         self.data_size: int = 0
@@ -87,6 +89,9 @@ class OdinPackedReader(OdinAnimationReader):
         )
 
         self.data.append((translation, rotation, scale))
+        self.normalized_rotations.append(
+            np.stack(nRotation, axis=1) if flags.has_rotation else None
+        )
         self.local_node_offset = 0
         self.node_base_data_offset = 0
         self.data_size = 0
@@ -237,3 +242,19 @@ class OdinPackedReader(OdinAnimationReader):
             [channel[frame_index] for channel in rotation],
             [channel[frame_index] for channel in scale],
         )
+
+    @override
+    def get_normalized_rotation(self, node_index: int) -> np.ndarray | None:
+        return self.normalized_rotations[node_index]
+
+    @override
+    def get_node_data(
+        self, node_index: int
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        translation, rotation, scale = self.data[node_index]
+
+        return (
+            np.stack(translation, axis=1),
+            np.stack(rotation, axis=1),
+            np.stack(scale, axis=1),
+        )
@@ -45,3 +45,7 @@ class OdinRawAnimationReader(OdinAnimationReader):
     @override
     def get_frame_data(self, node_index: int, frame_index: int):
         return np.array_split(self.data[node_index][frame_index], [3, 7])
+
+    @override
+    def get_node_data(self, node_index: int):
+        return tuple(np.split(self.data[node_index], [3, 7], axis=1))
@@ -1,5 +1,7 @@
 import abc
 
+import numpy as np
+
 
 class OdinAnimationReader(abc.ABC):
     def __init__(self, animation: dict) -> None:
@@ -22,3 +24,13 @@ class OdinAnimationReader(abc.ABC):
         cls, node_index: int, frame_index: int
     ) -> tuple[list[float], list[float], list[float]]:
         """Returns frame data for specific node in format (Translation, Rotation, Scale)"""
+
+    @abc.abstractmethod
+    def get_node_data(
+        self, node_index: int
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns all frames of specific node as (Translation, Rotation, Scale) arrays of shape (frames, channels)"""
+
+    def get_normalized_rotation(self, node_index: int) -> np.ndarray | None:
+        """Returns all rotation frames of specific node as normalized int16 array of shape (frames, 4), None if data don't store them so"""
+        return None
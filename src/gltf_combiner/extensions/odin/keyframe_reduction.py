@@ -0,0 +1,108 @@
+import numpy as np
+import numpy.typing as npt
+
+# Quaternions closer than that are interpolated linearly to avoid division
+# by a sine close to zero
+SLERP_THRESHOLD = 0.9995
+
+
+def reduce_keyframes(
+    values: npt.NDArray[np.floating], tolerance: float, *, is_rotation: bool = False
+) -> npt.NDArray[np.intp]:
+    """
+    Returns indices of uniformly spaced keyframes to keep. Every dropped
+    keyframe is reproduced within `tolerance` by interpolation of the kept
+    keyframes around it, linear for vectors and spherical for rotation
+    quaternions. Vectors are compared by distance and rotations by angle
+    in radians. A channel that doesn't change keeps only its first keyframe.
+
+    Segments are extended greedily from the last kept keyframe, with
+    exponential and then binary search of the segment end. Errors of all
+    keyframes in a segment are checked at once.
+    """
+
+    count = len(values)
+    values = values.astype(np.float64)
+    if is_rotation:
+        # Zero quaternions can't be normalized and are left as is, they are
+        # kept as they don't match any interpolated rotation
+        norms = np.linalg.norm(values, axis=1, keepdims=True)
+        values /= np.where(norms > 0, norms, 1)
+
+    get_error = _get_rotation_error if is_rotation else _get_distance
+    if count <= 1 or get_error(values, values[0]).max() <= tolerance:
+        return np.arange(min(count, 1))
+
+    def is_segment_valid(start: int, end: int) -> bool:
+        factors = np.arange(1, end - start) / (end - start)
+        interpolated = (
+            _slerp(values[start], values[end], factors)
+            if is_rotation
+            else _lerp(values[start], values[end], factors)
+        )
+        return get_error(values[start + 1 : end], interpolated).max() <= tolerance
+
+    kept = [0]
+    start = 0
+    while start < count - 1:
+        valid_end = start + 1
+        step = 1
+        while valid_end + step < count and is_segment_valid(start, valid_end + step):
+            valid_end += step
+            step *= 2
+
+        invalid_end = min(valid_end + step, count)
+        while invalid_end - valid_end > 1:
+            middle = (valid_end + invalid_end) // 2
+            if is_segment_valid(start, middle):
+                valid_end = middle
+            else:
+                invalid_end = middle
+
+        kept.append(valid_end)
+        start = valid_end
+
+    return np.array(kept, dtype=np.intp)
+
+
+def _lerp(
+    start: npt.NDArray[np.float64],
+    end: npt.NDArray[np.float64],
+    factors: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    return start + factors[:, np.newaxis] * (end - start)
+
+
+def _slerp(
+    start: npt.NDArray[np.float64],
+    end: npt.NDArray[np.float64],
+    factors: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    # Interpolation goes the shortest way, as glTF viewers do
+    dot = float(np.dot(start, end))
+    if dot < 0:
+        end = -end
+        dot = -dot
+
+    if dot > SLERP_THRESHOLD:
+        result = _lerp(start, end, factors)
+        return result / np.linalg.norm(result, axis=1, keepdims=True)
+
+    angle = np.arccos(dot)
+    sine = np.sin(angle)
+    start_weights = np.sin((1 - factors) * angle) / sine
+    end_weights = np.sin(factors * angle) / sine
+    return start_weights[:, np.newaxis] * start + end_weights[:, np.newaxis] * end
+
+
+def _get_distance(
+    values: npt.NDArray[np.float64], expected: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    return np.linalg.norm(values - expected, axis=-1)
+
+
+def _get_rotation_error(
+    values: npt.NDArray[np.float64], expected: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    dot = np.abs(np.sum(values * expected, axis=-1))
+    return 2 * np.arccos(np.minimum(dot, 1.0))
@@ -1,12 +1,24 @@
+import hashlib
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, TypeVar
 
 import numpy as np
 import numpy.typing as npt
 import orjson
 
-from gltf import (BIN_CHUNK_TYPE, FLATBUFFER_CHUNK_TYPE, JSON_CHUNK_TYPE,
-                  Chunk, GlTF)
+from gltf import (
+    BIN_CHUNK_TYPE,
+    FLATBUFFER_CHUNK_TYPE,
+    JSON_CHUNK_TYPE,
+    Chunk,
+    GlTF,
+    SegmentedBuffer,
+    SpillFile,
+)
+from gltf.profiling import get_current_span, traced
 from streams import ByteReader, ByteWriter
 
 from .. import deserialize_glb_json
@@ -15,14 +27,40 @@ from .attribute_format import OdinAttributeFormat
 from .attribute_type import OdinAttributeType
 from .gltf_component_type import ComponentType
 from .gltf_data_type import DataType
+from .keyframe_reduction import reduce_keyframes
 from .odin_attribute import OdinAttribute
+from .options import ConversionOptions
+from .quantization import (
+    QUANTIZATION_EXTENSION,
+    VERTEX_ALIGNMENT,
+    align_vertex_rows,
+    get_dequantization_matrix,
+    get_position_dequantization,
+    quantize_positions,
+    quantize_rotations,
+    quantize_unit_vectors,
+    quantize_weights,
+)
+from .vertex_cache import get_vertex_fetch_order, optimize_triangle_order
+
+# Maximum byte stride of vertex attribute buffer views
+MAX_BYTE_STRIDE = 252
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 @dataclass
 class BufferView:
     stride: int | None = None
     offset: int | None = None
-    data: bytes = b""
+    # Data is None when it is kept in a spill file only
+    data: bytes | bytearray | memoryview | None = b""
+    length: int = 0
+
+    @property
+    def byte_length(self) -> int:
+        return len(self.data) if self.data is not None else self.length
 
     def serialize(self) -> dict[str, int]:
         assert self.offset is not None
@@ -30,7 +68,7 @@ class BufferView:
         data = {
             "buffer": 0,
             "byteOffset": self.offset,
-            "byteLength": len(self.data),
+            "byteLength": self.byte_length,
         }
 
         if self.stride is not None:
@@ -39,6 +77,26 @@ class BufferView:
         return data
 
 
+@dataclass
+class InterleavedVertices:
+    # Odin vertex data of a vertex descriptor, kept as is
+    data: bytes | bytearray | memoryview
+    stride: int
+
+
+@dataclass
+class DecodedAttribute:
+    type: OdinAttributeType
+    # Accessor fields except of buffer view and count
+    accessor: dict[str, Any]
+    data: np.ndarray
+    # Byte stride of data with padded rows
+    stride: int | None = None
+    # Interleaved vertex data the attribute is stored in, instead of its own
+    # buffer view with the decoded data
+    interleaved: InterleavedVertices | None = None
+
+
 class SupercellOdinGLTF:
     extensions_used: list[str] = [
         # "KHR_mesh_quantization",
@@ -50,7 +108,18 @@ class SupercellOdinGLTF:
         # "KHR_mesh_quantization"
     ]
 
-    def __init__(self, gltf: GlTF) -> None:
+    def __init__(
+        self,
+        gltf: GlTF,
+        *,
+        spill_file: SpillFile | None = None,
+        options: ConversionOptions | None = None,
+    ) -> None:
+        """
+        If `spill_file` is passed, buffer views are written to it as soon as
+        they are produced instead of being held in memory until saving.
+        """
+
         json_chunk = gltf.get_chunk_by_type(JSON_CHUNK_TYPE)
         flatbuffer_chunk = gltf.get_chunk_by_type(FLATBUFFER_CHUNK_TYPE)
         # Checking info chunks
@@ -68,13 +137,68 @@ class SupercellOdinGLTF:
         assert bin_chunk is not None
 
         self._buffers: list[BufferView] = []
+        self._spill_file: SpillFile | None = spill_file
         self._odin_buffer_index: int = -1
         self._mesh_descriptors: list[dict] = []
         self._cached_mesh_descriptors: dict = {}
+        self._options: ConversionOptions = options or ConversionOptions()
+
+        # Old to new vertex indices of optimized mesh data by mesh data info index
+        self._vertex_remaps: dict[int, npt.NDArray[np.intp]] = {}
+        # Rewritten index accessors by original accessor and mesh data info indices
+        self._remapped_indices: dict[tuple[int, int], int] = {}
+        # Primitives converted from Odin format by mesh data info index
+        self._odin_primitives: dict[int, list[dict]] = {}
+        # Index accessors used by several mesh data, which aren't rewritten
+        # in place
+        self._shared_index_accessors: set[int] = set()
+        # Mesh data info indices of primitives with morph targets, whose
+        # vertices can't be merged or reordered
+        self._morphed_mesh_data: set[int] = set()
+
+        # Decoded accessors and maximum values of index accessors by accessor index
+        self._accessor_cache: dict[int, npt.NDArray[np.number]] = {}
+        self._index_max_cache: dict[int, int] = {}
+
+        self._produce_buffers(
+            bytes(bin_chunk.data)
+            if isinstance(bin_chunk.data, SegmentedBuffer)
+            else bin_chunk.data
+        )
 
-        self._produce_buffers(bin_chunk.data)
-
+    @traced("odin.remove_odin")
     def remove_odin(self) -> GlTF:
+        self._remove_odin()
+
+        return self.save()
+
+    @traced("odin.remove_odin")
+    def remove_odin_document(self) -> tuple[dict[str, Any], SegmentedBuffer]:
+        """
+        Removes Odin format and returns glTF JSON data with binary chunk data.
+        Unlike `remove_odin`, the JSON data aren't encoded, so they can be
+        changed further and encoded once when written.
+        """
+
+        self._remove_odin()
+        data = self.save_buffers()
+
+        return self._data, data
+
+    @traced("odin.remove_odin")
+    def remove_odin_spilled(self) -> dict[str, Any]:
+        """
+        Removes Odin format keeping binary data in the spill file and returns
+        glTF JSON data. The spill file holds the binary chunk afterwards.
+        """
+
+        assert self._spill_file is not None
+        self._remove_odin()
+        self.save_buffers()
+
+        return self._data
+
+    def _remove_odin(self) -> None:
         self.process_meshes_raw()
         self.process_accessors()
         self.process_skins()
@@ -96,7 +220,21 @@ class SupercellOdinGLTF:
             self.initialize_odin()
             self._process_meshes()
 
-        return self.save()
+            if self._options.optimize_vertex_cache:
+                self._optimize_vertex_cache()
+
+        # Spilled data of dropped buffer views are dropped when the spill
+        # file is laid out
+        if (
+            self._options.optimize_vertices
+            or self._options.optimize_vertex_cache
+            or self._options.quantize_attributes
+            or self._passes_vertices_through()
+        ):
+            self._prune_buffers()
+
+        if self._options.deduplicate_buffers:
+            self._deduplicate_buffers()
 
     def process_accessors(self) -> None:
         accessors: list[dict] = self._data.get("accessors", [])
@@ -107,8 +245,11 @@ class SupercellOdinGLTF:
             # Masking Supercell custom index to make it valid
             accessor["componentType"] = component & 0x0000FFFF
 
+    @traced("odin.process_meshes_raw")
     def process_meshes_raw(self) -> None:
         meshes: list[dict] = self._data.get("meshes", [])
+        if current_span := get_current_span():
+            current_span.add(element_count=len(meshes))
 
         for mesh in meshes:
             primitives: dict = mesh.get("primitives")
@@ -171,6 +312,10 @@ class SupercellOdinGLTF:
     def _create_primitive_cache(self, meshes: list[dict]) -> None:
         vertex_count = {}
         descriptors = {}
+        index_accessors: dict[int, list[int]] = {}
+        # Mesh data info indices using every index accessor, None for
+        # primitives not in Odin format
+        index_users: dict[int, set[int | None]] = {}
 
         for mesh in meshes:
             primitives = mesh.get("primitives")
@@ -180,13 +325,13 @@ class SupercellOdinGLTF:
             for primitive in primitives:
                 extensions: dict = primitive.get("extensions", {})
                 if "SC_odin_format" not in extensions:
+                    if "indices" in primitive:
+                        index_users.setdefault(primitive["indices"], set()).add(None)
                     continue
 
                 odin: dict = extensions["SC_odin_format"]
                 indices = primitive.get("indices")
-                count = self.calculate_odin_position_count(
-                    self._data["accessors"][indices]
-                )
+                count = self.calculate_odin_position_count(indices)
 
                 info_index = odin.get("meshDataInfoIndex")
                 mesh_descriptor = (
@@ -204,17 +349,67 @@ class SupercellOdinGLTF:
                 else:
                     vertex_count[info_index] = count
 
-        for idx, vertex_descriptors in descriptors.items():
+                index_accessors.setdefault(info_index, []).append(indices)
+                index_users.setdefault(indices, set()).add(info_index)
+                if "targets" in primitive:
+                    self._morphed_mesh_data.add(info_index)
+
+        self._shared_index_accessors = {
+            accessor_index
+            for accessor_index, users in index_users.items()
+            if len(users) > 1
+        }
+
+        def decode(idx: int) -> tuple[int, list[list[DecodedAttribute]]]:
+            return idx, self._decode_mesh_data(
+                idx, descriptors[idx], vertex_count[idx], index_accessors[idx]
+            )
+
+        decoded_groups: Iterable[tuple[int, list[list[DecodedAttribute]]]] = (
+            self._map_in_threads(decode, descriptors)
+        )
+
+        # Mesh data are added one by one in order as they are decoded, unless
+        # quantization needs all of them at once
+        if self._options.quantize_attributes:
+            decoded_groups = self._quantize_mesh_data(meshes, dict(decoded_groups))
+
+        for idx, decoded in decoded_groups:
             attributes = {}
-            for descriptor in vertex_descriptors:
-                self._process_odin_primitive_descriptor(
-                    descriptor, attributes, vertex_count[idx]
-                )
+            for decoded_attributes in decoded:
+                self._add_decoded_attributes(attributes, decoded_attributes)
 
             self._cached_mesh_descriptors[idx] = attributes
 
+    def _decode_mesh_data(
+        self,
+        info_index: int,
+        vertex_descriptors: list[dict],
+        count: int,
+        index_accessors: list[int],
+    ) -> list[list[DecodedAttribute]]:
+        decoded = [
+            self._decode_odin_descriptor(descriptor, count)
+            for descriptor in vertex_descriptors
+        ]
+
+        # Target accessors follow the original vertex order
+        if (
+            self._options.optimize_vertices
+            and info_index not in self._morphed_mesh_data
+        ):
+            self._vertex_remaps[info_index] = self._optimize_vertices(
+                decoded, index_accessors
+            )
+
+        return decoded
+
+    @traced("odin.process_meshes")
     def _process_meshes(self) -> None:
         meshes: list[dict] = self._data.get("meshes", [])
+        buffer_count = len(self._buffers)
+        primitive_count = 0
+
         self._create_primitive_cache(meshes)
 
         for mesh in meshes:
@@ -229,6 +424,14 @@ class SupercellOdinGLTF:
             for primitive in primitives:
                 self._process_mesh_primitive(primitive)
 
+            primitive_count += len(primitives)
+
+        if current_span := get_current_span():
+            current_span.add(
+                byte_count=self._get_buffers_size(buffer_count),
+                element_count=primitive_count,
+            )
+
     def _process_mesh_primitive(self, primitive: dict) -> None:
         extensions: dict = primitive.get("extensions", {})
         if "SC_odin_format" not in extensions:
@@ -236,7 +439,7 @@ class SupercellOdinGLTF:
 
         odin: dict = extensions.pop("SC_odin_format")
         indices = primitive.get("indices")
-        count = self.calculate_odin_position_count(self._data["accessors"][indices])
+        count = self.calculate_odin_position_count(indices)
 
         info_index = odin.get("meshDataInfoIndex")
         mesh_descriptor = (
@@ -249,22 +452,27 @@ class SupercellOdinGLTF:
         else:
             attributes = {}
             for descriptor in vertex_descriptors:
-                self._process_odin_primitive_descriptor(descriptor, attributes, count)
+                self._add_decoded_attributes(
+                    attributes, self._decode_odin_descriptor(descriptor, count)
+                )
             self._cached_mesh_descriptors[info_index] = attributes
 
         primitive["attributes"] = attributes
+        self._odin_primitives.setdefault(info_index, []).append(primitive)
 
-    def _process_odin_primitive_descriptor(
-        self, descriptor: dict, attributes: dict, positions_count: int
-    ):
+        if info_index in self._vertex_remaps:
+            primitive["indices"] = self._remap_indices(indices, info_index)
+
+    def _decode_odin_descriptor(
+        self, descriptor: dict, positions_count: int
+    ) -> list[DecodedAttribute]:
         attribute_descriptor: list[OdinAttribute] = []
-        attribute_buffers: list[np.ndarray] = []
         attribute_accessors: list[dict] = []
 
         offset = descriptor["offset"]
         stride = descriptor["stride"]
 
-        for i, attribute in enumerate(descriptor["attributes"]):
+        for attribute in descriptor["attributes"]:
             attribute_type_index = attribute["index"]
             attribute_format_index = attribute["format"]
             if attribute_type_index not in OdinAttributeType:
@@ -284,19 +492,11 @@ class SupercellOdinGLTF:
                 attribute_type, attribute_format, attribute["offset"]
             )
 
-            attribute_buffers.append(
-                np.zeros(
-                    (positions_count, attribute.elements_count),
-                    dtype=attribute.data_type,
-                )
-            )
             attribute_descriptor.append(attribute)
             accessor = {
-                "bufferView": len(self._buffers) + i,
                 "componentType": OdinAttributeFormat.to_accessor_component(
                     attribute_format
                 ),
-                "count": int(positions_count),
                 "type": attribute_format.to_accessor_type(),
             }
 
@@ -309,179 +509,574 @@ class SupercellOdinGLTF:
 
             attribute_accessors.append(accessor)
 
-        mesh_buffer = self._buffers[self._odin_buffer_index].data
-        for tris_idx in range(positions_count):
-            for attr_idx, attribute in enumerate(attribute_descriptor):
-                value_offset = offset + (stride * tris_idx) + attribute.offset
-                buffer = attribute_buffers[attr_idx]
-                buffer[tris_idx] = attribute.read(mesh_buffer, value_offset)
+        mesh_buffer = self._get_buffer_data(self._odin_buffer_index)
+        interleaved = (
+            InterleavedVertices(
+                memoryview(mesh_buffer)[offset : offset + stride * positions_count],
+                stride,
+            )
+            if self._passes_vertices_through()
+            and stride % VERTEX_ALIGNMENT == 0
+            and 0 < stride <= MAX_BYTE_STRIDE
+            else None
+        )
 
-        for i, attribute in enumerate(attribute_descriptor):
-            attribute_name = OdinAttributeType.to_attribute_name(attribute.type)
-            attributes[attribute_name] = len(self._data["accessors"]) + i
+        decoded: list[DecodedAttribute] = []
+        for attribute, accessor in zip(attribute_descriptor, attribute_accessors):
+            data = attribute.read_vertices(
+                mesh_buffer, offset + attribute.offset, stride, positions_count
+            )
 
-            buffer_view = BufferView()
-            buffer_view.data = attribute_buffers[i].tobytes()
-            self._buffers.append(buffer_view)
+            if interleaved is not None and _is_stored_as_is(attribute, stride):
+                decoded.append(
+                    DecodedAttribute(
+                        attribute.type,
+                        {**accessor, "byteOffset": attribute.offset},
+                        data,
+                        interleaved=interleaved,
+                    )
+                )
+            else:
+                decoded.append(
+                    DecodedAttribute(
+                        attribute.type, accessor, np.ascontiguousarray(data)
+                    )
+                )
 
-        self._data["accessors"].extend(attribute_accessors)
+        return decoded
 
-    def process_animation(self, animation: dict) -> None:
-        animations = self._data.get("animations", [])
-        animation_reader = create_reader(self, animation)
-        animation_reader.read()
+    def _map_in_threads(
+        self, function: Callable[[T], R], items: Iterable[T]
+    ) -> Iterator[R]:
+        """
+        Maps items in a thread pool of `decoding_threads` threads, yielding
+        results in order of the items, or one by one in the calling thread.
+        """
 
-        # Animation input
-        animation_input_index = None
-        individual_input_index = None
+        if self._options.decoding_threads <= 1:
+            yield from map(function, items)
+            return
 
-        def create_input_buffer(count: int) -> int:
-            result = len(self._data["accessors"])
-            animation_input_buffer = ByteWriter("little")
-            for i in range(count):
-                animation_input_buffer.write_float(animation_reader.frame_spf * i)
-            self._data["accessors"].append(
-                {
-                    "bufferView": len(self._buffers),
-                    "componentType": 5126,
-                    "count": count,
-                    "type": "SCALAR",
-                }
-            )
-            buffer_view = BufferView()
-            buffer_view.data = animation_input_buffer.buffer
-            self._buffers.append(buffer_view)
-            return result
+        with ThreadPoolExecutor(
+            self._options.decoding_threads, "odin_decoder"
+        ) as executor:
+            yield from executor.map(function, items)
+
+    def _passes_vertices_through(self) -> bool:
+        """
+        Checks if Odin vertex data are kept interleaved. Vertex optimization
+        and quantization change the data, so they need them decoded.
+        """
+
+        return self._options.pass_vertices_through and not (
+            self._options.optimize_vertices
+            or self._options.optimize_vertex_cache
+            or self._options.quantize_attributes
+        )
 
-        if animation_reader.keyframe_mapping:
-            individual_input_index = {
-                num: 0 for num in animation_reader.keyframe_mapping
+    def _add_decoded_attributes(
+        self, attributes: dict, decoded_attributes: list[DecodedAttribute]
+    ) -> None:
+        accessors: list[dict] = self._data["accessors"]
+        # Buffer views of interleaved vertex data by their identity
+        interleaved_buffers: dict[int, int] = {}
+
+        for decoded in decoded_attributes:
+            attribute_name = OdinAttributeType.to_attribute_name(decoded.type)
+            attributes[attribute_name] = len(accessors)
+
+            interleaved = decoded.interleaved
+            if interleaved is None:
+                buffer_index = len(self._buffers)
+                self._add_buffer(decoded.data.tobytes(), decoded.stride)
+            elif id(interleaved) in interleaved_buffers:
+                buffer_index = interleaved_buffers[id(interleaved)]
+            else:
+                buffer_index = interleaved_buffers[id(interleaved)] = len(self._buffers)
+                self._add_buffer(interleaved.data, interleaved.stride)
+
+            accessor = {
+                "bufferView": buffer_index,
+                "componentType": decoded.accessor["componentType"],
+                "count": len(decoded.data),
+                **decoded.accessor,
             }
+            accessors.append(accessor)
+
+    def _optimize_vertices(
+        self, decoded: list[list[DecodedAttribute]], index_accessors: list[int]
+    ) -> npt.NDArray[np.intp]:
+        """
+        Merges vertices with equal data in all attributes and drops vertices
+        that aren't referenced by any of `index_accessors`. Kept vertices stay
+        in order of their first occurrence. Returns old to new index mapping.
+        Mesh data with morph targets aren't passed here.
+        """
+
+        arrays = [attribute.data for attributes in decoded for attribute in attributes]
+        vertex_count = len(arrays[0]) if arrays else 0
+
+        referenced = np.zeros(vertex_count, dtype=bool)
+        for accessor_index in index_accessors:
+            referenced[self.decode_accessor(accessor_index).reshape(-1)] = True
+        referenced_vertices = np.flatnonzero(referenced)
+
+        # Every vertex is viewed as a single opaque value of all its bytes
+        rows = np.concatenate(
+            [
+                np.ascontiguousarray(array[referenced_vertices])
+                .view(np.uint8)
+                .reshape(len(referenced_vertices), -1)
+                for array in arrays
+            ],
+            axis=1,
+        )
+        keys = np.ascontiguousarray(rows).view(np.dtype((np.void, rows.shape[1])))
+        _, first_indices, inverse = np.unique(
+            keys.reshape(-1), return_index=True, return_inverse=True
+        )
+
+        order = np.argsort(first_indices)
+        new_indices = np.empty_like(order)
+        new_indices[order] = np.arange(len(order))
+        kept_vertices = referenced_vertices[first_indices[order]]
+
+        for attributes in decoded:
+            for attribute in attributes:
+                attribute.data = attribute.data[kept_vertices]
+
+        remap = np.zeros(vertex_count, dtype=np.intp)
+        remap[referenced_vertices] = new_indices[inverse.reshape(-1)]
+        return remap
+
+    @traced("odin.quantize_mesh_data")
+    def _quantize_mesh_data(
+        self,
+        meshes: list[dict],
+        decoded_groups: dict[int, list[list[DecodedAttribute]]],
+    ) -> Iterable[tuple[int, list[list[DecodedAttribute]]]]:
+        """
+        Stores decoded vertex attributes with KHR_mesh_quantization types.
+
+        Mesh data used by one mesh or by meshes of one skin share a position
+        dequantization transform. Skins apply it with their inverse bind
+        matrices, other mesh nodes get a child node holding the mesh and
+        the transform. Positions of meshes with morph targets or with
+        primitives not in Odin format are kept as floats.
+        """
+
+        mesh_groups: list[set[int]] = []
+        excluded_groups: set[int] = set()
+        for mesh in meshes:
+            groups: set[int] = set()
+            is_quantizable = True
+
+            for primitive in mesh.get("primitives", []):
+                odin = primitive.get("extensions", {}).get("SC_odin_format")
+                if odin is None or "targets" in primitive:
+                    is_quantizable = False
+                if odin is not None:
+                    groups.add(odin.get("meshDataInfoIndex"))
+
+            if not is_quantizable:
+                excluded_groups.update(groups)
+            mesh_groups.append(groups)
+
+        nodes: list[dict] = self._data.get("nodes", [])
+        skin_groups: dict[int, set[int]] = {}
+        for node in nodes:
+            if "mesh" in node and "skin" in node:
+                skin_groups.setdefault(node["skin"], set()).update(
+                    mesh_groups[node["mesh"]]
+                )
+
+        # Mesh data sharing a transform are joined with union-find
+        parents = {idx: idx for idx in decoded_groups}
+
+        def find(idx: int) -> int:
+            while parents[idx] != idx:
+                idx = parents[idx]
+            return idx
+
+        for groups in (*mesh_groups, *skin_groups.values()):
+            roots = [find(idx) for idx in groups]
+            for root in roots[1:]:
+                parents[root] = roots[0]
+
+        positions: dict[int, list[np.ndarray]] = {}
+        for idx, decoded in decoded_groups.items():
+            position = self._find_float_positions(decoded)
+            if position is None:
+                excluded_groups.add(idx)
+            else:
+                positions.setdefault(find(idx), []).append(position)
+
+        excluded_roots = {find(idx) for idx in excluded_groups}
+        transforms = {
+            root: get_position_dequantization(np.concatenate(arrays))
+            for root, arrays in positions.items()
+            if root not in excluded_roots
+        }
+
+        for idx, decoded in decoded_groups.items():
+            transform = transforms.get(find(idx))
+            for decoded_attributes in decoded:
+                for attribute in decoded_attributes:
+                    self._quantize_attribute(attribute, transform)
+
+        def get_group_transform(groups: set[int]) -> tuple[np.ndarray, float] | None:
+            return transforms.get(find(next(iter(groups)))) if groups else None
+
+        skins: list[dict] = self._data.get("skins", [])
+        for skin_index, groups in skin_groups.items():
+            if transform := get_group_transform(groups):
+                self._add_skin_dequantization(skins[skin_index], *transform)
 
-            for num in individual_input_index.keys():
-                individual_input_index[num] = create_input_buffer(num)
+        for node_index in range(len(nodes)):
+            node = nodes[node_index]
+            if "mesh" not in node or "skin" in node:
+                continue
 
+            if transform := get_group_transform(mesh_groups[node["mesh"]]):
+                self._add_dequantization_node(node, *transform)
+
+        for key in ("extensionsUsed", "extensionsRequired"):
+            extensions: list[str] = self._data.setdefault(key, [])
+            if QUANTIZATION_EXTENSION not in extensions:
+                extensions.append(QUANTIZATION_EXTENSION)
+
+        return decoded_groups.items()
+
+    @staticmethod
+    def _find_float_positions(
+        decoded: list[list[DecodedAttribute]],
+    ) -> npt.NDArray[np.float32] | None:
+        for decoded_attributes in decoded:
+            for attribute in decoded_attributes:
+                if (
+                    attribute.type == OdinAttributeType.a_pos
+                    and attribute.accessor["componentType"] == ComponentType.Float
+                ):
+                    return attribute.data.view(np.float32)
+
+        return None
+
+    @staticmethod
+    def _quantize_attribute(
+        attribute: DecodedAttribute, transform: tuple[np.ndarray, float] | None
+    ) -> None:
+        accessor = attribute.accessor
+        is_float = accessor["componentType"] == ComponentType.Float
+
+        match attribute.type:
+            case OdinAttributeType.a_pos if is_float and transform is not None:
+                attribute.data = quantize_positions(
+                    attribute.data.view(np.float32), *transform
+                )
+                accessor["componentType"] = int(ComponentType.Short)
+                accessor["normalized"] = True
+            case OdinAttributeType.a_normal if is_float:
+                attribute.data = quantize_unit_vectors(attribute.data.view(np.float32))
+                accessor["componentType"] = int(ComponentType.Byte)
+                accessor["normalized"] = True
+            case OdinAttributeType.a_boneweights if is_float:
+                attribute.data = quantize_weights(attribute.data.view(np.float32))
+                accessor["componentType"] = int(ComponentType.UnsignedShort)
+                accessor["normalized"] = True
+
+        data = align_vertex_rows(attribute.data)
+        if data is not attribute.data:
+            attribute.data = data
+            attribute.stride = data.shape[1] * data.itemsize
+
+    def _add_skin_dequantization(
+        self, skin: dict, translation: np.ndarray, scale: float
+    ) -> None:
+        """Multiplies inverse bind matrices of the skin by the transform."""
+
+        joint_count = len(skin["joints"])
+        if "inverseBindMatrices" in skin:
+            matrices = self.decode_accessor(skin["inverseBindMatrices"])
         else:
-            animation_input_index = create_input_buffer(animation_reader.keyframe_count)
+            matrices = np.broadcast_to(np.eye(4).reshape(-1), (joint_count, 16))
 
-        # Animation Transform
-        animation_buffers_indices: list[tuple[int, int, int]] = []
-        animation_transform_buffers: list[tuple[ByteWriter, ByteWriter, ByteWriter]] = [
-            (ByteWriter("little"), ByteWriter("little"), ByteWriter("little"))
-            for _ in animation_reader.used_nodes
-        ]
+        # Matrices are stored in column-major order, so they are read
+        # transposed and multiplied by the transposed transform from the left
+        transposed = matrices.astype(np.float64).reshape(-1, 4, 4)
+        transposed = get_dequantization_matrix(translation, scale).T @ transposed
+
+        accessors: list[dict] = self._data["accessors"]
+        skin["inverseBindMatrices"] = len(accessors)
+        accessors.append(
+            {
+                "bufferView": len(self._buffers),
+                "componentType": int(ComponentType.Float),
+                "count": joint_count,
+                "type": "MAT4",
+            }
+        )
+        self._add_buffer(transposed.astype(np.float32).tobytes())
+
+    def _add_dequantization_node(
+        self, node: dict, translation: np.ndarray, scale: float
+    ) -> None:
+        """Moves mesh of the node to a new child node with the transform."""
+
+        nodes: list[dict] = self._data["nodes"]
+        node.setdefault("children", []).append(len(nodes))
+        nodes.append(
+            {
+                "mesh": node.pop("mesh"),
+                "translation": translation.tolist(),
+                "scale": [scale] * 3,
+            }
+        )
 
-        for node_index in range(len(animation_reader.used_nodes)):
-            node_keyframes = (
-                animation_reader.keyframe_mapping[node_index]
-                if animation_reader.keyframe_mapping
-                else animation_reader.keyframe_count
+    def _remap_indices(self, accessor_index: int, info_index: int) -> int:
+        """
+        Adds an index accessor rewritten for optimized mesh data, stored with
+        the narrowest component type.
+        """
+
+        key = (accessor_index, info_index)
+        if key not in self._remapped_indices:
+            indices = self._vertex_remaps[info_index][
+                self.decode_accessor(accessor_index).reshape(-1)
+            ]
+            self._remapped_indices[key] = self._add_index_accessor(
+                indices, accessor_index
             )
 
-            for frame_index in range(node_keyframes):
-                translation, rotation, scale = animation_transform_buffers[node_index]
-                t, r, s = animation_reader.get_frame_data(node_index, frame_index)
+        return self._remapped_indices[key]
 
-                for value in t:
-                    translation.write_float(value)
+    @traced("odin.optimize_vertex_cache")
+    def _optimize_vertex_cache(self) -> None:
+        """
+        Reorders triangles of Odin primitives for vertex cache locality, then
+        reorders vertices of their mesh data by first use and rewrites vertex
+        attributes in place. Mesh data with morph targets are kept as is.
+        """
 
-                for value in r:
-                    rotation.write_float(value)
+        for info_index, primitives in self._odin_primitives.items():
+            # Only triangle lists can be reordered
+            if any(primitive.get("mode", 4) != 4 for primitive in primitives):
+                continue
 
-                for value in s:
-                    scale.write_float(value)
+            if info_index in self._morphed_mesh_data:
+                continue
 
-        for idx, buffer in enumerate(animation_transform_buffers):
-            translation, rotation, scale = buffer
-            base_accessor_index = len(self._data["accessors"])
-            base_bufferView_index = len(self._buffers)
-            node_keyframes = (
-                animation_reader.keyframe_mapping[idx]
-                if animation_reader.keyframe_mapping
-                else animation_reader.keyframe_count
+            attribute_accessors = sorted(
+                set(self._cached_mesh_descriptors[info_index].values())
             )
+            if not attribute_accessors:
+                continue
 
-            # Translation
-            self._data["accessors"].append(
-                {
-                    "bufferView": base_bufferView_index,
-                    "componentType": 5126,
-                    "count": node_keyframes,
-                    "type": "VEC3",
-                }
-            )
-            translation_buffer_view = BufferView()
-            translation_buffer_view.data = translation.buffer
-            self._buffers.append(translation_buffer_view)
+            accessors: list[dict] = self._data["accessors"]
+            vertex_count = accessors[attribute_accessors[0]]["count"]
 
-            # Rotation
-            self._data["accessors"].append(
-                {
-                    "bufferView": base_bufferView_index + 1,
-                    "componentType": 5126,
-                    "count": node_keyframes,
-                    "type": "VEC4",
-                }
+            reordered_indices: dict[int, np.ndarray] = {}
+            for primitive in primitives:
+                accessor_index = primitive["indices"]
+                if accessor_index not in reordered_indices:
+                    reordered_indices[accessor_index] = optimize_triangle_order(
+                        self.decode_accessor(accessor_index).reshape(-1),
+                        vertex_count,
+                    )
+
+            order, remap = get_vertex_fetch_order(
+                np.concatenate(list(reordered_indices.values())), vertex_count
             )
-            rotation_buffer_view = BufferView()
-            rotation_buffer_view.data = rotation.buffer
-            self._buffers.append(rotation_buffer_view)
 
-            # Scale
+            for accessor_index in attribute_accessors:
+                buffer_view_index = accessors[accessor_index]["bufferView"]
+                data = np.frombuffer(
+                    self._get_buffer_data(buffer_view_index), dtype=np.uint8
+                )
+                self._replace_buffer_data(
+                    buffer_view_index,
+                    data.reshape(vertex_count, -1)[order].tobytes(),
+                )
+
+            new_accessors = {
+                accessor_index: self._add_index_accessor(remap[indices], accessor_index)
+                for accessor_index, indices in reordered_indices.items()
+            }
+            for primitive in primitives:
+                primitive["indices"] = new_accessors[primitive["indices"]]
+
+        self._invalidate_accessor_cache()
+
+    def _add_index_accessor(
+        self, indices: npt.NDArray[np.integer], replaced_index: int | None = None
+    ) -> int:
+        """
+        Adds an index accessor stored with the narrowest component type.
+        Accessor `replaced_index` is overwritten instead unless it is shared
+        by several mesh data, so its old data can be pruned.
+        """
+
+        max_index = int(indices.max()) if indices.size > 0 else 0
+        if max_index <= np.iinfo(np.uint8).max:
+            component_type = ComponentType.UnsignedByte
+        elif max_index <= np.iinfo(np.uint16).max:
+            component_type = ComponentType.UnsignedShort
+        else:
+            component_type = ComponentType.UnsignedInt
+
+        accessor = {
+            "bufferView": len(self._buffers),
+            "componentType": int(component_type),
+            "count": len(indices),
+            "type": "SCALAR",
+        }
+        self._add_buffer(indices.astype(component_type.to_numpy_dtype()).tobytes())
+
+        accessors: list[dict] = self._data["accessors"]
+        if replaced_index is None or replaced_index in self._shared_index_accessors:
+            accessors.append(accessor)
+            return len(accessors) - 1
+
+        accessors[replaced_index] = accessor
+        self._accessor_cache.pop(replaced_index, None)
+        self._index_max_cache.pop(replaced_index, None)
+        return replaced_index
+
+    @traced("odin.process_animation")
+    def process_animation(self, animation: dict) -> None:
+        animations = self._data.get("animations", [])
+        buffer_count = len(self._buffers)
+        animation_reader = create_reader(self, animation)
+        animation_reader.read()
+
+        # Animation input, shared by channels with the same keyframes
+        input_accessors: dict[bytes, int] = {}
+
+        def get_input_accessor(frames: npt.NDArray[np.integer]) -> int:
+            key = frames.tobytes()
+            if key in input_accessors:
+                return input_accessors[key]
+
+            result = len(self._data["accessors"])
+            animation_input_buffer = ByteWriter("little")
+            animation_input_buffer.write_array(
+                (frames * animation_reader.frame_spf).astype(np.float32)
+            )
             self._data["accessors"].append(
                 {
-                    "bufferView": base_bufferView_index + 2,
+                    "bufferView": len(self._buffers),
                     "componentType": 5126,
-                    "count": node_keyframes,
-                    "type": "VEC3",
+                    "count": len(frames),
+                    "type": "SCALAR",
                 }
             )
-            scale_buffer_view = BufferView()
-            scale_buffer_view.data = scale.buffer
-            self._buffers.append(scale_buffer_view)
+            self._add_buffer(animation_input_buffer.detach())
 
-            animation_buffers_indices.append(
-                (base_accessor_index, base_accessor_index + 1, base_accessor_index + 2)
-            )
+            input_accessors[key] = result
+            return result
 
-        # Animation channels
+        # Animation Transform
         animation_channels: list[dict] = []
         animation_samplers: list[dict] = []
-        for node_number, node_index in enumerate(animation_reader.used_nodes):
-            translation, rotation, scale = animation_buffers_indices[node_number]
 
-            input_index = (
-                individual_input_index[animation_reader.keyframe_mapping[node_number]]
-                if animation_reader.keyframe_mapping
-                else animation_input_index
-            )
+        def add_channel(
+            node_index: int,
+            path: str,
+            frames: npt.NDArray[np.integer],
+            values: npt.NDArray[np.number],
+        ) -> None:
+            output_accessor = {
+                "bufferView": len(self._buffers),
+                "componentType": 5126,
+                "count": len(values),
+                "type": DataType.vec_type_from_num(values.shape[1]),
+            }
 
-            # Translation
-            animation_channels.append(
-                {
-                    "sampler": len(animation_samplers),
-                    "target": {"node": node_index, "path": "translation"},
-                }
-            )
-            animation_samplers.append({"input": input_index, "output": translation})
+            # Quantized rotations are written as normalized int16
+            if values.dtype == np.int16:
+                output_accessor["componentType"] = 5122
+                output_accessor["normalized"] = True
+            else:
+                values = values.astype(np.float32)
 
-            # Rotation
-            animation_channels.append(
-                {
-                    "sampler": len(animation_samplers),
-                    "target": {"node": node_index, "path": "rotation"},
-                }
-            )
-            animation_samplers.append({"input": input_index, "output": rotation})
+            output_index = len(self._data["accessors"])
+            output_buffer = ByteWriter("little")
+            output_buffer.write_array(values)
+            self._data["accessors"].append(output_accessor)
+            self._add_buffer(output_buffer.detach())
 
-            # Scale
             animation_channels.append(
                 {
                     "sampler": len(animation_samplers),
-                    "target": {"node": node_index, "path": "scale"},
+                    "target": {"node": node_index, "path": path},
                 }
             )
-            animation_samplers.append({"input": input_index, "output": scale})
+            animation_samplers.append(
+                {"input": get_input_accessor(frames), "output": output_index}
+            )
+
+        node_keyframe_counts = animation_reader.keyframe_mapping or [
+            animation_reader.keyframe_count
+        ] * len(animation_reader.used_nodes)
+
+        tolerances = self._options.keyframe_tolerances
+
+        def decode_node(
+            node_number: int,
+        ) -> list[tuple[str, npt.NDArray[np.integer], npt.NDArray[np.number]]]:
+            """Returns path, kept frames and their values of node components."""
+
+            node_keyframes = node_keyframe_counts[node_number]
+            node_data = animation_reader.get_node_data(node_number)
+
+            components = []
+            for path, data in zip(("translation", "rotation", "scale"), node_data):
+                if path == "rotation" and self._options.quantize_rotations:
+                    normalized = animation_reader.get_normalized_rotation(node_number)
+                    data = (
+                        quantize_rotations(data) if normalized is None else normalized
+                    )
+
+                values = data[:node_keyframes]
+                frames = np.arange(node_keyframes)
+                if tolerances is not None:
+                    frames = reduce_keyframes(
+                        values,
+                        getattr(tolerances, path),
+                        is_rotation=path == "rotation",
+                    )
+                    values = values[frames]
+
+                components.append((path, frames, values))
+
+            return components
+
+        decoded_nodes = self._map_in_threads(
+            decode_node, range(len(animation_reader.used_nodes))
+        )
+
+        # Transform components that don't change, as (node, path, value)
+        static_components: list[tuple[int, str, npt.NDArray[np.number]]] = []
+        for node_index, components in zip(animation_reader.used_nodes, decoded_nodes):
+            for path, frames, values in components:
+                if len(values) == 1 or np.all(values == values[0]):
+                    static_components.append((node_index, path, values[0]))
+                else:
+                    add_channel(node_index, path, frames, values)
+
+        # An animation must have a channel, so a pose keeps one static component
+        if len(animation_channels) == 0 and len(static_components) > 0:
+            node_index, path, value = static_components.pop(0)
+            add_channel(node_index, path, np.arange(1), value[np.newaxis])
+
+        # Static components are stored as rest values of the nodes instead,
+        # node rotations must be unit quaternions unlike sampler outputs
+        nodes: list[dict] = self._data["nodes"]
+        for node_index, path, value in static_components:
+            value = value.astype(np.float64)
+            if path == "rotation" and (length := np.linalg.norm(value)) > 0:
+                value /= length
+
+            nodes[node_index][path] = value.astype(np.float32).tolist()
 
         animations.append(
             {
@@ -495,6 +1090,12 @@ class SupercellOdinGLTF:
 
         self.process_animation_skin(animation_reader.used_nodes)
 
+        if current_span := get_current_span():
+            current_span.add(
+                byte_count=self._get_buffers_size(buffer_count),
+                element_count=len(animation_channels),
+            )
+
     def process_animation_skin(self, nodes: list[int]) -> None:
         skins: list[dict[str, Any]] = self._data.get("skins", [])
 
@@ -519,9 +1120,12 @@ class SupercellOdinGLTF:
         skins.append({"joints": new_skin_joints})
         self._data["skins"] = skins
 
-    def calculate_odin_position_count(self, accessor: dict) -> int:
-        array = self.decode_accessor_obj(accessor)
-        max_index = np.max(array)
+    def calculate_odin_position_count(self, accessor_index: int) -> int:
+        max_index = self._index_max_cache.get(accessor_index)
+        if max_index is None:
+            max_index = int(np.max(self.decode_accessor(accessor_index)))
+            self._index_max_cache[accessor_index] = max_index
+
         return max_index + 1
 
     def initialize_odin(self) -> None:
@@ -559,25 +1163,250 @@ class SupercellOdinGLTF:
         else:
             del self._data["extensionsRequired"]
 
-    def save_buffers(self) -> bytes:
-        stream = ByteWriter("little")
+    @traced("odin.save_buffers")
+    def save_buffers(self) -> SegmentedBuffer:
+        """
+        Lays buffer views out into the binary chunk data. Buffer view data
+        become segments of the result, so they aren't copied. With a spill
+        file the data are already written there, so only the layout is saved
+        and the returned data are empty.
+        """
+
+        if self._spill_file is not None:
+            return self._save_spilled_buffers()
+
+        data = SegmentedBuffer()
 
         buffers: list[dict] = []
         buffer_view: list[dict] = []
 
         for buffer in self._buffers:
-            buffer.offset = stream.position
+            buffer.offset = data.append(buffer.data)
             buffer_view.append(buffer.serialize())
 
-            stream.write(buffer.data)
-            stream.write(b"\0" * (-len(buffer.data) % 16))
+            data.append(bytes(-len(buffer.data) % 16))
 
-        buffers.append({"byteLength": len(stream.buffer)})
+        buffers.append({"byteLength": len(data)})
 
         self._data["buffers"] = buffers
         self._data["bufferViews"] = buffer_view
+        self._invalidate_accessor_cache()
+
+        if current_span := get_current_span():
+            current_span.add(byte_count=len(data), element_count=len(self._buffers))
+
+        return data
+
+    def _save_spilled_buffers(self) -> SegmentedBuffer:
+        """
+        Saves the layout of spilled buffer views. Data of dropped buffer views
+        are removed from the spill file, moving the kept data together.
+        """
 
-        return stream.buffer
+        assert self._spill_file is not None
+
+        # Buffer views are appended and dropped in order, so their offsets
+        # are sorted
+        offsets = self._spill_file.compact(
+            [(buffer.offset or 0, buffer.byte_length) for buffer in self._buffers]
+        )
+        for buffer, offset in zip(self._buffers, offsets, strict=True):
+            buffer.offset = offset
+
+        self._data["buffers"] = [{"byteLength": self._spill_file.size}]
+        self._data["bufferViews"] = [buffer.serialize() for buffer in self._buffers]
+        self._invalidate_accessor_cache()
+
+        if current_span := get_current_span():
+            current_span.add(
+                byte_count=self._spill_file.size, element_count=len(self._buffers)
+            )
+
+        return SegmentedBuffer()
+
+    def _add_buffer(
+        self,
+        data: bytes | bytearray | memoryview,
+        stride: int | None = None,
+        *,
+        keep_data: bool = False,
+    ) -> None:
+        """
+        Adds a buffer view. With a spill file the data are written to it right
+        away and kept in memory only if `keep_data` is set.
+        """
+
+        if self._spill_file is None:
+            self._buffers.append(BufferView(stride, data=data))
+            return
+
+        offset = self._spill_file.append(data)
+        self._buffers.append(
+            BufferView(stride, offset, data if keep_data else None, len(data))
+        )
+
+    def _get_buffer_view_references(self) -> list[dict]:
+        """Returns accessors, sparse accessor parts and images."""
+
+        references: list[dict] = []
+        for accessor in self._data.get("accessors", []):
+            references.append(accessor)
+
+            sparse: dict = accessor.get("sparse", {})
+            references.extend(
+                sparse[key] for key in ("indices", "values") if key in sparse
+            )
+        references.extend(self._data.get("images", []))
+
+        return references
+
+    def _prune_buffers(self) -> None:
+        """
+        Drops buffer views that aren't referenced by accessors or images,
+        such as Odin vertex data and index data replaced by optimization.
+        """
+
+        references = self._get_buffer_view_references()
+        referenced_buffers = {
+            reference["bufferView"]
+            for reference in references
+            if "bufferView" in reference
+        }
+
+        new_indices: dict[int, int] = {}
+        buffers: list[BufferView] = []
+        for i, buffer in enumerate(self._buffers):
+            if i in referenced_buffers:
+                new_indices[i] = len(buffers)
+                buffers.append(buffer)
+
+        for reference in references:
+            if "bufferView" in reference:
+                reference["bufferView"] = new_indices[reference["bufferView"]]
+
+        self._buffers = buffers
+        self._invalidate_accessor_cache()
+
+    @traced("odin.deduplicate_buffers")
+    def _deduplicate_buffers(self) -> None:
+        """
+        Collapses buffer views with the same stride and data, and then
+        accessors which became identical. Buffer views are grouped by length
+        first, so only data of possible duplicates are hashed. Spilled data
+        are read back one buffer view at a time.
+        """
+
+        groups: dict[tuple[int, int | None], list[int]] = defaultdict(list)
+        for i, buffer in enumerate(self._buffers):
+            groups[(buffer.byte_length, buffer.stride)].append(i)
+
+        # Indices of duplicates to indices of their first occurrences
+        duplicates: dict[int, int] = {}
+        for indices in groups.values():
+            if len(indices) < 2:
+                continue
+
+            first_indices: dict[bytes, int] = {}
+            for i in indices:
+                data = memoryview(self._get_buffer_data(i)).cast("B")
+                first = first_indices.setdefault(hashlib.blake2b(data).digest(), i)
+                if first == i:
+                    continue
+
+                # Data are compared too, so hash collisions can't merge them
+                if data == memoryview(self._get_buffer_data(first)).cast("B"):
+                    duplicates[i] = first
+
+        new_indices: dict[int, int] = {}
+        buffers: list[BufferView] = []
+        for i, buffer in enumerate(self._buffers):
+            if i in duplicates:
+                new_indices[i] = new_indices[duplicates[i]]
+            else:
+                new_indices[i] = len(buffers)
+                buffers.append(buffer)
+
+        for reference in self._get_buffer_view_references():
+            if "bufferView" in reference:
+                reference["bufferView"] = new_indices[reference["bufferView"]]
+
+        self._buffers = buffers
+        self._deduplicate_accessors()
+        self._invalidate_accessor_cache()
+
+        if current_span := get_current_span():
+            current_span.add(element_count=len(duplicates))
+
+    def _deduplicate_accessors(self) -> None:
+        """
+        Collapses accessors with the same fields and remaps references to
+        them by meshes, skins and animations.
+        """
+
+        accessors: list[dict] = self._data.get("accessors", [])
+
+        new_indices: list[int] = []
+        first_indices: dict[bytes, int] = {}
+        kept_accessors: list[dict] = []
+        for accessor in accessors:
+            key = orjson.dumps(accessor, option=orjson.OPT_SORT_KEYS)
+            if key not in first_indices:
+                first_indices[key] = len(kept_accessors)
+                kept_accessors.append(accessor)
+
+            new_indices.append(first_indices[key])
+
+        if len(kept_accessors) == len(accessors):
+            return
+
+        for mesh in self._data.get("meshes", []):
+            for primitive in mesh.get("primitives", []):
+                for references in (
+                    primitive["attributes"],
+                    *primitive.get("targets", []),
+                ):
+                    for name, index in references.items():
+                        references[name] = new_indices[index]
+
+                if "indices" in primitive:
+                    primitive["indices"] = new_indices[primitive["indices"]]
+
+        for skin in self._data.get("skins", []):
+            if "inverseBindMatrices" in skin:
+                skin["inverseBindMatrices"] = new_indices[skin["inverseBindMatrices"]]
+
+        for animation in self._data.get("animations", []):
+            for sampler in animation["samplers"]:
+                sampler["input"] = new_indices[sampler["input"]]
+                sampler["output"] = new_indices[sampler["output"]]
+
+        self._data["accessors"] = kept_accessors
+
+    def _replace_buffer_data(
+        self, index: int, data: bytes | bytearray | memoryview
+    ) -> None:
+        """Replaces data of a buffer view with data of the same length."""
+
+        buffer = self._buffers[index]
+        assert len(data) == buffer.byte_length
+
+        if buffer.data is not None:
+            buffer.data = data
+            return
+
+        assert self._spill_file is not None and buffer.offset is not None
+        self._spill_file.write(buffer.offset, data)
+
+    def _get_buffer_data(self, index: int) -> bytes | bytearray | memoryview:
+        buffer = self._buffers[index]
+        if buffer.data is not None:
+            return buffer.data
+
+        assert self._spill_file is not None and buffer.offset is not None
+        return self._spill_file.read(buffer.offset, buffer.length)
+
+    def _get_buffers_size(self, start: int) -> int:
+        return sum(buffer.byte_length for buffer in self._buffers[start:])
 
     def _produce_buffers(self, bin_data: bytes) -> None:
         if "buffers" not in self._data:
@@ -590,6 +1419,8 @@ class SupercellOdinGLTF:
         buffer_views: list[dict] = self._data["bufferViews"]
         assert len(buffers) == 1
 
+        self._invalidate_accessor_cache()
+
         stream = ByteReader(bin_data, "little")
 
         for buffer_view in buffer_views:
@@ -610,13 +1441,19 @@ class SupercellOdinGLTF:
                 print(f"Skip buffer: {buffer_view}, {len(bin_data)}")
                 continue
 
-            stream.seek(offset)
-            data = stream.read(length)
+            stride = buffer_view.get("byteStride", None)
+            if self._spill_file is not None:
+                # Input data can be memory mapped, so views of it are kept
+                # in place of copies
+                self._add_buffer(
+                    memoryview(bin_data)[offset : offset + length],
+                    stride,
+                    keep_data=True,
+                )
+                continue
 
-            buffer = BufferView()
-            buffer.stride = buffer_view.get("byteStride", None)
-            buffer.data = data
-            self._buffers.append(buffer)
+            stream.seek(offset)
+            self._add_buffer(stream.read(length), stride)
 
     def save(self) -> GlTF:
         data = self.save_buffers()
@@ -627,7 +1464,22 @@ class SupercellOdinGLTF:
         )
 
     def decode_accessor(self, index: int) -> np.ndarray:
-        return self.decode_accessor_obj(self._data["accessors"][index])
+        """
+        Decodes accessor by its index. Results are cached until buffers change,
+        so returned arrays are read-only.
+        """
+
+        array = self._accessor_cache.get(index)
+        if array is None:
+            array = self.decode_accessor_obj(self._data["accessors"][index])
+            array.flags.writeable = False
+            self._accessor_cache[index] = array
+
+        return array
+
+    def _invalidate_accessor_cache(self) -> None:
+        self._accessor_cache.clear()
+        self._index_max_cache.clear()
 
     # https://github.com/KhronosGroup/glTF-Blender-IO/blob/da2172c284cd0576e3a63234ea893f9b4edcacca/addons/io_scene_gltf2/io/imp/gltf2_io_binary.py#L123
     def decode_accessor_obj(self, accessor: dict[str, Any]) -> npt.NDArray[np.number]:
@@ -640,14 +1492,13 @@ class SupercellOdinGLTF:
 
         buffer_view_index = accessor.get("bufferView")
         if buffer_view_index is not None:
-            buffer_view = self._data["bufferViews"][buffer_view_index]
-            buffer_data = self._buffers[buffer_view_index].data
+            buffer_data = self._get_buffer_data(buffer_view_index)
 
             accessor_offset = accessor.get("byteOffset") or 0
 
             bytes_per_elem = dtype(1).nbytes
             default_stride = bytes_per_elem * component_nb
-            stride = buffer_view.get("byteStride") or default_stride
+            stride = self._buffers[buffer_view_index].stride or default_stride
 
             if stride == default_stride:
                 array = np.frombuffer(
@@ -684,15 +1535,29 @@ class SupercellOdinGLTF:
 
         # Normalization
         if accessor.get("normalized"):
-            if accessor["component_type"] == 5120:  # int8
+            if accessor["componentType"] == 5120:  # int8
                 array: npt.NDArray[np.float64] = np.maximum(-1.0, array / 127.0)
-            elif accessor["component_type"] == 5121:  # uint8
+            elif accessor["componentType"] == 5121:  # uint8
                 array: npt.NDArray[np.float64] = array / 255.0
-            elif accessor["component_type"] == 5122:  # int16
+            elif accessor["componentType"] == 5122:  # int16
                 array: npt.NDArray[np.float64] = np.maximum(-1.0, array / 32767.0)
-            elif accessor["component_type"] == 5123:  # uint16
+            elif accessor["componentType"] == 5123:  # uint16
                 array: npt.NDArray[np.float64] = array / 65535.0
 
             array: npt.NDArray[np.float32] = array.astype(np.float32, copy=False)
 
         return array
+
+
+def _is_stored_as_is(attribute: OdinAttribute, stride: int) -> bool:
+    """
+    Checks if an Odin vertex attribute can be read by glTF accessors from
+    interleaved vertex data with the given stride without decoding.
+    """
+
+    size = np.dtype(attribute.data_type).itemsize * attribute.elements_count
+    return (
+        attribute.format != OdinAttributeFormat.NormalizedWeightVector
+        and attribute.offset % VERTEX_ALIGNMENT == 0
+        and attribute.offset + size <= stride
+    )
@@ -28,22 +28,32 @@ class OdinAttribute:
     def elements_count(self) -> int:
         return self._elements_count
 
-    def read(self, data: bytes, offset: int) -> npt.NDArray[np.number]:
+    def read_vertices(
+        self, data: bytes | memoryview, offset: int, stride: int, count: int
+    ) -> npt.NDArray[np.number]:
+        """
+        Reads values of `count` vertices at once, the first one at `offset`.
+        Values of formats other than normalized weight vectors are returned
+        as a strided view of `data`.
+        """
+
         match self.format:
             case OdinAttributeFormat.NormalizedWeightVector:
-                value = np.frombuffer(data, dtype=np.uint32, offset=offset, count=1)[0]
-                x = (value >> 21) * 0.0002442
-                y = ((value >> 10) & 0x7FF) * 0.0002442
-                z = (value & 0x3FF) * 0.0002442
-                array = np.array([((1.0 - x) - y) - z, x, y, z], dtype=self._dtype)
+                values = np.ndarray(
+                    (count,), np.uint32, data, offset=offset, strides=(stride,)
+                )
+                x = (values >> 21) * 0.0002442
+                y = ((values >> 10) & 0x7FF) * 0.0002442
+                z = (values & 0x3FF) * 0.0002442
+                return np.stack([((1.0 - x) - y) - z, x, y, z], axis=1).astype(
+                    self._dtype
+                )
             case _:
-                array = np.frombuffer(
-                    data, dtype=self._dtype, offset=offset, count=self._elements_count
+                dtype = np.dtype(self._dtype)
+                return np.ndarray(
+                    (count, self._elements_count),
+                    dtype,
+                    data,
+                    offset=offset,
+                    strides=(stride, dtype.itemsize),
                 )
-
-        # Note: shouldn't normalize if stored back without type changes
-        # if self._normalized and np.issubdtype(self._dtype, np.integer):
-        #     info = np.iinfo(self._dtype)
-        #     array = array.astype(np.float32) / info.max
-
-        return array
@@ -0,0 +1,49 @@
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class KeyframeTolerances:
+    """
+    Maximum errors of animation keyframe reduction by channel type: distances
+    for translation and scale, and angle in radians for rotation.
+    """
+
+    translation: float = 1e-4
+    rotation: float = 1e-4
+    scale: float = 1e-4
+
+
+@dataclass(frozen=True)
+class ConversionOptions:
+    """
+    Optional optimizations applied while Odin format is removed. All of them
+    are disabled by default, so output matches the original data layout.
+    """
+
+    # Merge duplicate vertices, drop unreferenced ones and store indices
+    # with the narrowest component type
+    optimize_vertices: bool = False
+    # Reorder triangles for post-transform vertex cache locality and
+    # vertices for fetch locality
+    optimize_vertex_cache: bool = False
+    # Store vertex attributes with KHR_mesh_quantization types: positions as
+    # normalized int16 with dequantization transforms, normals as normalized
+    # int8 and skin weights as normalized uint16
+    quantize_attributes: bool = False
+    # Drop animation keyframes that interpolation of the kept ones reproduces
+    # within the tolerances, every keyframe is kept if not set
+    keyframe_tolerances: KeyframeTolerances | None = None
+    # Store animation rotations as normalized int16 quaternions, taken as is
+    # from packed Odin animations
+    quantize_rotations: bool = False
+    # Store byte-identical buffer views and then identical accessors once,
+    # such as repeated animation times and shared index data
+    deduplicate_buffers: bool = False
+    # Keep Odin interleaved vertex data as is in strided buffer views, decoding
+    # only attributes glTF can't read, such as packed skin weights. Ignored
+    # when vertices are optimized or quantized
+    pass_vertices_through: bool = False
+    # Number of threads decoding mesh data and animation nodes of a file.
+    # Results are merged in order, so output doesn't depend on it and it isn't
+    # a part of cache keys
+    decoding_threads: int = field(default=1, repr=False, compare=False)
@@ -0,0 +1,93 @@
+import numpy as np
+import numpy.typing as npt
+
+QUANTIZATION_EXTENSION = "KHR_mesh_quantization"
+
+# Vertex attribute elements must be aligned to 4 bytes
+VERTEX_ALIGNMENT = 4
+
+
+def get_position_dequantization(
+    positions: npt.NDArray[np.floating],
+) -> tuple[npt.NDArray[np.float64], float]:
+    """
+    Returns translation and uniform scale that map normalized int16 positions
+    back to the bounds of the given positions. The scale is uniform, so
+    normals stay valid under the dequantization transform.
+    """
+
+    if positions.size == 0:
+        return np.zeros(3), 1.0
+
+    bounds_min = positions.min(axis=0).astype(np.float64)
+    bounds_max = positions.max(axis=0).astype(np.float64)
+
+    scale = float((bounds_max - bounds_min).max()) / 2
+    return (bounds_min + bounds_max) / 2, scale if scale > 0 else 1.0
+
+
+def get_dequantization_matrix(
+    translation: npt.NDArray[np.float64], scale: float
+) -> npt.NDArray[np.float64]:
+    matrix = np.diag([scale, scale, scale, 1.0])
+    matrix[:3, 3] = translation
+    return matrix
+
+
+def quantize_positions(
+    positions: npt.NDArray[np.floating],
+    translation: npt.NDArray[np.float64],
+    scale: float,
+) -> npt.NDArray[np.int16]:
+    """Quantizes positions to normalized int16."""
+
+    normalized = (positions.astype(np.float64) - translation) / scale
+    return np.round(np.clip(normalized, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def quantize_unit_vectors(vectors: npt.NDArray[np.number]) -> npt.NDArray[np.int8]:
+    """Quantizes unit vectors to normalized int8."""
+
+    return np.round(np.clip(vectors.astype(np.float64), -1.0, 1.0) * 127).astype(
+        np.int8
+    )
+
+
+def quantize_rotations(rotations: npt.NDArray[np.number]) -> npt.NDArray[np.int16]:
+    """Normalizes rotation quaternions and quantizes them to normalized int16."""
+
+    rotations = rotations.astype(np.float64)
+    lengths = np.linalg.norm(rotations, axis=1, keepdims=True)
+    lengths[lengths == 0] = 1.0
+
+    return np.round(np.clip(rotations / lengths, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def quantize_weights(weights: npt.NDArray[np.floating]) -> npt.NDArray[np.uint16]:
+    """
+    Quantizes skin weights to normalized uint16. Rounding error is added to
+    the largest weight, so weights of every vertex still sum up to one.
+    """
+
+    quantized = np.round(np.clip(weights.astype(np.float64), 0.0, 1.0) * 65535)
+    quantized = quantized.astype(np.int64)
+
+    error = 65535 - quantized.sum(axis=1)
+    largest = quantized.argmax(axis=1)
+    rows = np.arange(len(quantized))
+    quantized[rows, largest] = np.clip(quantized[rows, largest] + error, 0, 65535)
+
+    return quantized.astype(np.uint16)
+
+
+def align_vertex_rows(data: npt.NDArray[np.number]) -> npt.NDArray[np.number]:
+    """
+    Pads every row of vertex attribute data with zero components up to
+    the vertex alignment. Aligned data are returned as is.
+    """
+
+    padding = -(data.shape[1] * data.itemsize) % VERTEX_ALIGNMENT // data.itemsize
+    if padding == 0:
+        return data
+
+    return np.pad(data, ((0, 0), (0, padding)))
@@ -0,0 +1,156 @@
+from collections import deque
+
+import numpy as np
+import numpy.typing as npt
+
+# Post-transform vertex cache size the triangle order is optimized for
+VERTEX_CACHE_SIZE = 16
+
+
+def optimize_triangle_order(
+    indices: npt.NDArray[np.integer],
+    vertex_count: int,
+    cache_size: int = VERTEX_CACHE_SIZE,
+) -> npt.NDArray[np.integer]:
+    """
+    Reorders triangles of a triangle list for post-transform vertex cache
+    locality with Tipsify (Sander, Nehab and Barczak, "Fast Triangle
+    Reordering for Vertex Locality and Reduced Overdraw", 2007).
+
+    Triangles are emitted as fans around vertices. The next fanning vertex is
+    picked among vertices of the last fan that are still in the cache and
+    have triangles left, so the order stays local and overdraw friendly.
+    """
+
+    triangles = indices.reshape(-1, 3)
+    triangle_count = len(triangles)
+    if triangle_count == 0:
+        return indices.copy()
+
+    # Triangles adjacent to every vertex, in compressed sparse row layout
+    flat_indices = triangles.reshape(-1)
+    vertex_triangle_counts = np.bincount(flat_indices, minlength=vertex_count)
+    adjacency_offsets = np.zeros(vertex_count + 1, dtype=np.intp)
+    np.cumsum(vertex_triangle_counts, out=adjacency_offsets[1:])
+
+    adjacency = (np.argsort(flat_indices, kind="stable") // 3).tolist()
+    offsets = adjacency_offsets.tolist()
+    triangle_vertices = triangles.tolist()
+
+    live_triangles = vertex_triangle_counts.tolist()
+    cache_time = [0] * vertex_count
+    is_emitted = [False] * triangle_count
+    dead_end_stack: list[int] = []
+
+    output: list[int] = []
+    timestamp = cache_size + 1
+    cursor = 0
+
+    def skip_dead_end() -> int:
+        nonlocal cursor
+
+        while dead_end_stack:
+            vertex = dead_end_stack.pop()
+            if live_triangles[vertex] > 0:
+                return vertex
+
+        while cursor < vertex_count:
+            if live_triangles[cursor] > 0:
+                return cursor
+            cursor += 1
+
+        return -1
+
+    fanning_vertex = skip_dead_end()
+    while fanning_vertex >= 0:
+        candidates: dict[int, None] = {}
+
+        for triangle in adjacency[
+            offsets[fanning_vertex] : offsets[fanning_vertex + 1]
+        ]:
+            if is_emitted[triangle]:
+                continue
+
+            for vertex in triangle_vertices[triangle]:
+                output.append(vertex)
+                dead_end_stack.append(vertex)
+                candidates[vertex] = None
+                live_triangles[vertex] -= 1
+
+                if timestamp - cache_time[vertex] > cache_size:
+                    cache_time[vertex] = timestamp
+                    timestamp += 1
+
+            is_emitted[triangle] = True
+
+        # Candidate that stays in the cache after emitting its triangles and
+        # was cached the earliest is preferred
+        fanning_vertex = -1
+        best_priority = -1
+        for vertex in candidates:
+            if live_triangles[vertex] <= 0:
+                continue
+
+            priority = 0
+            age = timestamp - cache_time[vertex]
+            if age + 2 * live_triangles[vertex] <= cache_size:
+                priority = age
+
+            if priority > best_priority:
+                best_priority = priority
+                fanning_vertex = vertex
+
+        if fanning_vertex == -1:
+            fanning_vertex = skip_dead_end()
+
+    return np.array(output, dtype=indices.dtype)
+
+
+def get_vertex_fetch_order(
+    indices: npt.NDArray[np.integer], vertex_count: int
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]:
+    """
+    Orders vertices by their first use in the index buffer, unreferenced
+    vertices go last. Returns new vertex order and old to new index mapping.
+    """
+
+    flat_indices = indices.reshape(-1)
+    _, first_uses = np.unique(flat_indices, return_index=True)
+    referenced_order = flat_indices[np.sort(first_uses)].astype(np.intp)
+
+    is_referenced = np.zeros(vertex_count, dtype=bool)
+    is_referenced[referenced_order] = True
+    order = np.concatenate((referenced_order, np.flatnonzero(~is_referenced)))
+
+    remap = np.empty(vertex_count, dtype=np.intp)
+    remap[order] = np.arange(vertex_count)
+    return order, remap
+
+
+def calculate_acmr(
+    indices: npt.NDArray[np.integer], cache_size: int = VERTEX_CACHE_SIZE
+) -> float:
+    """
+    Calculates average cache miss ratio, the number of vertex shader
+    invocations per triangle, with a FIFO post-transform cache.
+    """
+
+    triangle_count = indices.size // 3
+    if triangle_count == 0:
+        return 0.0
+
+    cache: deque[int] = deque()
+    cached: set[int] = set()
+    misses = 0
+
+    for vertex in indices.reshape(-1).tolist():
+        if vertex in cached:
+            continue
+
+        misses += 1
+        cache.append(vertex)
+        cached.add(vertex)
+        if len(cache) > cache_size:
+            cached.discard(cache.popleft())
+
+    return misses / triangle_count
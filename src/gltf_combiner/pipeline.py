@@ -0,0 +1,274 @@
+import os
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import quote
+
+from gltf import GlTF
+from gltf.exceptions import (
+    AllAnimationChannelsDeletedException,
+    AnimationNotFoundException,
+)
+from gltf.gltf import get_file_data
+from gltf_combiner.cache import OdinCache
+from gltf_combiner.combiner import (
+    PreparedGeometry,
+    SplitGlTF,
+    build_combined_gltf,
+    build_multi_clip_gltf,
+    build_split_gltf,
+    prepare_geometry,
+    rebuild_gltf,
+    rebuild_gltf_streamed,
+)
+from gltf_combiner.extensions import ConversionOptions
+
+DEFAULT_WORKER_COUNT = min(4, os.cpu_count() or 1)
+DEFAULT_PREFETCH_COUNT = 2
+
+
+@dataclass
+class ConversionJob:
+    geometry_filepath: Path
+    animation_filepath: Path | None
+    output_filepath: Path
+    # Animation files combined into one output as clips named by their
+    # file names, used instead of `animation_filepath` if set
+    clip_filepaths: list[Path] = field(default_factory=list)
+
+
+@dataclass
+class ConversionResult:
+    job: ConversionJob
+    # Set when the animation file has nothing to combine and the job is skipped
+    error: Exception | None = None
+
+    @property
+    def skipped(self) -> bool:
+        return self.error is not None
+
+
+@dataclass
+class _InputData:
+    geometry: bytes
+    animation: bytes | None
+    clips: dict[str, bytes] = field(default_factory=dict)
+
+
+class _SharedGeometry:
+    """
+    Geometry prepared for combining, shared by consecutive jobs with the same
+    geometry file, so it's decoded once for them. It's kept until a job with
+    another geometry file is submitted, then it's freed with the last pending
+    job using it.
+    """
+
+    def __init__(self, filepath: Path) -> None:
+        self.filepath: Path = filepath
+        self._lock: threading.Lock = threading.Lock()
+        self._future: Future[PreparedGeometry] | None = None
+
+    def get(self, prepare: Callable[[], PreparedGeometry]) -> PreparedGeometry:
+        """
+        Returns the geometry prepared by `prepare` of the first job asking for
+        it, other jobs wait for it meanwhile.
+        """
+
+        with self._lock:
+            is_preparing = self._future is None
+            if self._future is None:
+                self._future = Future()
+            future = self._future
+
+        if is_preparing:
+            try:
+                future.set_result(prepare())
+            except BaseException as e:
+                future.set_exception(e)
+
+        return future.result()
+
+
+class ConversionPipeline:
+    """
+    Converts files with reading, decoding and writing overlapped. Input files
+    are read ahead by `prefetch_count` reader threads, decoded by
+    `worker_count` threads and written by a single background thread.
+
+    The number of unfinished jobs is bounded by the sum of worker and prefetch
+    counts, so a slow disk holds decoding back instead of piling results up
+    in memory.
+
+    With `streaming` set, geometry files without animations are converted in
+    bounded memory by the decoding threads, see `rebuild_gltf_streamed`.
+
+    With `split_output` set, jobs with clip files are converted to split
+    outputs, see `build_split_gltf`. Their output file is the geometry
+    buffer, animation files are written next to it.
+
+    Consecutive jobs combining the same geometry file share its prepared
+    geometry, see `prepare_geometry`.
+    """
+
+    def __init__(
+        self,
+        *,
+        worker_count: int = DEFAULT_WORKER_COUNT,
+        prefetch_count: int = DEFAULT_PREFETCH_COUNT,
+        fix_texcoords: bool = True,
+        cache: OdinCache | None = None,
+        streaming: bool = False,
+        split_output: bool = False,
+        options: ConversionOptions | None = None,
+    ) -> None:
+        self.worker_count: int = max(worker_count, 1)
+        self.prefetch_count: int = max(prefetch_count, 1)
+        self.fix_texcoords: bool = fix_texcoords
+        self.cache: OdinCache | None = cache
+        self.streaming: bool = streaming
+        self.split_output: bool = split_output
+        self.options: ConversionOptions | None = options
+
+    def run(self, jobs: Iterable[ConversionJob]) -> Iterator[ConversionResult]:
+        """
+        Yields results in order of jobs once their outputs are written.
+        Unexpected errors are raised from here and cancel the remaining jobs.
+        """
+
+        max_pending_count = self.worker_count + self.prefetch_count
+        pending: deque[Future[ConversionResult]] = deque()
+        shared_geometry: _SharedGeometry | None = None
+
+        with (
+            ThreadPoolExecutor(self.prefetch_count, "gltf_reader") as readers,
+            ThreadPoolExecutor(self.worker_count, "gltf_decoder") as decoders,
+            ThreadPoolExecutor(1, "gltf_writer") as writers,
+        ):
+            try:
+                for job in jobs:
+                    if len(pending) >= max_pending_count:
+                        yield pending.popleft().result()
+
+                    if (
+                        shared_geometry is None
+                        or shared_geometry.filepath != job.geometry_filepath
+                    ):
+                        shared_geometry = _SharedGeometry(job.geometry_filepath)
+
+                    read_future = readers.submit(self._read, job)
+                    decode_future = decoders.submit(
+                        self._decode, job, read_future, shared_geometry
+                    )
+                    pending.append(writers.submit(self._write, job, decode_future))
+
+                while pending:
+                    yield pending.popleft().result()
+            except BaseException:
+                for executor in (readers, decoders, writers):
+                    executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    def _read(self, job: ConversionJob) -> _InputData | None:
+        if self._is_streamed(job):
+            return None
+
+        return _InputData(
+            get_file_data(job.geometry_filepath),
+            get_file_data(job.animation_filepath)
+            if job.animation_filepath is not None
+            else None,
+            {filepath.stem: get_file_data(filepath) for filepath in job.clip_filepaths},
+        )
+
+    def _decode(
+        self,
+        job: ConversionJob,
+        read_future: Future[_InputData | None],
+        shared_geometry: _SharedGeometry,
+    ) -> GlTF | SplitGlTF | ConversionResult:
+        if not self._is_combined(job):
+            return self._rebuild(job, read_future.result())
+
+        return self._combine(job, read_future.result(), shared_geometry)
+
+    def _rebuild(
+        self, job: ConversionJob, data: _InputData | None
+    ) -> GlTF | ConversionResult:
+        if data is None:
+            rebuild_gltf_streamed(
+                job.geometry_filepath,
+                job.output_filepath,
+                fix_texcoords=self.fix_texcoords,
+                options=self.options,
+            )
+            return ConversionResult(job)
+
+        return rebuild_gltf(
+            data.geometry,
+            fix_texcoords=self.fix_texcoords,
+            cache=self.cache,
+            options=self.options,
+        )
+
+    def _combine(
+        self,
+        job: ConversionJob,
+        data: _InputData | None,
+        shared_geometry: _SharedGeometry,
+    ) -> GlTF | SplitGlTF | ConversionResult:
+        assert data is not None
+        geometry = shared_geometry.get(
+            lambda: prepare_geometry(
+                data.geometry,
+                fix_texcoords=self.fix_texcoords,
+                cache=self.cache,
+                options=self.options,
+            ),
+        )
+
+        try:
+            if len(data.clips) > 0 and self.split_output:
+                return build_split_gltf(
+                    geometry,
+                    data.clips,
+                    quote(job.output_filepath.name),
+                    cache=self.cache,
+                    options=self.options,
+                )
+
+            if len(data.clips) > 0:
+                return build_multi_clip_gltf(
+                    geometry, data.clips, cache=self.cache, options=self.options
+                )
+
+            assert data.animation is not None
+            return build_combined_gltf(
+                geometry, data.animation, cache=self.cache, options=self.options
+            )
+        except (AnimationNotFoundException, AllAnimationChannelsDeletedException) as e:
+            return ConversionResult(job, e)
+
+    def _write(
+        self,
+        job: ConversionJob,
+        decode_future: Future[GlTF | SplitGlTF | ConversionResult],
+    ) -> ConversionResult:
+        gltf = decode_future.result()
+        if isinstance(gltf, ConversionResult):
+            return gltf
+
+        gltf.write(job.output_filepath)
+        return ConversionResult(job)
+
+    def _is_combined(self, job: ConversionJob) -> bool:
+        return job.animation_filepath is not None or len(job.clip_filepaths) > 0
+
+    def _is_streamed(self, job: ConversionJob) -> bool:
+        return (
+            self.streaming
+            and job.animation_filepath is None
+            and len(job.clip_filepaths) == 0
+        )
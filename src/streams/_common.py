@@ -1,3 +1,4 @@
+from struct import Struct
 from typing import Literal, assert_never
 
 type EndianName = Literal["big", "little"]
@@ -12,3 +13,29 @@ def get_endian_sign(endian: EndianName) -> EndianSign:
             return "<"
         case _:
             assert_never(endian)
+
+
+class Structs:
+    """Precompiled structs of all supported value types for one endianness."""
+
+    def __init__(self, endian_sign: EndianSign) -> None:
+        self.double: Struct = Struct(f"{endian_sign}d")
+        self.float: Struct = Struct(f"{endian_sign}f")
+        self.u_int64: Struct = Struct(f"{endian_sign}Q")
+        self.int64: Struct = Struct(f"{endian_sign}q")
+        self.u_int32: Struct = Struct(f"{endian_sign}I")
+        self.int32: Struct = Struct(f"{endian_sign}i")
+        self.u_int16: Struct = Struct(f"{endian_sign}H")
+        self.int16: Struct = Struct(f"{endian_sign}h")
+        self.u_int8: Struct = Struct(f"{endian_sign}B")
+        self.int8: Struct = Struct(f"{endian_sign}b")
+
+
+_STRUCTS: dict[EndianSign, Structs] = {
+    ">": Structs(">"),
+    "<": Structs("<"),
+}
+
+
+def get_structs(endian_sign: EndianSign) -> Structs:
+    return _STRUCTS[endian_sign]
@@ -1,52 +1,58 @@
-from io import BufferedReader, BytesIO
-from struct import unpack
+from struct import Struct
 from typing import Literal
 
-from ._common import EndianSign, get_endian_sign
+import numpy as np
+import numpy.typing as npt
+
+from ._common import EndianSign, Structs, get_endian_sign, get_structs
 
 
 class ByteReader:
     def __init__(self, initial_bytes: bytes, endian: Literal["big", "little"] = "big"):
-        self._internal_reader: BufferedReader[BytesIO] = BufferedReader(
-            BytesIO(initial_bytes)
-        )
+        self._buffer: memoryview = memoryview(initial_bytes).cast("B")
+        self._position: int = 0
         self._endian_sign: EndianSign = get_endian_sign(endian)
+        self._structs: Structs = get_structs(self._endian_sign)
 
     def seek(self, position: int) -> None:
-        self._internal_reader.seek(position)
+        self._position = position
 
     def tell(self) -> int:
-        return self._internal_reader.tell()
+        return self._position
 
     def read(self, size: int) -> bytes:
-        return self._internal_reader.read(size)
+        data = bytes(self._buffer[self._position : self._position + size])
+        self._position += len(data)
+        return data
 
     def read_all_bytes(self) -> bytes:
-        return self._internal_reader.read()
+        data = bytes(self._buffer[self._position :])
+        self._position += len(data)
+        return data
 
     def read_u_int64(self) -> int:
-        return unpack(f"{self._endian_sign}Q", self.read(8))[0]
+        return self._unpack(self._structs.u_int64)
 
     def read_int64(self) -> int:
-        return unpack(f"{self._endian_sign}q", self.read(8))[0]
+        return self._unpack(self._structs.int64)
 
     def read_u_int32(self) -> int:
-        return unpack(f"{self._endian_sign}I", self.read(4))[0]
+        return self._unpack(self._structs.u_int32)
 
     def read_int32(self) -> int:
-        return unpack(f"{self._endian_sign}i", self.read(4))[0]
+        return self._unpack(self._structs.int32)
 
     def read_u_int16(self) -> int:
-        return unpack(f"{self._endian_sign}H", self.read(2))[0]
+        return self._unpack(self._structs.u_int16)
 
     def read_int16(self) -> int:
-        return unpack(f"{self._endian_sign}h", self.read(2))[0]
+        return self._unpack(self._structs.int16)
 
     def read_u_int8(self) -> int:
-        return unpack(f"{self._endian_sign}B", self.read(1))[0]
+        return self._unpack(self._structs.u_int8)
 
     def read_int8(self) -> int:
-        return unpack(f"{self._endian_sign}b", self.read(1))[0]
+        return self._unpack(self._structs.int8)
 
     def read_string(self) -> str:
         length = self.read_int32()
@@ -54,3 +60,27 @@ class ByteReader:
             return ""
 
         return self.read(length).decode("utf-8")
+
+    def read_array(self, dtype: npt.DTypeLike, count: int) -> np.ndarray:
+        """
+        Reads `count` values as a read-only array without copying. Values are
+        interpreted in the reader's endianness.
+        """
+
+        array_dtype = np.dtype(dtype).newbyteorder(self._endian_sign)
+        array = np.frombuffer(
+            self._buffer, dtype=array_dtype, count=count, offset=self._position
+        )
+        self._position += array.nbytes
+        return array
+
+    def read_array_into(self, array: np.ndarray) -> None:
+        """Fills `array` with values read in the reader's endianness."""
+
+        values = self.read_array(array.dtype, array.size)
+        array[...] = values.reshape(array.shape)
+
+    def _unpack(self, struct: Struct) -> int:
+        position = self._position
+        self._position = position + struct.size
+        return struct.unpack_from(self._buffer, position)[0]
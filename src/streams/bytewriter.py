@@ -1,46 +1,61 @@
-from struct import pack
+from struct import Struct
 from typing import Literal
 
-from ._common import EndianSign, get_endian_sign
+import numpy as np
+
+from ._common import EndianSign, Structs, get_endian_sign, get_structs
 
 
 class ByteWriter:
-    def __init__(self, endian: Literal["big", "little"] = "big"):
-        self._buffer: bytearray = bytearray()
+    def __init__(self, endian: Literal["big", "little"] = "big", capacity: int = 0):
+        self._buffer: bytearray = bytearray(capacity)
+        self._size: int = 0
         self._endian_sign: EndianSign = get_endian_sign(endian)
+        self._structs: Structs = get_structs(self._endian_sign)
 
     def write(self, value: bytes) -> None:
-        self._buffer += value
+        size = len(value)
+        self._reserve(size)
+        self._buffer[self._size : self._size + size] = value
+        self._size += size
 
     def write_double(self, value: float) -> None:
-        self.write(pack(f"{self._endian_sign}d", value))
+        self._pack(self._structs.double, value)
 
     def write_float(self, value: float) -> None:
-        self.write(pack(f"{self._endian_sign}f", value))
+        self._pack(self._structs.float, value)
 
     def write_u_int64(self, integer: int):
-        self.write(pack(f"{self._endian_sign}Q", integer))
+        self._pack(self._structs.u_int64, integer)
 
     def write_int64(self, integer: int) -> None:
-        self.write(pack(f"{self._endian_sign}q", integer))
+        self._pack(self._structs.int64, integer)
 
     def write_u_int32(self, integer: int) -> None:
-        self.write(pack(f"{self._endian_sign}I", integer))
+        self._pack(self._structs.u_int32, integer)
 
     def write_int32(self, integer: int) -> None:
-        self.write(pack(f"{self._endian_sign}i", integer))
+        self._pack(self._structs.int32, integer)
 
     def write_u_int16(self, integer: int) -> None:
-        self.write(pack(f"{self._endian_sign}H", integer))
+        self._pack(self._structs.u_int16, integer)
 
     def write_int16(self, integer: int) -> None:
-        self.write(pack(f"{self._endian_sign}h", integer))
+        self._pack(self._structs.int16, integer)
 
     def write_u_int8(self, integer: int) -> None:
-        self.write(pack(f"{self._endian_sign}B", integer))
+        self._pack(self._structs.u_int8, integer)
 
     def write_int8(self, integer: int) -> None:
-        self.write(pack(f"{self._endian_sign}b", integer))
+        self._pack(self._structs.int8, integer)
+
+    def write_array(self, array: np.ndarray) -> None:
+        """Writes all array values in the writer's endianness."""
+
+        array = np.ascontiguousarray(
+            array, dtype=array.dtype.newbyteorder(self._endian_sign)
+        )
+        self.write(memoryview(array.reshape(-1).view(np.uint8)))
 
     # Override string writing
     def write_string(self, string: str) -> None:
@@ -50,8 +65,48 @@ class ByteWriter:
 
     @property
     def buffer(self) -> bytes:
-        return bytes(self._buffer)
+        """Copy of the written bytes. Use `getbuffer` or `detach` to avoid copying."""
+
+        return bytes(memoryview(self._buffer)[: self._size])
+
+    def getbuffer(self) -> memoryview:
+        """
+        Returns a read-only view of the written bytes without copying. The writer
+        can't grow while the view is alive, so release it before writing more.
+        """
+
+        return memoryview(self._buffer)[: self._size].toreadonly()
+
+    def detach(self) -> bytearray:
+        """Hands over the written bytes without copying and leaves the writer empty."""
+
+        buffer = self._buffer
+        del buffer[self._size :]
+
+        self._buffer = bytearray()
+        self._size = 0
+        return buffer
 
     @property
     def position(self):
-        return len(self._buffer)
+        return self._size
+
+    def _pack(self, struct: Struct, value: int | float) -> None:
+        position = self._size
+        size = struct.size
+        if position + size > len(self._buffer):
+            self._reserve(size)
+
+        struct.pack_into(self._buffer, position, value)
+        self._size = position + size
+
+    def _reserve(self, size: int) -> None:
+        """Grows the buffer geometrically to fit `size` more bytes."""
+
+        required_capacity = self._size + size
+        capacity = len(self._buffer)
+        if required_capacity <= capacity:
+            return
+
+        new_capacity = max(required_capacity, capacity * 2)
+        self._buffer.extend(bytes(new_capacity - capacity))
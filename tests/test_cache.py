@@ -0,0 +1,47 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.synthetic import create_geometry
+from gltf_combiner import cache
+from gltf_combiner.cache import OdinCache
+
+
+class OdinCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        self.directory = Path(directory.name)
+
+    def test_keys_depend_on_format_version(self) -> None:
+        key = OdinCache(self.directory).make_key(b"data")
+        self.assertEqual(OdinCache(self.directory).make_key(b"data"), key)
+
+        with mock.patch.object(
+            cache, "CACHE_FORMAT_VERSION", cache.CACHE_FORMAT_VERSION + 1
+        ):
+            self.assertNotEqual(OdinCache(self.directory).make_key(b"data"), key)
+
+    def test_stale_temp_files_are_removed(self) -> None:
+        stale = self.directory / "stale.tmp"
+        fresh = self.directory / "fresh.tmp"
+        stale.write_bytes(b"data")
+        fresh.write_bytes(b"data")
+
+        stale_time = time.time() - cache.STALE_TEMP_FILE_AGE - 1
+        os.utime(stale, (stale_time, stale_time))
+
+        odin_cache = OdinCache(self.directory)
+        odin_cache.put(odin_cache.make_key(b"data"), create_geometry(100, 1))
+
+        self.assertFalse(stale.exists())
+        self.assertTrue(fresh.exists())
+        self.assertEqual(len(list(self.directory.glob("*.glb"))), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+
+import numpy as np
+import orjson
+
+from benchmarks.synthetic import create_animation, create_geometry
+from gltf import BIN_CHUNK_TYPE, JSON_CHUNK_TYPE, Chunk, GlTF
+from gltf_combiner import ConversionOptions, build_combined_gltf, rebuild_gltf
+
+
+def _get_texcoords(gltf: GlTF) -> list[tuple[bool, np.ndarray]]:
+    """Returns normalized flag and values of texcoords of every primitive."""
+
+    json_chunk = gltf.get_chunk_by_type(JSON_CHUNK_TYPE)
+    bin_chunk = gltf.get_chunk_by_type(BIN_CHUNK_TYPE)
+    assert json_chunk is not None and bin_chunk is not None
+
+    json_data = json_chunk.json()
+    data = bytes(bin_chunk.data)
+
+    texcoords = []
+    for mesh in json_data["meshes"]:
+        for primitive in mesh["primitives"]:
+            accessor = json_data["accessors"][primitive["attributes"]["TEXCOORD_0"]]
+            buffer_view = json_data["bufferViews"][accessor["bufferView"]]
+            values = np.ndarray(
+                (accessor["count"], 2),
+                np.int16,
+                data,
+                offset=buffer_view["byteOffset"] + accessor.get("byteOffset", 0),
+                strides=(buffer_view.get("byteStride", 4), 2),
+            )
+            texcoords.append((accessor.get("normalized", False), values.copy()))
+
+    return texcoords
+
+
+class DeduplicationTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Meshes of the synthetic geometry have identical texcoords
+        self.geometry = create_geometry(500, 8, mesh_count=2).to_bytes()
+        self.animation = create_animation(8, 20).to_bytes()
+
+    def assertTexcoordsEqual(self, first: GlTF, second: GlTF) -> None:
+        for (first_normalized, first_values), (second_normalized, second_values) in zip(
+            _get_texcoords(first), _get_texcoords(second), strict=True
+        ):
+            self.assertEqual(first_normalized, second_normalized)
+            np.testing.assert_array_equal(first_values, second_values)
+
+    def test_shared_texcoords_are_fixed_once(self) -> None:
+        for options in (
+            ConversionOptions(),
+            ConversionOptions(pass_vertices_through=True),
+        ):
+            deduplicated_options = ConversionOptions(
+                deduplicate_buffers=True,
+                pass_vertices_through=options.pass_vertices_through,
+            )
+
+            self.assertTexcoordsEqual(
+                rebuild_gltf(self.geometry, fix_texcoords=True, options=options),
+                rebuild_gltf(
+                    self.geometry, fix_texcoords=True, options=deduplicated_options
+                ),
+            )
+            self.assertTexcoordsEqual(
+                build_combined_gltf(
+                    self.geometry, self.animation, fix_texcoords=True, options=options
+                ),
+                build_combined_gltf(
+                    self.geometry,
+                    self.animation,
+                    fix_texcoords=True,
+                    options=deduplicated_options,
+                ),
+            )
+
+    def test_meshes_without_primitives(self) -> None:
+        animation = GlTF.from_bytes(self.animation)
+        json_chunk = animation.get_chunk_by_type(JSON_CHUNK_TYPE)
+        bin_chunk = animation.get_chunk_by_type(BIN_CHUNK_TYPE)
+        assert json_chunk is not None and bin_chunk is not None
+
+        # Odin animations can have meshes with empty primitives only
+        json_data = json_chunk.json()
+        json_data["meshes"] = [{"primitives": [{}]}]
+        animation = GlTF(Chunk(JSON_CHUNK_TYPE, orjson.dumps(json_data)), bin_chunk)
+
+        build_combined_gltf(
+            self.geometry,
+            animation.to_bytes(),
+            fix_texcoords=True,
+            options=ConversionOptions(deduplicate_buffers=True),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
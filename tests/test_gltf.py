@@ -0,0 +1,46 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from benchmarks.synthetic import create_geometry
+from gltf import JSON_CHUNK_TYPE, GlTF
+from gltf.exceptions import WrongFileException
+
+
+class MappedGlTFTest(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        self.directory = Path(directory.name)
+
+    def test_mapped_file_is_closed(self) -> None:
+        filepath = self.directory / "geometry.glb"
+        geometry = create_geometry(500, 8)
+        geometry.write(filepath)
+
+        with GlTF.map(filepath) as gltf:
+            self.assertEqual(gltf.to_bytes(), geometry.to_bytes())
+            chunk = gltf.get_chunk_by_type(JSON_CHUNK_TYPE)
+            assert chunk is not None
+            data = chunk.data
+
+        self.assertIsNone(gltf.get_chunk_by_type(JSON_CHUNK_TYPE))
+        with self.assertRaises(ValueError):
+            bytes(data)
+
+        # Closing again or closing a parsed file does nothing
+        gltf.close()
+        GlTF.parse(filepath).close()
+
+    def test_wrong_files(self) -> None:
+        for data in (b"", b"glTF", bytes(64)):
+            filepath = self.directory / "wrong.glb"
+            filepath.write_bytes(data)
+
+            with self.subTest(data=data), self.assertRaises(WrongFileException):
+                GlTF.map(filepath)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+
+import numpy as np
+
+from benchmarks.synthetic import create_animation
+from gltf_combiner import ConversionOptions, KeyframeTolerances, rebuild_gltf
+from gltf_combiner.extensions.odin.keyframe_reduction import reduce_keyframes
+from tests.utils import (
+    Document,
+    get_channels,
+    get_rotation_errors,
+    read_document,
+    sample_channel,
+)
+
+PATHS = ("translation", "rotation", "scale")
+
+
+def _sample_components(
+    document: Document, keys: list[tuple[int, str]], times: np.ndarray
+) -> dict[tuple[int, str], np.ndarray]:
+    """
+    Returns values of node components at `times`. Components without a
+    channel keep the rest value of their node.
+    """
+
+    channels = get_channels(document)
+    nodes = document[0]["nodes"]
+
+    samples = {}
+    for node, path in keys:
+        if (node, path) in channels:
+            samples[node, path] = sample_channel(
+                *channels[node, path], times, is_rotation=path == "rotation"
+            )
+        else:
+            rest = {"rotation": [0, 0, 0, 1], "scale": [1, 1, 1]}.get(path, [0, 0, 0])
+            value = np.array(nodes[node].get(path, rest), dtype=np.float64)
+            samples[node, path] = np.tile(value, (len(times), 1))
+
+    return samples
+
+
+class KeyframeReductionTest(unittest.TestCase):
+    def test_zero_quaternions_are_kept(self) -> None:
+        values = np.tile(np.array([0.0, 0.0, 0.0, 1.0]), (8, 1))
+        values[3] = 0
+
+        with np.errstate(all="raise"):
+            frames = reduce_keyframes(values, 1e-4, is_rotation=True)
+            self.assertEqual(frames.tolist(), [0, 2, 3, 4, 7])
+
+            frames = reduce_keyframes(np.zeros((4, 4)), 1e-4, is_rotation=True)
+            self.assertEqual(frames.tolist(), [0, 1, 2, 3])
+
+    def test_reduced_animation(self) -> None:
+        tolerances = KeyframeTolerances(translation=1e-2, rotation=1e-2, scale=1e-2)
+        animation = create_animation(8, 120).to_bytes()
+
+        default = read_document(rebuild_gltf(animation, fix_texcoords=False))
+        reduced = read_document(
+            rebuild_gltf(
+                animation,
+                fix_texcoords=False,
+                options=ConversionOptions(keyframe_tolerances=tolerances),
+            )
+        )
+
+        default_channels = get_channels(default)
+        self.assertLess(
+            sum(len(times) for times, _ in get_channels(reduced).values()),
+            sum(len(times) for times, _ in default_channels.values()),
+        )
+
+        keys = [
+            (node, path) for node in range(len(default[0]["nodes"])) for path in PATHS
+        ]
+        times = next(iter(default_channels.values()))[0]
+        default_samples = _sample_components(default, keys, times)
+        reduced_samples = _sample_components(reduced, keys, times)
+
+        for node, path in keys:
+            with self.subTest(node=node, path=path):
+                default_values = default_samples[node, path]
+                reduced_values = reduced_samples[node, path]
+                if path == "rotation":
+                    errors = get_rotation_errors(reduced_values, default_values)
+                else:
+                    errors = np.linalg.norm(reduced_values - default_values, axis=1)
+
+                # Rounding of stored values adds to the tolerance
+                self.assertLessEqual(errors.max(), getattr(tolerances, path) + 1e-5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+
+from benchmarks.synthetic import create_geometry
+from gltf_combiner import ConversionOptions, rebuild_gltf
+from tests.utils import Document, read_accessor, read_document
+
+
+class PassthroughTest(unittest.TestCase):
+    def assertAccessorsEqual(
+        self, first: Document, first_index: int, second: Document, second_index: int
+    ) -> None:
+        first_accessor = first[0]["accessors"][first_index]
+        second_accessor = second[0]["accessors"][second_index]
+        for key in ("componentType", "type", "count"):
+            self.assertEqual(first_accessor[key], second_accessor[key])
+        self.assertEqual(
+            first_accessor.get("normalized", False),
+            second_accessor.get("normalized", False),
+        )
+
+        np.testing.assert_array_equal(
+            read_accessor(first, first_index), read_accessor(second, second_index)
+        )
+
+    def assertPrimitivesEqual(self, first: Document, second: Document) -> None:
+        for first_mesh, second_mesh in zip(
+            first[0]["meshes"], second[0]["meshes"], strict=True
+        ):
+            for first_primitive, second_primitive in zip(
+                first_mesh["primitives"], second_mesh["primitives"], strict=True
+            ):
+                first_attributes = first_primitive["attributes"]
+                second_attributes = second_primitive["attributes"]
+                self.assertEqual(first_attributes.keys(), second_attributes.keys())
+
+                for name, index in first_attributes.items():
+                    self.assertAccessorsEqual(
+                        first, index, second, second_attributes[name]
+                    )
+                self.assertAccessorsEqual(
+                    first,
+                    first_primitive["indices"],
+                    second,
+                    second_primitive["indices"],
+                )
+
+    def test_passed_through_vertices(self) -> None:
+        for layout in ("skinned", "static", "colored"):
+            for fix_texcoords in (False, True):
+                geometry = create_geometry(500, 8, mesh_count=2, layout=layout)
+                default = rebuild_gltf(geometry.to_bytes(), fix_texcoords=fix_texcoords)
+                passed_through = rebuild_gltf(
+                    geometry.to_bytes(),
+                    fix_texcoords=fix_texcoords,
+                    options=ConversionOptions(pass_vertices_through=True),
+                )
+
+                with self.subTest(layout=layout, fix_texcoords=fix_texcoords):
+                    document = read_document(passed_through)
+
+                    # Passed through vertices keep their interleaved layout
+                    self.assertTrue(
+                        any("byteStride" in view for view in document[0]["bufferViews"])
+                    )
+                    self.assertPrimitivesEqual(read_document(default), document)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+import unittest
+
+import numpy as np
+
+from benchmarks.synthetic import create_animation, create_geometry
+from gltf import GlTF
+from gltf_combiner import ConversionOptions, rebuild_gltf
+from gltf_combiner.extensions.odin.gltf_component_type import ComponentType
+from tests.utils import (
+    Document,
+    edit_document,
+    get_channels,
+    get_rotation_errors,
+    read_accessor,
+    read_document,
+    read_normalized_accessor,
+)
+
+# Largest differences of attributes other than positions after quantization,
+# weights get rounding errors of the other weights of their vertex
+ATTRIBUTE_TOLERANCES = {"NORMAL": 1 / 127, "WEIGHTS_0": 4 / 65535}
+
+
+def _remove_skins(gltf: GlTF) -> GlTF:
+    def edit(json_data: dict, data: bytearray) -> None:
+        for node in json_data["nodes"]:
+            node.pop("skin", None)
+
+    return edit_document(gltf, edit)
+
+
+def _get_skin_matrices(document: Document) -> np.ndarray:
+    """Returns inverse bind matrices of the first skin in row-major order."""
+
+    skin = document[0]["skins"][0]
+    if "inverseBindMatrices" not in skin:
+        return np.eye(4)[np.newaxis].repeat(len(skin["joints"]), axis=0)
+
+    matrices = read_accessor(document, skin["inverseBindMatrices"])
+    return matrices.reshape(-1, 4, 4).transpose(0, 2, 1)
+
+
+def _get_mesh_matrices(document: Document) -> list[np.ndarray]:
+    """Returns world transforms of mesh nodes by mesh index."""
+
+    nodes = document[0]["nodes"]
+    parents = {
+        child: index
+        for index, node in enumerate(nodes)
+        for child in node.get("children", [])
+    }
+
+    def get_local_matrix(node: dict) -> np.ndarray:
+        x, y, z, w = node.get("rotation", [0.0, 0.0, 0.0, 1.0])
+        rotation = np.array(
+            [
+                [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+                [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+                [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+            ]
+        )
+
+        matrix = np.eye(4)
+        matrix[:3, :3] = rotation * node.get("scale", [1.0] * 3)
+        matrix[:3, 3] = node.get("translation", [0.0] * 3)
+        return matrix
+
+    matrices = {}
+    for index, node in enumerate(nodes):
+        if "mesh" not in node:
+            continue
+
+        matrix = get_local_matrix(node)
+        while index in parents:
+            index = parents[index]
+            matrix = get_local_matrix(nodes[index]) @ matrix
+        matrices[node["mesh"]] = matrix
+
+    return [matrices[mesh] for mesh in range(len(matrices))]
+
+
+class QuantizationTest(unittest.TestCase):
+    def assertAttributesClose(
+        self,
+        default: Document,
+        quantized: Document,
+        default_matrices: list[np.ndarray],
+        quantized_matrices: list[np.ndarray],
+    ) -> None:
+        """
+        Checks that quantized attributes of every mesh match the default ones,
+        positions are compared after their mesh transforms.
+        """
+
+        for mesh, (default_mesh, quantized_mesh) in enumerate(
+            zip(default[0]["meshes"], quantized[0]["meshes"], strict=True)
+        ):
+            for default_primitive, quantized_primitive in zip(
+                default_mesh["primitives"], quantized_mesh["primitives"], strict=True
+            ):
+                default_attributes = default_primitive["attributes"]
+                quantized_attributes = quantized_primitive["attributes"]
+                self.assertEqual(default_attributes.keys(), quantized_attributes.keys())
+
+                for name in default_attributes:
+                    default_values = read_normalized_accessor(
+                        default, default_attributes[name]
+                    )
+                    quantized_values = read_normalized_accessor(
+                        quantized, quantized_attributes[name]
+                    )
+
+                    if name == "POSITION":
+                        accessor = quantized[0]["accessors"][quantized_attributes[name]]
+                        self.assertEqual(accessor["componentType"], ComponentType.Short)
+
+                        default_values = np.hstack(
+                            (default_values, np.ones((len(default_values), 1)))
+                        ) @ default_matrices[mesh].transpose(0, 2, 1)
+                        quantized_values = np.hstack(
+                            (quantized_values, np.ones((len(quantized_values), 1)))
+                        ) @ quantized_matrices[mesh].transpose(0, 2, 1)
+
+                        # Rounding to the int16 grid of the dequantization scale
+                        scales = quantized_matrices[mesh][:, :3, :3]
+                        tolerance = np.abs(scales).max() / 32767
+                    else:
+                        tolerance = ATTRIBUTE_TOLERANCES.get(name, 1 / 32767)
+
+                    with self.subTest(mesh=mesh, attribute=name):
+                        self.assertLessEqual(
+                            np.abs(quantized_values - default_values).max(), tolerance
+                        )
+
+    def test_quantized_skinned_attributes(self) -> None:
+        geometry = create_geometry(500, 8, mesh_count=2).to_bytes()
+
+        default = read_document(rebuild_gltf(geometry, fix_texcoords=False))
+        quantized = read_document(
+            rebuild_gltf(
+                geometry,
+                fix_texcoords=False,
+                options=ConversionOptions(quantize_attributes=True),
+            )
+        )
+
+        # Meshes of a skin share its inverse bind matrices
+        mesh_count = len(default[0]["meshes"])
+        self.assertAttributesClose(
+            default,
+            quantized,
+            [_get_skin_matrices(default)] * mesh_count,
+            [_get_skin_matrices(quantized)] * mesh_count,
+        )
+
+    def test_quantized_attributes(self) -> None:
+        geometry = _remove_skins(create_geometry(500, 8, mesh_count=2)).to_bytes()
+
+        default = read_document(rebuild_gltf(geometry, fix_texcoords=False))
+        quantized = read_document(
+            rebuild_gltf(
+                geometry,
+                fix_texcoords=False,
+                options=ConversionOptions(quantize_attributes=True),
+            )
+        )
+
+        self.assertAttributesClose(
+            default,
+            quantized,
+            [matrix[np.newaxis] for matrix in _get_mesh_matrices(default)],
+            [matrix[np.newaxis] for matrix in _get_mesh_matrices(quantized)],
+        )
+
+    def assertRotationsClose(self, animation: bytes) -> None:
+        default = read_document(rebuild_gltf(animation, fix_texcoords=False))
+        quantized = read_document(
+            rebuild_gltf(
+                animation,
+                fix_texcoords=False,
+                options=ConversionOptions(quantize_rotations=True),
+            )
+        )
+
+        default_channels = get_channels(default)
+        quantized_channels = get_channels(quantized)
+        self.assertEqual(default_channels.keys(), quantized_channels.keys())
+
+        for (node, path), (times, values) in default_channels.items():
+            quantized_times, quantized_values = quantized_channels[node, path]
+            self.assertEqual(times.tolist(), quantized_times.tolist())
+            if path != "rotation":
+                self.assertEqual(values.tolist(), quantized_values.tolist())
+                continue
+
+            # Every component is rounded by half of the int16 step at most
+            errors = get_rotation_errors(quantized_values, values)
+            self.assertLessEqual(errors.max(), 2 / 32767)
+
+        for sampler in quantized[0]["animations"][0]["samplers"]:
+            accessor = quantized[0]["accessors"][sampler["output"]]
+            if accessor["type"] == "VEC4":
+                self.assertEqual(accessor["componentType"], ComponentType.Short)
+
+    def test_quantized_rotations(self) -> None:
+        # Packed animations store normalized rotations, others are quantized
+        for encoding in ("packed", "continuous", "raw"):
+            with self.subTest(encoding=encoding):
+                self.assertRotationsClose(
+                    create_animation(8, 40, encoding=encoding).to_bytes()
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from benchmarks.synthetic import create_geometry
+from gltf_combiner import ConversionOptions, rebuild_gltf, rebuild_gltf_streamed
+
+
+class StreamingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        self.directory = Path(directory.name)
+        self.geometry = self.directory / "geometry.glb"
+        create_geometry(2000, 8, mesh_count=2, layout="static").write(self.geometry)
+
+    def assertStreamedAsInMemory(self, options: ConversionOptions) -> None:
+        output = self.directory / "output.glb"
+        rebuild_gltf_streamed(
+            self.geometry, output, fix_texcoords=True, options=options
+        )
+
+        self.assertEqual(
+            output.read_bytes(),
+            rebuild_gltf(self.geometry, fix_texcoords=True, options=options).to_bytes(),
+        )
+
+    def test_optimizations_drop_spilled_data(self) -> None:
+        for options in (
+            ConversionOptions(optimize_vertices=True),
+            ConversionOptions(optimize_vertex_cache=True),
+            ConversionOptions(quantize_attributes=True),
+            ConversionOptions(pass_vertices_through=True),
+            ConversionOptions(deduplicate_buffers=True),
+        ):
+            with self.subTest(options=options):
+                self.assertStreamedAsInMemory(options)
+
+
+if __name__ == "__main__":
+    unittest.main()
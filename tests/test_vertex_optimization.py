@@ -0,0 +1,117 @@
+import unittest
+
+import numpy as np
+
+from benchmarks.synthetic import create_geometry
+from gltf import GlTF
+from gltf_combiner import ConversionOptions, rebuild_gltf
+from tests.utils import (
+    add_accessor,
+    edit_document,
+    get_triangles,
+    read_accessor,
+    read_document,
+)
+
+
+def _add_morph_targets(gltf: GlTF) -> GlTF:
+    """Adds a position target with a distinct displacement of every vertex."""
+
+    def edit(json_data: dict, data: bytearray) -> None:
+        for mesh in json_data["meshes"]:
+            for primitive in mesh["primitives"]:
+                indices = read_accessor((json_data, bytes(data)), primitive["indices"])
+                vertex_count = int(indices.max()) + 1
+                displacements = np.arange(vertex_count * 3).reshape(-1, 3)
+                primitive["targets"] = [
+                    {"POSITION": add_accessor(json_data, data, displacements)}
+                ]
+
+    return edit_document(gltf, edit)
+
+
+class VertexOptimizationTest(unittest.TestCase):
+    def assertTrianglesEqual(self, first: GlTF, second: GlTF) -> None:
+        first_document = read_document(first)
+        second_document = read_document(second)
+
+        for first_mesh, second_mesh in zip(
+            first_document[0]["meshes"], second_document[0]["meshes"], strict=True
+        ):
+            for first_primitive, second_primitive in zip(
+                first_mesh["primitives"], second_mesh["primitives"], strict=True
+            ):
+                first_triangles = get_triangles(first_document, first_primitive)
+                second_triangles = get_triangles(second_document, second_primitive)
+
+                # Triangles are counted, as a diff of their data would be huge
+                self.assertEqual(len(first_triangles), len(second_triangles))
+                self.assertEqual(
+                    sum(
+                        first != second
+                        for first, second in zip(first_triangles, second_triangles)
+                    ),
+                    0,
+                )
+
+    def test_optimized_vertices(self) -> None:
+        # Normals of synthetic vertices are all the same, so they are merged
+        geometry = create_geometry(500, 8, mesh_count=2, layout=("normal",))
+        options = ConversionOptions(optimize_vertices=True)
+
+        optimized = rebuild_gltf(
+            geometry.to_bytes(), fix_texcoords=False, options=options
+        )
+        self.assertTrianglesEqual(
+            rebuild_gltf(geometry.to_bytes(), fix_texcoords=False), optimized
+        )
+
+        json_data, _ = read_document(optimized)
+        for mesh in json_data["meshes"]:
+            for primitive in mesh["primitives"]:
+                normal = json_data["accessors"][primitive["attributes"]["NORMAL"]]
+                self.assertEqual(normal["count"], 1)
+
+    def test_optimized_vertices_keep_morph_targets(self) -> None:
+        geometry = _add_morph_targets(
+            create_geometry(500, 8, mesh_count=2, layout=("normal",))
+        ).to_bytes()
+
+        self.assertTrianglesEqual(
+            rebuild_gltf(geometry, fix_texcoords=False),
+            rebuild_gltf(
+                geometry,
+                fix_texcoords=False,
+                options=ConversionOptions(optimize_vertices=True),
+            ),
+        )
+
+    def test_vertex_cache_order(self) -> None:
+        geometry = create_geometry(500, 8, mesh_count=2).to_bytes()
+
+        self.assertTrianglesEqual(
+            rebuild_gltf(geometry, fix_texcoords=False),
+            rebuild_gltf(
+                geometry,
+                fix_texcoords=False,
+                options=ConversionOptions(optimize_vertex_cache=True),
+            ),
+        )
+
+    def test_vertex_cache_order_keeps_morph_targets(self) -> None:
+        geometry = _add_morph_targets(create_geometry(500, 8, mesh_count=2))
+
+        self.assertTrianglesEqual(
+            rebuild_gltf(geometry.to_bytes(), fix_texcoords=False),
+            rebuild_gltf(
+                geometry.to_bytes(),
+                fix_texcoords=False,
+                options=ConversionOptions(
+                    optimize_vertices=True, optimize_vertex_cache=True
+                ),
+            ),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+import orjson
+
+from gltf import BIN_CHUNK_TYPE, JSON_CHUNK_TYPE, Chunk, GlTF
+from gltf_combiner.extensions.odin.gltf_component_type import ComponentType
+
+COMPONENT_COUNTS = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4, "MAT4": 16}
+
+type Document = tuple[dict[str, Any], bytes]
+
+
+def read_document(gltf: GlTF) -> Document:
+    json_chunk = gltf.get_chunk_by_type(JSON_CHUNK_TYPE)
+    bin_chunk = gltf.get_chunk_by_type(BIN_CHUNK_TYPE)
+    assert json_chunk is not None and bin_chunk is not None
+
+    return json_chunk.json(), bytes(bin_chunk.data)
+
+
+def edit_document(
+    gltf: GlTF, edit: Callable[[dict[str, Any], bytearray], None]
+) -> GlTF:
+    """Returns a copy of the file with its JSON and binary data edited by `edit`."""
+
+    json_data, data = read_document(gltf)
+    new_data = bytearray(data)
+    edit(json_data, new_data)
+    json_data["buffers"][0]["byteLength"] = len(new_data)
+
+    return GlTF(
+        Chunk(JSON_CHUNK_TYPE, orjson.dumps(json_data)),
+        Chunk(BIN_CHUNK_TYPE, bytes(new_data)),
+    )
+
+
+def add_accessor(json_data: dict[str, Any], data: bytearray, array: np.ndarray) -> int:
+    """Adds a float accessor of `array` rows, aligned to 16 bytes."""
+
+    array = array.astype(np.float32)
+    data += bytes(-len(data) % 16)
+    json_data["bufferViews"].append(
+        {"buffer": 0, "byteOffset": len(data), "byteLength": array.nbytes}
+    )
+    data += array.tobytes()
+
+    json_data["accessors"].append(
+        {
+            "bufferView": len(json_data["bufferViews"]) - 1,
+            "componentType": int(ComponentType.Float),
+            "count": len(array),
+            "type": {1: "SCALAR", 2: "VEC2", 3: "VEC3", 4: "VEC4"}[array.shape[1]],
+        }
+    )
+    return len(json_data["accessors"]) - 1
+
+
+def read_accessor(document: Document, index: int) -> np.ndarray:
+    """Returns accessor values as stored, one row per element."""
+
+    json_data, data = document
+    accessor = json_data["accessors"][index]
+    buffer_view = json_data["bufferViews"][accessor["bufferView"]]
+
+    dtype = np.dtype(ComponentType(accessor["componentType"]).to_numpy_dtype())
+    component_count = COMPONENT_COUNTS[accessor["type"]]
+    return np.ndarray(
+        (accessor["count"], component_count),
+        dtype.newbyteorder("<"),
+        data,
+        offset=buffer_view.get("byteOffset", 0) + accessor.get("byteOffset", 0),
+        strides=(
+            buffer_view.get("byteStride", dtype.itemsize * component_count),
+            dtype.itemsize,
+        ),
+    ).copy()
+
+
+def read_normalized_accessor(document: Document, index: int) -> np.ndarray:
+    """Returns accessor values as floats, normalized integers are scaled down."""
+
+    values = read_accessor(document, index)
+    if not document[0]["accessors"][index].get("normalized", False):
+        return values.astype(np.float64)
+
+    # Signed values are clamped at -1, see glTF specification
+    return np.maximum(values / np.iinfo(values.dtype).max, -1.0)
+
+
+def get_triangles(document: Document, primitive: dict[str, Any]) -> list[tuple]:
+    """
+    Returns sorted triangles of the primitive. Every corner is the data of
+    its vertex in all attributes and morph targets, and every triangle
+    starts at its smallest corner, so the result doesn't depend on vertex
+    and triangle order.
+    """
+
+    accessors = [
+        *(index for _, index in sorted(primitive["attributes"].items())),
+        *(
+            index
+            for target in primitive.get("targets", [])
+            for _, index in sorted(target.items())
+        ),
+    ]
+    columns = [
+        read_accessor(document, index).view(np.uint8).reshape(-1) for index in accessors
+    ]
+    vertex_count = document[0]["accessors"][accessors[0]]["count"]
+    rows = [
+        b"".join(
+            column.reshape(vertex_count, -1)[vertex].tobytes() for column in columns
+        )
+        for vertex in range(vertex_count)
+    ]
+
+    triangles = []
+    for corners in read_accessor(document, primitive["indices"]).reshape(-1, 3):
+        triangle = tuple(rows[vertex] for vertex in corners)
+        first = triangle.index(min(triangle))
+        triangles.append(triangle[first:] + triangle[:first])
+
+    return sorted(triangles)
+
+
+def get_channels(
+    document: Document, animation: int = 0
+) -> dict[tuple[int, str], tuple[np.ndarray, np.ndarray]]:
+    """Returns input times and output values of channels by node and path."""
+
+    json_data, _ = document
+    animation_data = json_data["animations"][animation]
+
+    channels = {}
+    for channel in animation_data["channels"]:
+        sampler = animation_data["samplers"][channel["sampler"]]
+        target = channel["target"]
+        channels[target["node"], target["path"]] = (
+            read_accessor(document, sampler["input"])[:, 0].astype(np.float64),
+            read_normalized_accessor(document, sampler["output"]),
+        )
+
+    return channels
+
+
+def sample_channel(
+    times: np.ndarray, values: np.ndarray, at: np.ndarray, *, is_rotation: bool
+) -> np.ndarray:
+    """
+    Returns channel values at times `at`, interpolated linearly for vectors
+    and spherically for rotations, which are normalized.
+    """
+
+    starts = np.clip(np.searchsorted(times, at, side="right") - 1, 0, len(times) - 1)
+    ends = np.minimum(starts + 1, len(times) - 1)
+    spans = times[ends] - times[starts]
+    factors = np.where(
+        spans > 0, (at - times[starts]) / np.where(spans > 0, spans, 1), 0
+    )[:, np.newaxis]
+
+    start, end = values[starts], values[ends]
+    if not is_rotation:
+        return start + factors * (end - start)
+
+    start = start / np.linalg.norm(start, axis=1, keepdims=True)
+    end = end / np.linalg.norm(end, axis=1, keepdims=True)
+    dot = np.sum(start * end, axis=1, keepdims=True)
+    end = np.where(dot < 0, -end, end)
+    angle = np.arccos(np.minimum(np.abs(dot), 1.0))
+    sine = np.sin(angle)
+
+    # Equal rotations are interpolated linearly, which keeps them
+    is_spherical = sine > 1e-9
+    sine = np.where(is_spherical, sine, 1)
+    start_weights = np.where(
+        is_spherical, np.sin((1 - factors) * angle) / sine, 1 - factors
+    )
+    end_weights = np.where(is_spherical, np.sin(factors * angle) / sine, factors)
+
+    result = start_weights * start + end_weights * end
+    return result / np.linalg.norm(result, axis=1, keepdims=True)
+
+
+def get_rotation_errors(values: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    """Returns angles in radians between rows of quaternions."""
+
+    values = values / np.linalg.norm(values, axis=1, keepdims=True)
+    expected = expected / np.linalg.norm(expected, axis=1, keepdims=True)
+    dot = np.abs(np.sum(values * expected, axis=1))
+    return 2 * np.arccos(np.minimum(dot, 1.0))